@@ -0,0 +1,215 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, F, Max, Min, OuterRef, Q, Subquery
+
+from .archive import archived_answers, archived_responses, earliest, latest
+from .models import Answer, AnswerRollup, Assessment, PartialResponse, Question, Response
+from .question_metadata import assessment_questions
+from .scale_stats import scale_statistics, value_counts
+
+
+def _percentage(count, total):
+    return round((count / total * 100), 2) if total > 0 else 0
+
+
+def question_metrics(assessment, start=None, end=None):
+    """
+    Get metrics for each question in the assessment, optionally limited
+    to responses submitted between ``start`` and ``end``. Archived answers
+    are included from the rollups.
+    """
+    result = {}
+    archived = archived_answers(assessment, start, end)
+    questions = assessment_questions(assessment.id)
+    scale_counts = _scale_value_counts(
+        [question.id for question in questions.values() if question.type == 'scale'],
+        start, end
+    )
+
+    for question in questions.values():
+        answers = Answer.objects.filter(question_id=question.id)
+        if start is not None:
+            answers = answers.filter(response__submitted_at__gte=start)
+        if end is not None:
+            answers = answers.filter(response__submitted_at__lte=end)
+        rolled_up = archived.get(question.id, {})
+        answer_count = answers.count() + rolled_up.get(AnswerRollup.ALL_ANSWERS, 0)
+
+        question_data = {
+            'question_text': question.text,
+            'question_type': question.type,
+            'answer_count': answer_count,
+        }
+
+        # For multiple choice and checkbox questions, show distribution
+        if question.type in ['multiple_choice', 'checkbox']:
+            distribution = {}
+            for value, label in question.choices:
+                # For checkboxes, we need to look for the value within comma-separated values
+                if question.type == 'checkbox':
+                    count = answers.filter(
+                        Q(answer_text__exact=value) |
+                        Q(answer_text__startswith=f"{value},") |
+                        Q(answer_text__contains=f",{value},") |
+                        Q(answer_text__endswith=f",{value}")
+                    ).count()
+                else:
+                    count = answers.filter(answer_text=value).count()
+                count += rolled_up.get(value, 0)
+
+                distribution[label] = {
+                    'count': count,
+                    'percentage': _percentage(count, answer_count)
+                }
+
+            question_data['answer_distribution'] = distribution
+
+        # For scale questions, summarise the values within the question's bounds
+        elif question.type == 'scale':
+            counts = dict(scale_counts.get(question.id, {}))
+            for value, count in value_counts(
+                (text, count) for text, count in rolled_up.items()
+                if text != AnswerRollup.ALL_ANSWERS
+            ).items():
+                counts[value] = counts.get(value, 0) + count
+
+            scale_min, scale_max, scale_step = question.scale
+            statistics = scale_statistics(counts, scale_min, scale_max, scale_step)
+
+            question_data['scale'] = {'min': scale_min, 'max': scale_max, 'step': scale_step}
+            question_data['average_value'] = statistics['mean'] or 0
+            question_data['answer_distribution'] = {
+                point: {
+                    'count': count,
+                    'percentage': _percentage(count, answer_count)
+                }
+                for point, count in statistics.pop('histogram').items()
+            }
+            question_data['statistics'] = statistics
+
+        result[question.id] = question_data
+
+    return result
+
+
+def _scale_value_counts(question_ids, start=None, end=None):
+    """``{question_id: {value: count}}`` for scale questions, in one grouped query"""
+    if not question_ids:
+        return {}
+    answers = Answer.objects.filter(question_id__in=question_ids)
+    if start is not None:
+        answers = answers.filter(response__submitted_at__gte=start)
+    if end is not None:
+        answers = answers.filter(response__submitted_at__lte=end)
+
+    grouped = {}
+    for question_id, text, count in answers.values_list(
+        'question_id', 'answer_text'
+    ).annotate(count=Count('id')).order_by():
+        grouped.setdefault(question_id, []).append((text, count))
+    return {question_id: value_counts(pairs) for question_id, pairs in grouped.items()}
+
+
+def compare_assessments(assessment_ids, start=None, end=None):
+    """
+    Compute response metrics for several assessments at once using grouped
+    queries. Returns a dict keyed by assessment ID.
+    """
+    question_counts = dict(
+        Question.objects.filter(assessment_id__in=assessment_ids)
+        .values('assessment_id').annotate(count=Count('id'))
+        .values_list('assessment_id', 'count').order_by()
+    )
+
+    responses = Response.objects.filter(assessment_id__in=assessment_ids)
+    partials = PartialResponse.objects.filter(assessment_id__in=assessment_ids)
+    if start is not None:
+        responses = responses.filter(submitted_at__gte=start)
+        partials = partials.filter(last_updated__gte=start)
+    if end is not None:
+        responses = responses.filter(submitted_at__lte=end)
+        partials = partials.filter(last_updated__lte=end)
+
+    answered = Answer.objects.filter(
+        response=OuterRef('pk')
+    ).order_by().values('response').annotate(count=Count('pk')).values('count')
+    expected = Question.objects.filter(
+        assessment=OuterRef('assessment')
+    ).order_by().values('assessment').annotate(count=Count('pk')).values('count')
+
+    response_rows = {
+        row['assessment_id']: row
+        for row in responses.alias(
+            answered=Subquery(answered), expected=Subquery(expected)
+        ).values('assessment_id').annotate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(answered=F('expected'))),
+            first_response_at=Min('submitted_at'),
+            last_response_at=Max('submitted_at'),
+        ).order_by()
+    }
+
+    partial_counts = dict(
+        partials.values('assessment_id').annotate(count=Count('id'))
+        .values_list('assessment_id', 'count').order_by()
+    )
+    archived = archived_responses(assessment_ids, start, end)
+
+    result = {}
+    for assessment_id in assessment_ids:
+        row = response_rows.get(assessment_id, {})
+        rolled_up = archived.get(assessment_id, {})
+        completed = row.get('completed', 0) + rolled_up.get('completed', 0)
+        partial = partial_counts.get(assessment_id, 0)
+        has_questions = question_counts.get(assessment_id, 0) > 0
+
+        result[assessment_id] = {
+            'question_count': question_counts.get(assessment_id, 0),
+            'total_responses': row.get('total', 0) + rolled_up.get('responses', 0),
+            'completed_responses': completed,
+            'partial_responses': partial,
+            'completion_rate': _percentage(completed, completed + partial) if has_questions else 0,
+            'first_response_at': earliest(
+                row.get('first_response_at'), rolled_up.get('first_response_at')),
+            'last_response_at': latest(
+                row.get('last_response_at'), rolled_up.get('last_response_at')),
+        }
+
+    return result
+
+
+def _close_connection_after(func):
+    """Worker threads open their own DB connections; close them all when done"""
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connections.close_all()
+    return wrapper
+
+
+def map_assessments(func, assessments):
+    """
+    Run ``func`` for each assessment on a bounded thread pool, returning a
+    dict keyed by assessment ID.
+    """
+    assessments = list(assessments)
+    if not assessments:
+        return {}
+
+    # Each task runs in a copy of the caller's context so database routing
+    # (e.g. replica reads) carries over to the worker threads
+    task = _close_connection_after(func)
+    contexts = [copy_context() for _ in assessments]
+    max_workers = min(getattr(settings, 'ANALYTICS_MAX_WORKERS', 4), len(assessments))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            lambda context, assessment: context.run(task, assessment),
+            contexts, assessments)
+        return {
+            assessment.id: result
+            for assessment, result in zip(assessments, results)
+        }
@@ -1,9 +1,22 @@
-from rest_framework import generics, permissions, status, filters
+from rest_framework import generics, permissions, serializers, status, filters
+from rest_framework.pagination import CursorPagination
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.views import APIView
-from ..models import Assessment
-from ..serializers import AssessmentAdminSerializer, UserAdminSerializer
+from ..models import Assessment, BackgroundJob, Response as AssessmentResponse
+from ..serializers import (
+    AssessmentAdminSerializer, BackgroundJobSerializer, UserAdminSerializer, UserDirectorySerializer,
+)
 from rest_framework.response import Response
 from django.contrib.auth.models import User
+from django.conf import settings
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Lower
+from .. import bulk_users
+from ..authentication.tokens import DASHBOARD_AUTHENTICATION_CLASSES
+from ..jobs import run_job
+from ..middleware import recent_profiles
+from ..purge import SoftDeleteAssessmentMixin
+from ..search import search_users
 
 
 class AssessmentAdminListCreate(generics.ListCreateAPIView):
@@ -12,19 +25,46 @@ class AssessmentAdminListCreate(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAdminUser]
 
 
-class AssessmentAdminRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
+class AssessmentAdminRetrieveUpdateDestroy(SoftDeleteAssessmentMixin, generics.RetrieveUpdateDestroyAPIView):
+    """Deleting returns 202 with the background job that purges its responses"""
     queryset = Assessment.objects.all()
     serializer_class = AssessmentAdminSerializer
     permission_classes = [permissions.IsAdminUser]
 
 
+class UserSearchFilter(filters.SearchFilter):
+    """``?search=`` backed by the user search index (see assessments/search.py)"""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = list(filters.search_smart_split(self.get_search_terms(request)))
+        if not terms:
+            return queryset
+        return search_users(queryset, terms)
+
+
+class UserDirectoryPagination(CursorPagination):
+    """Keyset pagination, newest users first"""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-date_joined', '-id')
+
+
 class UserListView(generics.ListAPIView):
-    """List all users with filtering and search"""
-    queryset = User.objects.all().order_by('-date_joined')
-    serializer_class = UserAdminSerializer
+    """List users with search, keyset pagination and response counts"""
+    serializer_class = UserDirectorySerializer
     permission_classes = [permissions.IsAdminUser]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['username', 'email', 'first_name', 'last_name']
+    filter_backends = [UserSearchFilter]
+    pagination_class = UserDirectoryPagination
+
+    def get_queryset(self):
+        # Responses are linked to users through the normalized respondent email
+        responses = AssessmentResponse.objects.filter(
+            respondent__email=Lower(OuterRef('email'))
+        ).order_by().values('respondent').annotate(count=Count('id')).values('count')
+        return User.objects.annotate(
+            response_count=Coalesce(Subquery(responses), Value(0), output_field=IntegerField())
+        )
 
 class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete a user"""
@@ -65,4 +105,120 @@ class UserRoleBulkUpdateView(APIView):
         return Response({
             "detail": f"Updated {updated_count} users.",
             "updated_count": updated_count
-        })
\ No newline at end of file
+        })
+
+
+class UserBulkActionView(APIView):
+    """
+    Activate, deactivate or delete many users at once. Small batches run
+    inline (200); larger ones run as a background job (202) whose progress
+    is read from ``admin/jobs/<id>/``. The requesting user is never included,
+    and users who own assessments are reported in the job's errors instead
+    of being deleted.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    ACTIONS = {
+        'activate': (BackgroundJob.USER_ACTIVATE, bulk_users.set_active, {'is_active': True}),
+        'deactivate': (BackgroundJob.USER_DEACTIVATE, bulk_users.set_active, {'is_active': False}),
+        'delete': (BackgroundJob.USER_DELETE, bulk_users.delete_users, {}),
+    }
+
+    def post(self, request):
+        action = request.data.get('action')
+        if action not in self.ACTIONS:
+            return Response(
+                {"detail": f"action must be one of: {', '.join(self.ACTIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ids_field = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+        try:
+            user_ids = sorted(set(ids_field.run_validation(request.data.get('user_ids'))) - {request.user.id})
+        except serializers.ValidationError:
+            return Response({"detail": "user_ids must be a list of ids."}, status=status.HTTP_400_BAD_REQUEST)
+        if not user_ids:
+            return Response({"detail": "No users specified."}, status=status.HTTP_400_BAD_REQUEST)
+
+        kind, func, options = self.ACTIONS[action]
+        background = len(user_ids) > getattr(settings, 'BULK_USERS_SYNC_LIMIT', 500)
+        job = run_job(kind, request.user, len(user_ids), func, user_ids,
+                      background=background, **options)
+
+        return Response(
+            BackgroundJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED if background else status.HTTP_200_OK
+        )
+
+
+class UserImportView(APIView):
+    """
+    Import respondent accounts from an uploaded CSV (``file``) with an
+    ``email`` column and optional ``first_name``, ``last_name`` and
+    ``password``. Runs as a background job; returns 202 with the job.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"detail": "Upload the CSV as 'file'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            rows = bulk_users.parse_import(upload.read())
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = run_job(BackgroundJob.USER_IMPORT, request.user, len(rows),
+                      bulk_users.import_users, rows)
+        return Response(BackgroundJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class BackgroundJobDetailView(generics.RetrieveAPIView):
+    """Status and progress of a background job"""
+    queryset = BackgroundJob.objects.all()
+    serializer_class = BackgroundJobSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+
+class ProfilingSnapshotView(APIView):
+    """Recent request profiles and per-view aggregates from ProfilingMiddleware"""
+    authentication_classes = DASHBOARD_AUTHENTICATION_CLASSES
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', 50))
+        except ValueError:
+            return Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        profiles = recent_profiles()
+
+        views = {}
+        for entry in profiles:
+            summary = views.setdefault(entry['view'] or entry['path'], {
+                'requests': 0, 'wall_ms': 0.0, 'db_ms': 0.0, 'queries': 0,
+                'max_wall_ms': 0.0, 'requests_with_duplicates': 0,
+            })
+            summary['requests'] += 1
+            summary['wall_ms'] += entry['wall_ms']
+            summary['db_ms'] += entry['db_ms']
+            summary['queries'] += entry['query_count']
+            summary['max_wall_ms'] = max(summary['max_wall_ms'], entry['wall_ms'])
+            summary['requests_with_duplicates'] += bool(entry['duplicate_queries'])
+
+        for summary in views.values():
+            count = summary.pop('requests')
+            summary.update({
+                'requests': count,
+                'avg_wall_ms': round(summary.pop('wall_ms') / count, 2),
+                'avg_db_ms': round(summary.pop('db_ms') / count, 2),
+                'avg_queries': round(summary.pop('queries') / count, 2),
+            })
+
+        return Response({
+            'enabled': getattr(settings, 'PROFILING_ENABLED', False),
+            'views': views,
+            'requests': profiles[-limit:][::-1] if limit > 0 else [],
+        })
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from ..metrics import REGISTRY
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint. Requires ``Authorization: Bearer
+    <METRICS_AUTH_TOKEN>`` when a token is configured, otherwise the caller
+    must be in METRICS_ALLOWED_IPS.
+    """
+    token = getattr(settings, 'METRICS_AUTH_TOKEN', '')
+    if token:
+        header = request.headers.get('Authorization', '')
+        if not constant_time_compare(header, f"Bearer {token}"):
+            return HttpResponseForbidden()
+    elif request.META.get('REMOTE_ADDR') not in getattr(settings, 'METRICS_ALLOWED_IPS', []):
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        REGISTRY.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
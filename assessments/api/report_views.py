@@ -1,3 +1,5 @@
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 from rest_framework.views import APIView
 from rest_framework.response import Response as DRFResponse
 from rest_framework import permissions, status
@@ -6,9 +8,24 @@ from django.db.models import Count, Avg, Q
 from django.db.models.functions import Cast 
 from django.utils import timezone
 from django.db import models
+from django.conf import settings
+from ..authentication.tokens import DASHBOARD_AUTHENTICATION_CLASSES
+from ..coalescing import stats_flight
+from ..crosstab import crosstab
+from ..metrics import InstrumentedViewMixin
+from ..routers import ReplicaReadMixin
+from ..archive import archived_responses
+from ..question_metadata import assessment_questions
+from ..analytics import compare_assessments, map_assessments, question_metrics
+from ..throttling import STATS_THROTTLES
+from ..timeseries import BUCKETS, parse_bound, response_series
 
-class AssessmentStatsAPIView(APIView):
+class AssessmentStatsAPIView(InstrumentedViewMixin, ReplicaReadMixin, APIView):
+    metrics_endpoint = 'assessment_stats_api'
+    authentication_classes = DASHBOARD_AUTHENTICATION_CLASSES
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'stats'
+    throttle_classes = STATS_THROTTLES
 
     def get(self, request, assessment_id):
         try:
@@ -19,17 +36,23 @@ class AssessmentStatsAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
             
-        stats = {
-            'total_responses': Response.objects.filter(assessment_id=assessment_id).count(),
+        stats = stats_flight.do(
+            ('assessment_stats_api', assessment.id),
+            lambda: self._build_stats(assessment.id)
+        )
+        return DRFResponse(stats)
+
+    def _build_stats(self, assessment_id):
+        return {
+            'total_responses': Response.objects.filter(assessment_id=assessment_id).count()
+            + archived_responses([assessment_id]).get(assessment_id, {}).get('responses', 0),
             'completion_rate': self._calculate_completion_rate(assessment_id),
             'average_scores': self._calculate_average_scores(assessment_id),
             'question_analytics': self._get_question_analytics(assessment_id),
         }
-        return DRFResponse(stats)
 
     def _calculate_completion_rate(self, assessment_id):
-        assessment = Assessment.objects.get(pk=assessment_id)
-        total_questions = assessment.questions.count()
+        total_questions = len(assessment_questions(assessment_id))
         
         if total_questions == 0:
             return 0
@@ -52,15 +75,16 @@ class AssessmentStatsAPIView(APIView):
         # For multiple-choice/scale questions where values are numeric
         scores = {}
         
-        questions = Assessment.objects.get(pk=assessment_id).questions.filter(
-            Q(question_type='scale') | Q(question_type='multiple_choice')
-        )
+        questions = [
+            question for question in assessment_questions(assessment_id).values()
+            if question.type in ('scale', 'multiple_choice')
+        ]
         
         for question in questions:
             try:
                 # Try to calculate average of numeric answers
                 avg_score = Answer.objects.filter(
-                    question=question,
+                    question_id=question.id,
                     response__assessment_id=assessment_id
                 ).annotate(
                     numeric_answer=Cast('answer_text', models.FloatField())
@@ -68,7 +92,7 @@ class AssessmentStatsAPIView(APIView):
                 
                 if avg_score is not None:
                     scores[question.id] = {
-                        'question_text': question.question_text,
+                        'question_text': question.text,
                         'average_score': avg_score
                     }
             except:
@@ -79,15 +103,15 @@ class AssessmentStatsAPIView(APIView):
         
     def _get_question_analytics(self, assessment_id):
         analytics = {}
-        questions = Assessment.objects.get(pk=assessment_id).questions.all()
+        questions = assessment_questions(assessment_id).values()
         
         for question in questions:
             answers = Answer.objects.filter(
-                question=question,
+                question_id=question.id,
                 response__assessment_id=assessment_id
             )
             
-            if question.question_type in ['multiple_choice', 'checkbox']:
+            if question.type in ['multiple_choice', 'checkbox']:
                 # For multiple choice, count frequency of each answer
                 answer_counts = {}
                 for answer in answers:
@@ -96,18 +120,210 @@ class AssessmentStatsAPIView(APIView):
                         answer_counts[value] = answer_counts.get(value, 0) + 1
                         
                 analytics[question.id] = {
-                    'question_text': question.question_text,
+                    'question_text': question.text,
                     'answer_distribution': answer_counts
                 }
-            elif question.question_type == 'scale':
+            elif question.type == 'scale':
                 # For scale questions, show distribution
                 answer_counts = {}
                 for answer in answers:
                     answer_counts[answer.answer_text] = answer_counts.get(answer.answer_text, 0) + 1
                     
                 analytics[question.id] = {
-                    'question_text': question.question_text,
+                    'question_text': question.text,
                     'answer_distribution': answer_counts
                 }
                 
-        return analytics
\ No newline at end of file
+        return analytics
+
+
+class ResponseTimeSeriesAPIView(InstrumentedViewMixin, ReplicaReadMixin, APIView):
+    """
+    Response counts for an assessment bucketed by hour, day or week.
+    Accepts optional ``start``/``end`` dates and a ``tz`` time zone name.
+    """
+    metrics_endpoint = 'assessment_stats_timeseries'
+    authentication_classes = DASHBOARD_AUTHENTICATION_CLASSES
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'stats'
+    throttle_classes = STATS_THROTTLES
+
+    def get(self, request, assessment_id):
+        if not Assessment.objects.filter(pk=assessment_id).exists():
+            return DRFResponse(
+                {"error": "Assessment not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        bucket = request.query_params.get('bucket', 'day')
+        if bucket not in BUCKETS:
+            return DRFResponse(
+                {"error": f"bucket must be one of: {', '.join(BUCKETS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            tz_name = request.query_params.get('tz')
+            tzinfo = ZoneInfo(tz_name) if tz_name else timezone.get_current_timezone()
+            start = request.query_params.get('start')
+            end = request.query_params.get('end')
+            start = parse_bound(start, tzinfo) if start else None
+            end = parse_bound(end, tzinfo, end=True) if end else None
+        except (ValueError, ZoneInfoNotFoundError) as exc:
+            return DRFResponse({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            series = stats_flight.do(
+                ('assessment_stats_timeseries', assessment_id, bucket, start, end, str(tzinfo)),
+                lambda: response_series(assessment_id, bucket, start, end, tzinfo)
+            )
+        except ValueError as exc:
+            return DRFResponse({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return DRFResponse({
+            'assessment_id': assessment_id,
+            'bucket': bucket,
+            'timezone': str(tzinfo),
+            'series': series,
+        })
+
+
+class AssessmentCrosstabAPIView(InstrumentedViewMixin, ReplicaReadMixin, APIView):
+    """
+    Cross-tabulate the answers to two questions of an assessment, given as
+    ``row`` and ``column`` question IDs. Accepts optional ``start``/``end``
+    dates and a ``tz`` time zone name.
+    """
+    metrics_endpoint = 'assessment_stats_crosstab'
+    authentication_classes = DASHBOARD_AUTHENTICATION_CLASSES
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'stats'
+    throttle_classes = STATS_THROTTLES
+
+    def get(self, request, assessment_id):
+        if not Assessment.objects.filter(pk=assessment_id).exists():
+            return DRFResponse(
+                {"error": "Assessment not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            row_id = int(request.query_params.get('row', ''))
+            column_id = int(request.query_params.get('column', ''))
+        except ValueError:
+            return DRFResponse(
+                {"error": "row and column must be question IDs"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            tz_name = request.query_params.get('tz')
+            tzinfo = ZoneInfo(tz_name) if tz_name else timezone.get_current_timezone()
+            start = request.query_params.get('start')
+            end = request.query_params.get('end')
+            start = parse_bound(start, tzinfo) if start else None
+            end = parse_bound(end, tzinfo, end=True) if end else None
+        except (ValueError, ZoneInfoNotFoundError) as exc:
+            return DRFResponse({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        table = stats_flight.do(
+            ('assessment_stats_crosstab', assessment_id, row_id, column_id, start, end),
+            lambda: crosstab(assessment_id, row_id, column_id, start, end)
+        )
+        return DRFResponse({
+            'assessment_id': assessment_id,
+            'timezone': str(tzinfo),
+            **table,
+        })
+
+
+class AssessmentComparisonAPIView(InstrumentedViewMixin, ReplicaReadMixin, APIView):
+    """
+    Compare response metrics across several assessments in one request.
+
+    Expects ``assessment_ids`` and optionally a list of ``ranges`` (each with
+    ``label``, ``start`` and ``end`` submission dates), a ``tz`` name and
+    ``include_questions`` to add per-question metrics.
+    """
+    metrics_endpoint = 'assessment_stats_compare'
+    authentication_classes = DASHBOARD_AUTHENTICATION_CLASSES
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'stats'
+    throttle_classes = STATS_THROTTLES
+
+    def post(self, request):
+        assessment_ids = request.data.get('assessment_ids', [])
+        ranges = request.data.get('ranges') or [{'label': 'all'}]
+        include_questions = bool(request.data.get('include_questions', False))
+
+        if not isinstance(assessment_ids, list):
+            return DRFResponse(
+                {"error": "assessment_ids must be a list of assessment IDs."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not assessment_ids:
+            return DRFResponse(
+                {"error": "No assessments specified."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_assessments = getattr(settings, 'ANALYTICS_MAX_COMPARE', 100)
+        if len(assessment_ids) > max_assessments:
+            return DRFResponse(
+                {"error": f"At most {max_assessments} assessments can be compared."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            assessment_ids = list(dict.fromkeys(int(pk) for pk in assessment_ids))
+            tz_name = request.data.get('tz')
+            tzinfo = ZoneInfo(tz_name) if tz_name else timezone.get_current_timezone()
+            cohorts = [
+                {
+                    'label': str(item.get('label', index)),
+                    'start': parse_bound(item['start'], tzinfo) if item.get('start') else None,
+                    'end': parse_bound(item['end'], tzinfo, end=True) if item.get('end') else None,
+                }
+                for index, item in enumerate(ranges)
+            ]
+        except (TypeError, ValueError, AttributeError, ZoneInfoNotFoundError) as exc:
+            return DRFResponse({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        assessments = list(Assessment.objects.filter(pk__in=assessment_ids).order_by('id'))
+        missing = set(assessment_ids) - {assessment.id for assessment in assessments}
+        if missing:
+            return DRFResponse(
+                {"error": "Assessments not found", "ids": sorted(missing)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        key = (
+            'assessment_stats_compare',
+            tuple(assessment_ids),
+            tuple((cohort['label'], cohort['start'], cohort['end']) for cohort in cohorts),
+            include_questions,
+        )
+        return DRFResponse(stats_flight.do(
+            key, lambda: self._compare(assessments, assessment_ids, cohorts, include_questions)
+        ))
+
+    def _compare(self, assessments, assessment_ids, cohorts, include_questions):
+        for cohort in cohorts:
+            metrics = compare_assessments(assessment_ids, cohort['start'], cohort['end'])
+            if include_questions:
+                per_question = map_assessments(
+                    lambda assessment: question_metrics(
+                        assessment, cohort['start'], cohort['end']),
+                    assessments
+                )
+                for assessment_id, data in per_question.items():
+                    metrics[assessment_id]['question_metrics'] = data
+            cohort['metrics'] = metrics
+
+        return {
+            'assessments': [
+                {'id': assessment.id, 'title': assessment.title, 'version': assessment.version}
+                for assessment in assessments
+            ],
+            'cohorts': cohorts,
+        }
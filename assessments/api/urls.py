@@ -1,6 +1,9 @@
 from django.urls import path
-from .admin_views import AssessmentAdminListCreate, AssessmentAdminRetrieveUpdateDestroy, UserListView, UserDetailView, UserRoleBulkUpdateView
-from .report_views import AssessmentStatsAPIView
+from .admin_views import AssessmentAdminListCreate, AssessmentAdminRetrieveUpdateDestroy, UserListView, UserDetailView, UserRoleBulkUpdateView, ProfilingSnapshotView
+from .admin_views import UserBulkActionView, UserImportView, BackgroundJobDetailView
+from .metrics_views import metrics
+from .report_views import AssessmentStatsAPIView, ResponseTimeSeriesAPIView, AssessmentComparisonAPIView
+from .report_views import AssessmentCrosstabAPIView
 
 urlpatterns = [
     path('admin/assessments/', AssessmentAdminListCreate.as_view(),
@@ -9,10 +12,25 @@ urlpatterns = [
          AssessmentAdminRetrieveUpdateDestroy.as_view(), name='admin-assessment-detail'),
     path('assessments/<int:assessment_id>/stats/',
          AssessmentStatsAPIView.as_view(), name='assessment-stats'),
+    path('assessments/<int:assessment_id>/stats/timeseries/',
+         ResponseTimeSeriesAPIView.as_view(), name='assessment-stats-timeseries'),
+    path('assessments/<int:assessment_id>/stats/crosstab/',
+         AssessmentCrosstabAPIView.as_view(), name='assessment-stats-crosstab'),
+    path('assessments/stats/compare/',
+         AssessmentComparisonAPIView.as_view(), name='assessment-stats-compare'),
     path('admin/users/', UserListView.as_view(), name='admin-user-list'),
     path('admin/users/<int:pk>/', UserDetailView.as_view(),
          name='admin-user-detail'),
     path('admin/users/bulk-update/', UserRoleBulkUpdateView.as_view(),
          name='admin-user-bulk-update'),
+    path('admin/users/bulk-action/', UserBulkActionView.as_view(),
+         name='admin-user-bulk-action'),
+    path('admin/users/import/', UserImportView.as_view(),
+         name='admin-user-import'),
+    path('admin/jobs/<int:pk>/', BackgroundJobDetailView.as_view(),
+         name='admin-job-detail'),
+    path('admin/profiling/', ProfilingSnapshotView.as_view(),
+         name='admin-profiling'),
+    path('metrics/', metrics, name='metrics'),
          
 ]
@@ -0,0 +1,207 @@
+# Archival of old responses (manage.py archive_responses). Responses older
+# than their assessment's retention period are written out as gzipped
+# NDJSON, folded into ResponseRollup / AnswerRollup and then deleted, one
+# batch at a time, so stats keep counting them once the raw rows are gone.
+import json
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from .models import Answer, AnswerRollup, Question, Response, ResponseRollup
+from .purge import raw_delete
+from .question_metadata import assessment_questions
+
+
+def retention_days(assessment):
+    """The assessment's own policy, else RESPONSE_RETENTION_DAYS (None: keep)"""
+    if assessment.retention_days is not None:
+        return assessment.retention_days
+    return getattr(settings, 'RESPONSE_RETENTION_DAYS', None)
+
+
+def expired_responses(assessment, cutoff):
+    return Response.objects.filter(assessment=assessment, submitted_at__lt=cutoff)
+
+
+def _rolled_up_values(question_type, answer_text):
+    """Values an answer adds to the rollup besides the total"""
+    if not answer_text or question_type in (None, Question.TEXT):
+        return []
+    if question_type == Question.CHECKBOX:
+        values = answer_text.split(',')
+    else:
+        values = [answer_text]
+    max_length = AnswerRollup._meta.get_field('answer_text').max_length
+    return [value[:max_length] for value in values if value]
+
+
+def archive_responses(assessment, cutoff, stream, batch_size=1000, progress=None):
+    """
+    Write each response to ``assessment`` submitted before ``cutoff`` to
+    ``stream`` as a JSON line with its answers, add it to the rollups and
+    delete it. A batch is flushed to ``stream`` before its rows are deleted.
+    Returns the number of responses archived.
+    """
+    question_types = {
+        question.id: question.type
+        for question in assessment_questions(assessment.id).values()
+    }
+    question_count = len(question_types)
+    expired = expired_responses(assessment, cutoff)
+
+    archived = 0
+    while True:
+        responses = list(
+            expired.order_by('pk').values('id', 'respondent_email', 'submitted_at')[:batch_size]
+        )
+        if not responses:
+            return archived
+        ids = [response['id'] for response in responses]
+
+        answers = {}
+        for response_id, question_id, answer_text in Answer.objects.filter(
+            response_id__in=ids
+        ).order_by('response_id', 'id').values_list('response_id', 'question_id', 'answer_text'):
+            answers.setdefault(response_id, []).append((question_id, answer_text))
+
+        per_day = {}
+        per_answer = {}
+        for response in responses:
+            given = answers.get(response['id'], [])
+            day = response['submitted_at'].astimezone(dt_timezone.utc).date()
+            submitted_at = response['submitted_at']
+            counts = per_day.setdefault(day, [0, 0, submitted_at, submitted_at])
+            counts[0] += 1
+            # Same definition of "completed" as the stats views
+            if question_count and len(given) == question_count:
+                counts[1] += 1
+            counts[2] = min(counts[2], submitted_at)
+            counts[3] = max(counts[3], submitted_at)
+
+            for question_id, answer_text in given:
+                values = [AnswerRollup.ALL_ANSWERS] + _rolled_up_values(
+                    question_types.get(question_id), answer_text)
+                for value in values:
+                    key = (question_id, day, value)
+                    per_answer[key] = per_answer.get(key, 0) + 1
+
+            stream.write(json.dumps({
+                'id': response['id'],
+                'assessment_id': assessment.id,
+                'assessment_version': assessment.version,
+                'respondent_email': response['respondent_email'],
+                'submitted_at': response['submitted_at'],
+                'answers': [
+                    {'question_id': question_id, 'answer_text': answer_text}
+                    for question_id, answer_text in given
+                ],
+            }, cls=DjangoJSONEncoder) + '\n')
+        stream.flush()
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            _add_response_rollups(assessment.id, per_day)
+            _add_answer_rollups(per_answer)
+            raw_delete(cursor, Answer, 'response', ids)
+            raw_delete(cursor, Response, 'id', ids)
+
+        archived += len(ids)
+        if progress:
+            progress(archived)
+
+
+def _add_response_rollups(assessment_id, per_day):
+    existing = {
+        rollup.day: rollup
+        for rollup in ResponseRollup.objects.select_for_update().filter(
+            assessment_id=assessment_id, day__in=list(per_day))
+    }
+    new = []
+    for day, (responses, completed, first, last) in per_day.items():
+        rollup = existing.get(day)
+        if rollup is None:
+            new.append(ResponseRollup(
+                assessment_id=assessment_id, day=day,
+                responses=responses, completed=completed,
+                first_submitted_at=first, last_submitted_at=last))
+        else:
+            rollup.responses += responses
+            rollup.completed += completed
+            rollup.first_submitted_at = earliest(rollup.first_submitted_at, first)
+            rollup.last_submitted_at = latest(rollup.last_submitted_at, last)
+    ResponseRollup.objects.bulk_update(
+        existing.values(),
+        ['responses', 'completed', 'first_submitted_at', 'last_submitted_at'])
+    ResponseRollup.objects.bulk_create(new)
+
+
+def _add_answer_rollups(per_answer):
+    question_ids = {question_id for question_id, _, _ in per_answer}
+    days = {day for _, day, _ in per_answer}
+    existing = {
+        (rollup.question_id, rollup.day, rollup.answer_text): rollup
+        for rollup in AnswerRollup.objects.select_for_update().filter(
+            question_id__in=question_ids, day__in=days)
+    }
+    changed = []
+    new = []
+    for (question_id, day, value), count in per_answer.items():
+        rollup = existing.get((question_id, day, value))
+        if rollup is None:
+            new.append(AnswerRollup(
+                question_id=question_id, day=day, answer_text=value, count=count))
+        else:
+            rollup.count += count
+            changed.append(rollup)
+    AnswerRollup.objects.bulk_update(changed, ['count'], batch_size=1000)
+    AnswerRollup.objects.bulk_create(new, batch_size=1000)
+
+
+def _rollup_days(queryset, start=None, end=None):
+    # Rollups are per UTC day, so date ranges apply at day granularity
+    if start is not None:
+        queryset = queryset.filter(day__gte=start.astimezone(dt_timezone.utc).date())
+    if end is not None:
+        queryset = queryset.filter(day__lte=end.astimezone(dt_timezone.utc).date())
+    return queryset
+
+
+def archived_responses(assessment_ids, start=None, end=None):
+    """
+    ``{assessment_id: {'responses', 'completed', 'first_response_at',
+    'last_response_at'}}`` from the rollups
+    """
+    totals = {}
+    rollups = _rollup_days(ResponseRollup.objects.filter(assessment_id__in=assessment_ids), start, end)
+    for assessment_id, responses, completed, first, last in rollups.values_list(
+        'assessment_id', 'responses', 'completed', 'first_submitted_at', 'last_submitted_at'
+    ):
+        row = totals.setdefault(assessment_id, {
+            'responses': 0, 'completed': 0, 'first_response_at': None, 'last_response_at': None,
+        })
+        row['responses'] += responses
+        row['completed'] += completed
+        row['first_response_at'] = earliest(row['first_response_at'], first)
+        row['last_response_at'] = latest(row['last_response_at'], last)
+    return totals
+
+
+def earliest(*moments):
+    """The earliest of the given datetimes, ignoring None"""
+    return min(filter(None, moments), default=None)
+
+
+def latest(*moments):
+    """The latest of the given datetimes, ignoring None"""
+    return max(filter(None, moments), default=None)
+
+
+def archived_answers(assessment, start=None, end=None):
+    """``{question_id: {answer_text: count}}`` from the rollups"""
+    counts = {}
+    rollups = _rollup_days(AnswerRollup.objects.filter(question__assessment=assessment), start, end)
+    for question_id, value, count in rollups.values_list('question_id', 'answer_text', 'count'):
+        per_value = counts.setdefault(question_id, {})
+        per_value[value] = per_value.get(value, 0) + count
+    return counts
@@ -0,0 +1,133 @@
+import functools
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from .metrics import observe_request
+from .models import Assessment, AssessmentAttempt, PartialResponse
+from .serializers import AssessmentSerializer, PartialResponseSerializer, ResponseSerializer
+from .services import save_submission
+
+# Async counterparts of the respondent hot paths (assessment detail, draft
+# autosave and submission). Served under an ASGI worker they don't hold a
+# worker per in-flight request; transactional writes still run in a thread
+# because Django has no async transactions.
+
+
+def instrumented(endpoint):
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            started = time.perf_counter()
+            response = await view(request, *args, **kwargs)
+            observe_request(
+                endpoint, request.method, response.status_code,
+                time.perf_counter() - started)
+            return response
+        return wrapper
+    return decorator
+
+
+def _json_body(request):
+    try:
+        return json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+
+
+@require_GET
+@instrumented('async_assessment_detail')
+async def assessment_detail(request, pk):
+    """
+    Retrieve an available assessment with its questions and choices.
+    Passing ``respondent_email`` starts the timer for timed assessments.
+    """
+    now = timezone.now()
+    try:
+        assessment = await Assessment.objects.filter(
+            Q(available_from__isnull=True) | Q(available_from__lte=now),
+            Q(available_to__isnull=True) | Q(available_to__gte=now),
+            published_at__isnull=False,
+        ).prefetch_related('questions__choices').aget(pk=pk)
+    except Assessment.DoesNotExist:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+
+    data = AssessmentSerializer(assessment).data
+
+    email = request.GET.get('respondent_email')
+    if email and assessment.time_limit_minutes:
+        try:
+            email = serializers.EmailField().run_validation(email)
+        except ValidationError as exc:
+            return JsonResponse({'respondent_email': exc.detail}, status=400)
+        attempt = await AssessmentAttempt.astart(assessment, email, now)
+        timestamp = serializers.DateTimeField()
+        data['attempt'] = {
+            'started_at': timestamp.to_representation(attempt.started_at),
+            'expires_at': timestamp.to_representation(attempt.expires_at),
+            'submitted_at': attempt.submitted_at and timestamp.to_representation(attempt.submitted_at),
+        }
+
+    return JsonResponse(data)
+
+
+@csrf_exempt
+@require_POST
+@instrumented('async_partial_response_upsert')
+async def partial_response_upsert(request):
+    """
+    Create or update the draft for an assessment and respondent email in a
+    single call, so autosaving clients don't need to track draft IDs.
+    """
+    payload = _json_body(request)
+    if payload is None:
+        return JsonResponse({'detail': 'Invalid JSON.'}, status=400)
+
+    serializer = PartialResponseSerializer(data=payload)
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(serializer.errors, status=400)
+
+    data = serializer.validated_data
+    if data['assessment'].time_limit_minutes:
+        # The first autosave starts the timer if opening the assessment didn't
+        await AssessmentAttempt.astart(data['assessment'], data['respondent_email'], timezone.now())
+    # The unique (assessment, respondent) constraint lets concurrent
+    # autosaves for the same respondent settle on one draft
+    draft, created = await PartialResponse.aupsert(
+        data['assessment'], data['respondent_email'], data['answers'])
+
+    return JsonResponse(PartialResponseSerializer(draft).data, status=201 if created else 200)
+
+
+@csrf_exempt
+@require_POST
+@instrumented('async_response_create')
+async def response_create(request):
+    """Submit a response with its answers"""
+    payload = _json_body(request)
+    if payload is None:
+        return JsonResponse({'detail': 'Invalid JSON.'}, status=400)
+
+    serializer = ResponseSerializer(data=payload)
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(serializer.errors, status=400)
+
+    try:
+        data = await sync_to_async(_submit)(serializer)
+    except ValidationError as exc:
+        # Time limit of a timed assessment
+        return JsonResponse(exc.detail, status=400)
+    return JsonResponse(data, status=201)
+
+
+def _submit(serializer):
+    save_submission(serializer)
+    return serializer.data
@@ -0,0 +1,16 @@
+from django.contrib.auth.backends import ModelBackend
+
+from .hashing import hashing_slot
+
+
+class HashingSlotModelBackend(ModelBackend):
+    """
+    ModelBackend that checks passwords (and upgrades outdated hashes)
+    inside a password hashing slot; see hashing.py.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if password is None:
+            return None
+        with hashing_slot('login'):
+            return super().authenticate(request, username=username, password=password, **kwargs)
@@ -0,0 +1,77 @@
+import random
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from ..metrics import Counter, Gauge, Histogram
+
+HASH_IN_FLIGHT = Gauge(
+    'password_hash_in_flight',
+    'Password hashes currently running in this process.',
+)
+HASH_DURATION = Histogram(
+    'password_hash_duration_seconds',
+    'Time spent holding a password hashing slot.',
+    ['operation'],
+)
+HASH_REJECTED = Counter(
+    'password_hash_rejected_total',
+    'Requests refused because every password hashing slot was taken.',
+    ['operation'],
+)
+
+_POLL_INTERVAL = 0.02
+
+
+class HashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-in requests right now. Please try again shortly.'
+    default_code = 'hashing_unavailable'
+    wait = 1
+
+
+def _acquire(token):
+    slots = list(range(getattr(settings, 'PASSWORD_HASHING_CONCURRENCY', 2)))
+    random.shuffle(slots)
+    lease = getattr(settings, 'PASSWORD_HASHING_LEASE_SECONDS', 10)
+    for slot in slots:
+        key = f"password-hash-slot:{slot}"
+        if cache.add(key, token, lease):
+            return key
+    return None
+
+
+@contextmanager
+def hashing_slot(operation):
+    """
+    Hold one of PASSWORD_HASHING_CONCURRENCY slots while hashing a password.
+
+    Slots live in the default cache, so with a shared cache (REDIS_URL) the
+    limit covers every gunicorn worker and a burst of logins can only tie up
+    that many of them. Callers wait up to PASSWORD_HASHING_WAIT_SECONDS for
+    a slot, then get HashingUnavailable (503 with Retry-After). Slots expire
+    after PASSWORD_HASHING_LEASE_SECONDS in case a worker dies holding one.
+    """
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + getattr(settings, 'PASSWORD_HASHING_WAIT_SECONDS', 0.5)
+    key = _acquire(token)
+    while key is None:
+        if time.monotonic() >= deadline:
+            HASH_REJECTED.inc(operation=operation)
+            raise HashingUnavailable()
+        time.sleep(_POLL_INTERVAL)
+        key = _acquire(token)
+
+    HASH_IN_FLIGHT.inc()
+    try:
+        with HASH_DURATION.time(operation=operation):
+            yield
+    finally:
+        HASH_IN_FLIGHT.dec()
+        if cache.get(key) == token:
+            cache.delete(key)
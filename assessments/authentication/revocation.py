@@ -0,0 +1,103 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+
+class TTLCache:
+    """
+    Small per-process cache whose entries expire after ``ttl`` seconds.
+    When full, expired entries are dropped first, then the oldest ones.
+    """
+
+    def __init__(self, ttl, maxsize=10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get_or_set(self, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        # Load outside the lock so a slow query doesn't block other keys
+        value = loader()
+        with self._lock:
+            if len(self._data) >= self.maxsize:
+                self._evict(now)
+            self._data[key] = (now + self.ttl, value)
+        return value
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+        return default
+
+    def set(self, key, value):
+        with self._lock:
+            if len(self._data) >= self.maxsize:
+                self._evict(time.monotonic())
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _evict(self, now):
+        expired = [key for key, (expires, _) in self._data.items() if expires <= now]
+        for key in expired:
+            del self._data[key]
+        # Dicts keep insertion order, so the first keys are the oldest
+        overflow = len(self._data) - self.maxsize + 1
+        for key in list(self._data)[:max(overflow, 0)]:
+            del self._data[key]
+
+
+_ttl = getattr(settings, 'STATELESS_AUTH_CACHE_TTL', 30)
+_maxsize = getattr(settings, 'STATELESS_AUTH_CACHE_SIZE', 10000)
+
+user_state_cache = TTLCache(_ttl, _maxsize)
+blacklist_cache = TTLCache(_ttl, _maxsize)
+
+
+def user_state(user_id):
+    """
+    Return ``(is_active, is_staff)`` for the user, or None if the user no
+    longer exists. Cached for ``STATELESS_AUTH_CACHE_TTL`` seconds.
+    """
+    return user_state_cache.get_or_set(
+        user_id,
+        lambda: User.objects.filter(pk=user_id).values_list(
+            'is_active', 'is_staff'
+        ).first(),
+    )
+
+
+def mark_blacklisted(jti):
+    """Record a jti this process has just blacklisted."""
+    blacklist_cache.set(jti, True)
+
+
+def check_blacklisted(jti):
+    """
+    Blacklist check for refresh tokens. Only positive results are cached:
+    a cached "not blacklisted" could let a rotated refresh token be reused
+    by another worker, so misses always go to the database.
+    """
+    if blacklist_cache.get(jti) is True:
+        return True
+    if BlacklistedToken.objects.filter(token__jti=jti).exists():
+        mark_blacklisted(jti)
+        return True
+    return False
@@ -0,0 +1,89 @@
+from rest_framework.authentication import SessionAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .revocation import check_blacklisted, mark_blacklisted, user_state
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Embed the user's role in the token pair so permission checks can be
+    answered from the token alone. Access tokens issued from the refresh
+    token inherit these claims.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['username'] = user.username
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        return token
+
+
+class CachedRefreshToken(RefreshToken):
+    """
+    Refresh token whose blacklist check consults the per-process cache of
+    known blacklisted jtis before querying the database.
+    """
+
+    def check_blacklist(self):
+        if check_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError('Token is blacklisted')
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        mark_blacklisted(self.payload[api_settings.JTI_CLAIM])
+        return blacklisted
+
+
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = CachedRefreshToken
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the signed claims instead of loading the
+    user row on every request. ``request.user`` is a ``TokenUser``, so this
+    is meant for read-only views that only look at ``id`` and ``is_staff``.
+
+    Deactivation and demotion are checked against a short in-process cache,
+    so they take effect within STATELESS_AUTH_CACHE_TTL seconds. simplejwt
+    only blacklists refresh tokens, so logging out doesn't end an access
+    token early; it stays valid until it expires. Tokens issued before the
+    role claims existed fall back to the regular database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if 'is_staff' not in validated_token:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        state = user_state(user_id)
+        if state is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+
+        is_active, is_staff = state
+        if not is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if validated_token['is_staff'] and not is_staff:
+            # Role was revoked after the token was issued; make the client log in again
+            raise AuthenticationFailed('User role has changed', code='user_role_changed')
+
+        return TokenUser(validated_token)
+
+
+# Authentication for read-only dashboard views. Bearer tokens never reach the
+# session authenticator; it only serves browsable-API logins.
+DASHBOARD_AUTHENTICATION_CLASSES = [StatelessJWTAuthentication, SessionAuthentication]
@@ -1,14 +1,16 @@
 from django.urls import path
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
+from .views import (
+    RegisterView,
+    UserProfileView,
+    ChangePasswordView,
+    TokenObtainView,
+    TokenRefreshInstrumentedView,
 )
-from .views import RegisterView, UserProfileView, ChangePasswordView
 from .auth import get_csrf_token
 
 urlpatterns = [
-    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/', TokenObtainView.as_view(), name='token_obtain_pair'),
+    path('token/refresh/', TokenRefreshInstrumentedView.as_view(), name='token_refresh'),
     path('register/', RegisterView.as_view(), name='register'),
     path('profile/', UserProfileView.as_view(), name='user_profile'),
     path('csrf/', get_csrf_token, name='csrf'),
@@ -2,11 +2,25 @@ from rest_framework import generics, serializers, permissions, status
 from rest_framework.response import Response
 from django.contrib.auth.models import User
 from rest_framework.views import APIView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .hashing import hashing_slot
 from .serializers import UserRegistrationSerializer, UserAdminSerializer
+from ..metrics import InstrumentedViewMixin
+from ..throttling import IPTokenBucketThrottle
+
+
+class TokenObtainView(InstrumentedViewMixin, TokenObtainPairView):
+    metrics_endpoint = 'auth_token_obtain'
+
+
+class TokenRefreshInstrumentedView(InstrumentedViewMixin, TokenRefreshView):
+    metrics_endpoint = 'auth_token_refresh'
 
 
 class RegisterView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'register'
+    throttle_classes = [IPTokenBucketThrottle]
 
     def post(self, request):
         serializer = UserRegistrationSerializer(data=request.data)
@@ -70,10 +84,11 @@ class ChangePasswordView(APIView):
         old_password = request.data.get('old_password')
         new_password = request.data.get('new_password')
         
-        if not user.check_password(old_password):
-            return Response({'detail': 'Current password is incorrect'}, 
-                          status=status.HTTP_400_BAD_REQUEST)
-        
-        user.set_password(new_password)
+        with hashing_slot('password_change'):
+            if not user.check_password(old_password):
+                return Response({'detail': 'Current password is incorrect'}, 
+                              status=status.HTTP_400_BAD_REQUEST)
+
+            user.set_password(new_password)
         user.save()
         return Response({'detail': 'Password changed successfully'})
\ No newline at end of file
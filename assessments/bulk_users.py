@@ -0,0 +1,191 @@
+# Bulk user administration run through assessments/jobs.py. Each function
+# takes a JobProgress first and works through the users in chunks.
+import csv
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from .authentication.revocation import user_state_cache
+from .models import Assessment
+
+IMPORT_COLUMNS = ('email', 'first_name', 'last_name', 'password')
+
+
+def chunk_size():
+    return getattr(settings, 'BULK_USERS_CHUNK_SIZE', 1000)
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def set_active(progress, user_ids, is_active):
+    """Activate or deactivate users with one UPDATE per chunk"""
+    updated = 0
+    for chunk in chunked(user_ids, chunk_size()):
+        updated += User.objects.filter(id__in=chunk).update(is_active=is_active)
+        # Drop this process's cached state so dashboard tokens notice at once
+        for user_id in chunk:
+            user_state_cache.discard(user_id)
+        progress.advance(len(chunk))
+    return {'updated': updated}
+
+
+def delete_users(progress, user_ids):
+    """
+    Delete users one chunk per transaction. Users who still own assessments
+    (including deleted ones not yet purged) are skipped and reported, since
+    deleting them would cascade to the assessments' responses outside the
+    purge path.
+    """
+    deleted = 0
+    for chunk in chunked(user_ids, chunk_size()):
+        with transaction.atomic():
+            owners = set(Assessment.all_objects.filter(created_by_id__in=chunk)
+                         .values_list('created_by_id', flat=True))
+            _, per_model = User.objects.filter(id__in=chunk).exclude(id__in=owners).delete()
+        deleted += per_model.get('auth.User', 0)
+        for user_id in chunk:
+            user_state_cache.discard(user_id)
+        errors = [
+            {'user_id': user_id, 'error': "Owns assessments; delete or reassign them first."}
+            for user_id in sorted(owners)
+        ]
+        progress.advance(len(chunk), failed=len(errors), errors=errors)
+    return {'deleted': deleted}
+
+
+def parse_import(data):
+    """
+    Parse an uploaded CSV of users. An ``email`` column is required and
+    ``first_name``, ``last_name`` and ``password`` are optional. Returns
+    the rows as dicts, raising ValueError when the file can't be used.
+    """
+    if isinstance(data, bytes):
+        try:
+            data = data.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise ValueError("The file must be UTF-8 encoded CSV.")
+
+    reader = csv.DictReader(io.StringIO(data))
+    try:
+        fields = [(name or '').strip().lower() for name in reader.fieldnames or []]
+    except csv.Error as exc:
+        raise ValueError(f"Invalid CSV: {exc}")
+    if 'email' not in fields:
+        raise ValueError("The CSV needs a header row with an 'email' column.")
+    reader.fieldnames = fields
+
+    max_rows = getattr(settings, 'USER_IMPORT_MAX_ROWS', 50000)
+    rows = []
+    try:
+        for row in reader:
+            rows.append({
+                column: (row.get(column) or '').strip() for column in IMPORT_COLUMNS
+            })
+            if len(rows) > max_rows:
+                raise ValueError(f"At most {max_rows} users can be imported at once.")
+    except csv.Error as exc:
+        raise ValueError(f"Invalid CSV: {exc}")
+    return rows
+
+
+def _password_for(row):
+    # No password gives an unusable one, which costs nothing to make
+    return hashers.make_password(row['password'] or None)
+
+
+def import_users(progress, rows):
+    """
+    Create respondent accounts from parsed CSV rows. Rows with a password
+    get it hashed with the preferred hasher; rows without one get an
+    unusable password so the user has to reset it. Invalid and
+    already registered emails are reported per row and skipped.
+    """
+    created = 0
+    seen = set()
+    # Hashing dominates imports with passwords; hashlib releases the GIL, so
+    # a few threads hash in parallel without starving the request workers
+    workers = getattr(settings, 'USER_IMPORT_HASHING_WORKERS', 2)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='user-import-hash') as executor:
+        for offset, chunk in enumerate(chunked(rows, chunk_size())):
+            first_line = offset * chunk_size() + 2  # header is line 1
+            candidates, errors = _validate_chunk(chunk, first_line, seen)
+
+            passwords = executor.map(_password_for, [row for _, row in candidates])
+            users = [
+                User(
+                    username=row['email'],
+                    email=row['email'],
+                    first_name=row['first_name'],
+                    last_name=row['last_name'],
+                    password=password,
+                )
+                for (_, row), password in zip(candidates, passwords)
+            ]
+
+            chunk_created, conflicts = _create(users, [line for line, _ in candidates])
+            created += chunk_created
+            errors.extend(conflicts)
+            progress.advance(len(chunk), failed=len(errors), errors=errors)
+    return {'created': created}
+
+
+def _validate_chunk(chunk, first_line, seen):
+    candidates = []
+    errors = []
+    for line, row in enumerate(chunk, start=first_line):
+        email = User.objects.normalize_email(row['email']).lower()
+        try:
+            validate_email(email)
+            if email in seen:
+                raise ValidationError("Duplicate email in file.")
+            if row['password']:
+                validate_password(row['password'], User(username=email, email=email))
+        except ValidationError as exc:
+            errors.append({'line': line, 'email': row['email'], 'error': ' '.join(exc.messages)})
+            continue
+        seen.add(email)
+        candidates.append((line, dict(row, email=email)))
+
+    # Registration keeps the email's case in the username, so compare lowercased
+    existing = set(User.objects.annotate(lowered=Lower('username')).filter(
+        lowered__in=[row['email'] for _, row in candidates]
+    ).values_list('lowered', flat=True))
+    if existing:
+        errors.extend(
+            {'line': line, 'email': row['email'], 'error': "Already registered."}
+            for line, row in candidates if row['email'] in existing
+        )
+        candidates = [(line, row) for line, row in candidates if row['email'] not in existing]
+    return candidates, errors
+
+
+def _create(users, lines):
+    """bulk_create the chunk, falling back to row by row if one collides"""
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+        return len(users), []
+    except IntegrityError:
+        pass
+
+    created = 0
+    conflicts = []
+    for line, user in zip(lines, users):
+        try:
+            with transaction.atomic():
+                user.save()
+            created += 1
+        except IntegrityError:
+            conflicts.append({'line': line, 'email': user.email, 'error': "Already registered."})
+    return created, conflicts
@@ -0,0 +1,107 @@
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import Counter
+
+COALESCED_REQUESTS = Counter(
+    'coalesced_requests_total',
+    'Requests served from a computation already in flight.',
+    ['flight'],
+)
+
+_POLL_INTERVAL = 0.05
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Run at most one computation per key at a time.
+
+    Callers that arrive while a computation for the same key is running wait
+    for it and get its result (or its exception) instead of starting their
+    own. Within a process they wait on the running thread. Across processes
+    the computing caller holds a lock in the default cache and publishes its
+    result there; callers in other processes poll for it for up to
+    COALESCING_WAIT_SECONDS and then compute it themselves. That only spans
+    gunicorn workers when the default cache is shared (see REDIS_URL).
+
+    Nothing is served once the computation finishes, and errors are never
+    shared across processes. The result is shared between callers, so they
+    must not modify it.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            COALESCED_REQUESTS.inc(flight=self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_shared(key, func)
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def _do_shared(self, key, func):
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        lock_key = f"singleflight:{self.name}:{digest}"
+        result_key = f"{lock_key}:result"
+        wait = getattr(settings, 'COALESCING_WAIT_SECONDS', 30)
+        deadline = time.monotonic() + wait
+        token = uuid.uuid4().hex
+
+        while not cache.add(lock_key, token, wait):
+            leader = cache.get(lock_key)
+            while leader is not None:
+                released = cache.get(lock_key) != leader
+                # Leaders publish their result before releasing the lock
+                published = cache.get(result_key)
+                if published is not None and published[0] == leader:
+                    COALESCED_REQUESTS.inc(flight=self.name)
+                    return published[1]
+                if released or time.monotonic() >= deadline:
+                    break
+                time.sleep(_POLL_INTERVAL)
+            if time.monotonic() >= deadline:
+                return func()
+
+        try:
+            result = func()
+            cache.set(result_key, (token, result), wait)
+            return result
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+
+# Shared by the stats endpoints
+stats_flight = SingleFlight('stats')
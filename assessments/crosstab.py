@@ -0,0 +1,161 @@
+# Cross-tabulation of two questions of an assessment: how respondents who
+# gave each answer to one question answered another. The pairs are counted
+# in a single grouped query that joins the answer table to itself on
+# response_id; checkbox answers are split into their values afterwards, on
+# the grouped rows rather than on every answer.
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Count, Max
+from rest_framework.exceptions import ValidationError
+
+from .models import Answer, Question, Response
+from .question_metadata import assessment_questions
+
+CROSSTAB_TYPES = (Question.MULTIPLE_CHOICE, Question.CHECKBOX, Question.SCALE)
+
+
+def _question(questions, question_id, param):
+    question = questions.get(question_id)
+    if question is None:
+        raise ValidationError({param: "Not a question of this assessment."})
+    if question.type not in CROSSTAB_TYPES:
+        raise ValidationError({param: f"Cannot cross-tabulate {question.type} questions."})
+    return question
+
+
+def _values(question, answer_text):
+    if question.type == Question.CHECKBOX:
+        return [value for value in answer_text.split(',') if value]
+    return [answer_text] if answer_text else []
+
+
+def _categories(question, seen):
+    """``(value, label)`` for every scale point or choice, then any other values answered"""
+    if question.type == Question.SCALE:
+        scale_min, scale_max, scale_step = question.scale
+        known = [(str(point), str(point)) for point in range(scale_min, scale_max + 1, scale_step)]
+    else:
+        known = list(question.choices)
+    values = {value for value, _ in known}
+    return known + [(value, value) for value in sorted(seen - values)]
+
+
+def answer_pairs(row_id, column_id, start=None, end=None):
+    """
+    ``[(row answer_text, column answer_text, responses)]`` for responses
+    that answered both questions, in one grouped query.
+    """
+    using = Answer.objects.all().db
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    answers = quote(Answer._meta.db_table)
+    response_column = quote(Answer._meta.get_field('response').column)
+    question_column = quote(Answer._meta.get_field('question').column)
+    text = quote(Answer._meta.get_field('answer_text').column)
+
+    joins = ''
+    conditions = [f'r.{question_column} = %s', f'c.{question_column} = %s']
+    params = [row_id, column_id]
+    if start is not None or end is not None:
+        joins = (f' INNER JOIN {quote(Response._meta.db_table)} s'
+                 f' ON s.{quote(Response._meta.pk.column)} = r.{response_column}')
+        submitted = quote(Response._meta.get_field('submitted_at').column)
+        for bound, operator in ((start, '>='), (end, '<=')):
+            if bound is not None:
+                conditions.append(f's.{submitted} {operator} %s')
+                params.append(connection.ops.adapt_datetimefield_value(bound))
+
+    sql = (
+        f'SELECT r.{text}, c.{text}, COUNT(*) FROM {answers} r'
+        f' INNER JOIN {answers} c ON c.{response_column} = r.{response_column}'
+        f'{joins} WHERE {" AND ".join(conditions)}'
+        f' GROUP BY r.{text}, c.{text}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _version(row_id, column_id):
+    # Answers are only ever added or deleted, never edited, so the count and
+    # the highest id change whenever the cross-tab could
+    version = Answer.objects.filter(question_id__in=[row_id, column_id]).aggregate(
+        count=Count('id'), latest=Max('id'))
+    return f"{version['count']}-{version['latest']}"
+
+
+def crosstab(assessment_id, row_id, column_id, start=None, end=None):
+    """
+    Counts of responses by their answer to the ``row_id`` question and to
+    the ``column_id`` question, optionally limited to responses submitted
+    between ``start`` and ``end``. A checkbox answer counts once under each
+    value picked. Archived responses are not included, as their rollups
+    do not record which answers were given together.
+
+    Results are cached in the default cache under the current answer count
+    of the two questions, so new or removed answers are picked up at once.
+    """
+    questions = assessment_questions(assessment_id)
+    row = _question(questions, row_id, 'row')
+    column = _question(questions, column_id, 'column')
+    if row_id == column_id:
+        raise ValidationError({'column': "Must be a different question from row."})
+
+    key = 'crosstab:{}:{}:{}:{}:{}:{}'.format(
+        assessment_id, row_id, column_id,
+        start.isoformat() if start else '', end.isoformat() if end else '',
+        _version(row_id, column_id),
+    )
+    result = cache.get(key)
+    if result is None:
+        result = _tabulate(row, column, answer_pairs(row_id, column_id, start, end))
+        cache.set(key, result, getattr(settings, 'CROSSTAB_CACHE_TTL', 300))
+    return result
+
+
+def _tabulate(row, column, pairs):
+    cells = {}
+    row_totals = {}
+    column_totals = {}
+    total = 0
+    for row_text, column_text, count in pairs:
+        row_values = _values(row, row_text)
+        column_values = _values(column, column_text)
+        total += count
+        for row_value in row_values:
+            row_totals[row_value] = row_totals.get(row_value, 0) + count
+            for column_value in column_values:
+                key = (row_value, column_value)
+                cells[key] = cells.get(key, 0) + count
+        for column_value in column_values:
+            column_totals[column_value] = column_totals.get(column_value, 0) + count
+
+    columns = _categories(column, set(column_totals))
+    rows = []
+    for value, label in _categories(row, set(row_totals)):
+        row_total = row_totals.get(value, 0)
+        counts = [cells.get((value, column_value), 0) for column_value, _ in columns]
+        rows.append({
+            'value': value,
+            'label': label,
+            'total': row_total,
+            'counts': counts,
+            # Share of the row's respondents giving each column answer
+            'percentages': [
+                round(count / row_total * 100, 2) if row_total else 0 for count in counts
+            ],
+        })
+
+    return {
+        'row': {'question_id': row.id, 'question_text': row.text, 'question_type': row.type},
+        'column': {
+            'question_id': column.id, 'question_text': column.text, 'question_type': column.type,
+        },
+        'total': total,
+        'columns': [
+            {'value': value, 'label': label, 'total': column_totals.get(value, 0)}
+            for value, label in columns
+        ],
+        'rows': rows,
+    }
@@ -0,0 +1,99 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_lock = threading.Lock()
+
+
+def executor():
+    # Created on first use so each forked worker gets its own threads
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'BACKGROUND_JOB_WORKERS', 2),
+                    thread_name_prefix='background-job',
+                )
+    return _executor
+
+
+class JobProgress:
+    """Handed to job functions to record how far they have got"""
+
+    def __init__(self, job):
+        self.job = job
+
+    def set_total(self, total):
+        """For jobs that only find out how much work there is once running"""
+        self.job.total = total
+        BackgroundJob.objects.filter(pk=self.job.pk).update(total=total)
+
+    def advance(self, processed, failed=0, errors=()):
+        job = self.job
+        job.processed += processed
+        job.failed += failed
+        room = BackgroundJob.MAX_ERRORS - len(job.errors)
+        if room > 0:
+            job.errors.extend(list(errors)[:room])
+        BackgroundJob.objects.filter(pk=job.pk).update(
+            processed=job.processed, failed=job.failed, errors=job.errors
+        )
+
+
+def _execute(job, func, args, kwargs):
+    job.status = BackgroundJob.RUNNING
+    job.started_at = timezone.now()
+    BackgroundJob.objects.filter(pk=job.pk).update(
+        status=job.status, started_at=job.started_at
+    )
+    try:
+        job.result = func(JobProgress(job), *args, **kwargs) or {}
+        job.status = BackgroundJob.SUCCEEDED
+    except Exception as exc:
+        logger.exception("Background job %s (%s) failed", job.pk, job.kind)
+        job.errors = job.errors + [{'error': str(exc)}]
+        job.status = BackgroundJob.FAILED
+    job.finished_at = timezone.now()
+    BackgroundJob.objects.filter(pk=job.pk).update(
+        status=job.status, result=job.result, errors=job.errors,
+        finished_at=job.finished_at,
+    )
+    return job
+
+
+def _run_in_background(job_id, func, args, kwargs):
+    try:
+        _execute(BackgroundJob.objects.get(pk=job_id), func, args, kwargs)
+    finally:
+        # Worker threads open their own DB connection
+        connection.close()
+
+
+def run_job(kind, created_by, total, func, *args, background=True, **kwargs):
+    """
+    Record a BackgroundJob and run ``func(progress, *args, **kwargs)`` for
+    it. With ``background`` the job is queued on the job pool once the
+    surrounding transaction commits and returned while still pending;
+    otherwise it runs inline and is returned finished.
+
+    Jobs run inside the web process, so a job interrupted by a worker
+    restart stays "running"; start it again to finish the remaining work.
+    """
+    job = BackgroundJob.objects.create(kind=kind, created_by=created_by, total=total)
+    if not background:
+        return _execute(job, func, args, kwargs)
+
+    transaction.on_commit(
+        lambda: executor().submit(_run_in_background, job.pk, func, args, kwargs)
+    )
+    return job
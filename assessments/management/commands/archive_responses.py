@@ -0,0 +1,78 @@
+import gzip
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from assessments.archive import archive_responses, expired_responses, retention_days
+from assessments.models import Assessment
+
+
+class Command(BaseCommand):
+    help = (
+        "Archive responses older than each assessment's retention period "
+        "(retention_days, else RESPONSE_RETENTION_DAYS) to gzipped NDJSON "
+        "files, keep daily rollups for the stats, and delete the raw rows. "
+        "Run it on a schedule (cron / Heroku Scheduler)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--assessment', type=int, action='append', dest='assessments',
+            help="Only archive this assessment (repeatable)")
+        parser.add_argument(
+            '--older-than-days', type=int,
+            help="Override the retention period of the selected assessments")
+        parser.add_argument(
+            '--output-dir', default=getattr(settings, 'RESPONSE_ARCHIVE_DIR', 'archives'),
+            help="Directory the archive files are written to")
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=getattr(settings, 'RESPONSE_ARCHIVE_BATCH_SIZE', 1000),
+            help="Responses archived and deleted per transaction")
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Only report how many responses would be archived")
+
+    def handle(self, *args, **options):
+        if options['older_than_days'] is not None and options['older_than_days'] < 0:
+            raise CommandError("--older-than-days can't be negative.")
+
+        assessments = Assessment.objects.order_by('pk')
+        if options['assessments']:
+            assessments = assessments.filter(pk__in=options['assessments'])
+
+        now = timezone.now()
+        os.makedirs(options['output_dir'], exist_ok=True)
+        total = 0
+        for assessment in assessments:
+            days = options['older_than_days']
+            if days is None:
+                days = retention_days(assessment)
+            if days is None:
+                continue
+
+            cutoff = now - timedelta(days=days)
+            expired = expired_responses(assessment, cutoff)
+            if options['dry_run']:
+                count = expired.count()
+                if count:
+                    self.stdout.write(f"Assessment {assessment.id}: {count} responses to archive")
+                total += count
+                continue
+            if not expired.exists():
+                continue
+
+            path = os.path.join(
+                options['output_dir'],
+                f"assessment-{assessment.id}-{now:%Y%m%dT%H%M%SZ}.ndjson.gz")
+            with gzip.open(path, 'wt', encoding='utf-8') as stream:
+                count = archive_responses(
+                    assessment, cutoff, stream, batch_size=options['batch_size'])
+            self.stdout.write(f"Assessment {assessment.id}: archived {count} responses to {path}")
+            total += count
+
+        verb = "would be archived" if options['dry_run'] else "archived"
+        self.stdout.write(self.style.SUCCESS(f"{total} responses {verb}."))
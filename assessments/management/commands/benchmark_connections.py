@@ -0,0 +1,79 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request database connection overhead with and without "
+        "persistent connections"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500,
+                            help="Simulated requests per mode")
+        parser.add_argument('--conn-max-age', type=int, default=600,
+                            help="CONN_MAX_AGE used for the persistent mode")
+        parser.add_argument('--output',
+                            help="Write the JSON results to this file")
+
+    def handle(self, *args, **options):
+        original = connection.settings_dict['CONN_MAX_AGE']
+        results = {'database': connection.vendor}
+        try:
+            for label, max_age in (('per_request', 0), ('persistent', options['conn_max_age'])):
+                results[label] = self._measure(max_age, options['requests'])
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = original
+
+        saved = results['per_request']['mean_ms'] - results['persistent']['mean_ms']
+        results['saved_per_request_ms'] = round(saved, 3)
+
+        for label in ('per_request', 'persistent'):
+            summary = results[label]
+            self.stdout.write(
+                f"{label:<12} CONN_MAX_AGE={summary['conn_max_age']:<5} "
+                f"mean={summary['mean_ms']:.3f}ms p95={summary['p95_ms']:.3f}ms "
+                f"connections={summary['connections_opened']}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Persistent connections save {saved:.3f}ms per request."))
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+
+    def _measure(self, max_age, requests):
+        """
+        Simulate the request cycle: Django closes stale connections on
+        request_started/request_finished, so with CONN_MAX_AGE=0 every
+        request pays for a new connection (and its init pragmas).
+        """
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        opened = 0
+        timings = []
+
+        for _ in range(requests):
+            started = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            if connection.connection is None:
+                opened += 1
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            request_finished.send(sender=self.__class__)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        return {
+            'conn_max_age': max_age,
+            'requests': requests,
+            'connections_opened': opened,
+            'mean_ms': round(sum(timings) / len(timings), 3),
+            'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 3),
+        }
@@ -0,0 +1,161 @@
+import json
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from assessments.authentication.tokens import CachedRefreshToken
+from assessments.authentication.views import TokenRefreshInstrumentedView
+from .loadtest import percentile
+
+BENCH_USERNAME = 'token-bench'
+SEED_PREFIX = 'bench-'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure /auth/token/refresh/ latency as the outstanding and "
+        "blacklisted token tables grow to the given sizes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='0,100000,1000000',
+                            help="Comma-separated rotated-token counts to measure at")
+        parser.add_argument('--refreshes', type=int, default=200,
+                            help="Refresh requests timed at each size")
+        parser.add_argument('--expired-ratio', type=float, default=0.9,
+                            help="Share of seeded tokens that are already expired")
+        parser.add_argument('--chunk-size', type=int, default=10000,
+                            help="Seeded rows per bulk insert")
+        parser.add_argument('--prune', action='store_true',
+                            help="Run prune_tokens after the last size and measure again")
+        parser.add_argument('--keep-data', action='store_true',
+                            help="Leave the seeded token rows in place")
+        parser.add_argument('--output',
+                            help="Write the JSON results to this file")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError("--sizes must be a comma-separated list of integers")
+
+        user, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+        view = TokenRefreshInstrumentedView.as_view()
+        factory = RequestFactory()
+        results = []
+
+        try:
+            for size in sizes:
+                self._seed(size, options['expired_ratio'], options['chunk_size'])
+                results.append(self._measure(view, factory, user, options['refreshes']))
+
+            if options['prune']:
+                call_command('prune_tokens', stdout=self.stdout)
+                summary = self._measure(view, factory, user, options['refreshes'])
+                summary['pruned'] = True
+                results.append(summary)
+        finally:
+            if not options['keep_data']:
+                self._cleanup(user)
+
+        for summary in results:
+            label = 'after prune' if summary.get('pruned') else f"{summary['rotated_tokens']:>9} rows"
+            self.stdout.write(
+                f"{label:<14} refresh p50={summary['refresh_p50_ms']:.2f}ms "
+                f"p95={summary['refresh_p95_ms']:.2f}ms "
+                f"p99={summary['refresh_p99_ms']:.2f}ms "
+                f"reuse rejected p50={summary['reuse_p50_ms']:.2f}ms"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+
+    def _seed(self, target, expired_ratio, chunk_size):
+        """
+        Top the token tables up to ``target`` rotated tokens, each with an
+        outstanding and a blacklisted row, as refresh rotation leaves them.
+        """
+        existing = OutstandingToken.objects.filter(jti__startswith=SEED_PREFIX).count()
+        now = timezone.now()
+        expired_every = int(1 / (1 - expired_ratio)) if expired_ratio < 1 else 0
+
+        while existing < target:
+            count = min(chunk_size, target - existing)
+            tokens = []
+            for offset in range(existing, existing + count):
+                live = expired_every and offset % expired_every == 0
+                expires_at = now + timedelta(hours=12) if live else now - timedelta(days=1)
+                tokens.append(OutstandingToken(
+                    jti=f"{SEED_PREFIX}{uuid.uuid4().hex}",
+                    token='',
+                    created_at=expires_at - timedelta(days=1),
+                    expires_at=expires_at,
+                ))
+            OutstandingToken.objects.bulk_create(tokens, batch_size=chunk_size)
+            # bulk_create doesn't return ids on every backend, so read them back
+            ids = OutstandingToken.objects.filter(
+                jti__in=[token.jti for token in tokens]
+            ).values_list('id', flat=True)
+            BlacklistedToken.objects.bulk_create(
+                [BlacklistedToken(token_id=token_id) for token_id in ids],
+                batch_size=chunk_size,
+            )
+            existing += count
+
+    def _measure(self, view, factory, user, refreshes):
+        refresh = str(CachedRefreshToken.for_user(user))
+        timings = []
+        reuse_timings = []
+
+        for _ in range(refreshes):
+            started = time.perf_counter()
+            response = self._post(view, factory, refresh)
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"Refresh failed: {response.status_code} {response.data}")
+            rotated, refresh = refresh, response.data['refresh']
+
+            # Replaying the rotated token must be rejected
+            started = time.perf_counter()
+            response = self._post(view, factory, rotated)
+            reuse_timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 401:
+                raise CommandError("A rotated refresh token was accepted")
+
+        timings.sort()
+        reuse_timings.sort()
+        return {
+            'rotated_tokens': OutstandingToken.objects.count(),
+            'refreshes': refreshes,
+            'refresh_p50_ms': round(percentile(timings, 50), 3),
+            'refresh_p95_ms': round(percentile(timings, 95), 3),
+            'refresh_p99_ms': round(percentile(timings, 99), 3),
+            'reuse_p50_ms': round(percentile(reuse_timings, 50), 3),
+        }
+
+    def _post(self, view, factory, refresh):
+        request = factory.post(
+            '/api/auth/token/refresh/', {'refresh': refresh}, content_type='application/json'
+        )
+        return view(request)
+
+    def _cleanup(self, user):
+        tokens = OutstandingToken.objects.filter(
+            Q(jti__startswith=SEED_PREFIX) | Q(user=user)
+        )
+        while True:
+            batch = list(tokens.values_list('id', flat=True)[:10000])
+            if not batch:
+                break
+            BlacklistedToken.objects.filter(token_id__in=batch).delete()
+            OutstandingToken.objects.filter(id__in=batch).delete()
+        user.delete()
@@ -0,0 +1,110 @@
+import random
+import time
+from datetime import timedelta, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from assessments import synthetic
+from assessments.models import ResponseCounter
+from assessments.timeseries import parse_bound
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate reproducible synthetic assessments, responses, answers and "
+        "drafts for scale testing"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--assessments', type=int, default=10,
+                            help="Number of assessments to create")
+        parser.add_argument('--questions', type=int, default=20,
+                            help="Questions per assessment")
+        parser.add_argument('--question-mix',
+                            help="Question type weights, e.g. text:1,multiple_choice:3,checkbox:2,scale:2")
+        parser.add_argument('--choices', type=int, default=5,
+                            help="Choices per multiple choice/checkbox question")
+        parser.add_argument('--responses', type=int, default=10000,
+                            help="Submitted responses per assessment")
+        parser.add_argument('--partials', type=int, default=1000,
+                            help="Draft (partial) responses per assessment")
+        parser.add_argument('--respondents', type=int, default=100000,
+                            help="Size of the respondent email population")
+        parser.add_argument('--completion', type=float, default=0.95,
+                            help="Probability that each question is answered")
+        parser.add_argument('--days', type=int, default=365,
+                            help="Spread submissions over this many days before --end")
+        parser.add_argument('--end',
+                            help="Date or datetime (UTC unless given) the data ends at; "
+                                 "defaults to the start of the current UTC day")
+        parser.add_argument('--owner', default='synthetic-data',
+                            help="Username that owns the generated assessments")
+        parser.add_argument('--seed', type=int, default=1,
+                            help="Random seed; the same seed and --end produce the same data")
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help="Rows per bulk_create batch and transaction")
+
+    def handle(self, *args, **options):
+        try:
+            question_mix = synthetic.parse_question_mix(options['question_mix'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        if not 0 < options['completion'] <= 1:
+            raise CommandError("--completion must be between 0 and 1")
+        if options['end']:
+            try:
+                end = parse_bound(options['end'], dt_timezone.utc)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+        else:
+            end = timezone.now().astimezone(dt_timezone.utc).replace(
+                hour=0, minute=0, second=0, microsecond=0)
+
+        rng = random.Random(options['seed'])
+        chunk_size = options['chunk_size']
+        owner, _ = User.objects.get_or_create(
+            username=options['owner'], defaults={'is_staff': True})
+        start = end - timedelta(days=options['days'])
+        started = time.perf_counter()
+
+        self.stdout.write(f"Creating {options['respondents']} respondents...")
+        respondent_ids = synthetic.create_respondents(options['respondents'], chunk_size)
+
+        answer_total = 0
+        for index in range(options['assessments']):
+            assessment = synthetic.create_assessment(
+                rng, owner, options['questions'], question_mix, options['choices'],
+                title=f"Synthetic assessment {options['seed']}-{index}", published_at=start)
+            specs = synthetic.question_specs([assessment.id])[assessment.id]
+
+            def progress(responses, answers):
+                self.stdout.write(
+                    f"  assessment {assessment.id}: {responses} responses, "
+                    f"{answers} answers ({time.perf_counter() - started:.1f}s)")
+
+            answers, hourly = synthetic.populate_responses(
+                rng, assessment.id, specs, options['responses'], respondent_ids,
+                start, end, options['completion'], chunk_size, progress)
+            answer_total += answers
+
+            ResponseCounter.objects.bulk_create(
+                [
+                    ResponseCounter(assessment_id=assessment.id, bucket=bucket, count=count)
+                    for bucket, count in hourly.items()
+                ],
+                batch_size=chunk_size,
+            )
+
+            synthetic.populate_partial_responses(
+                rng, assessment.id, specs, options['partials'], respondent_ids,
+                start, end, chunk_size)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {options['assessments']} assessments, "
+            f"{options['assessments'] * options['responses']} responses and "
+            f"{answer_total} answers in {elapsed:.1f}s "
+            f"({answer_total / elapsed:.0f} answers/s)."
+        ))
@@ -0,0 +1,311 @@
+import json
+import random
+import secrets
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from assessments import synthetic
+from assessments.models import Assessment
+
+SCENARIOS = ('browse', 'detail', 'autosave', 'submit', 'stats')
+DEFAULT_WEIGHTS = 'browse=40,detail=30,autosave=15,submit=10,stats=5'
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class InProcessTransport:
+    """Sends requests through the Django test client and counts queries"""
+    counts_queries = True
+
+    def __init__(self, admin):
+        self.client = Client()
+        self.admin_client = Client()
+        self.admin_client.force_login(admin)
+
+    def request(self, method, path, payload=None, admin=False):
+        client = self.admin_client if admin else self.client
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(client, method.lower())(
+                path, data=payload, content_type='application/json')
+        body = response.json() if response.get('Content-Type') == 'application/json' else None
+        return response.status_code, body, len(queries.captured_queries)
+
+
+class HTTPTransport:
+    """Sends requests to a running server over HTTP"""
+    counts_queries = False
+
+    def __init__(self, base_url, username, password):
+        self.base_url = base_url.rstrip('/')
+        _, token, _ = self.request('POST', '/api/auth/token/', {
+            'username': username, 'password': password})
+        if not token or 'access' not in token:
+            raise CommandError(f"Could not obtain a token from {self.base_url}")
+        self.token = token['access']
+
+    def request(self, method, path, payload=None, admin=False):
+        data = json.dumps(payload).encode() if payload is not None else None
+        if method == 'GET' and payload:
+            path = f"{path}?{urllib.parse.urlencode(payload)}"
+            data = None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        request.add_header('Content-Type', 'application/json')
+        if admin:
+            request.add_header('Authorization', f"Bearer {getattr(self, 'token', '')}")
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, json.loads(response.read() or 'null'), None
+        except urllib.error.HTTPError as exc:
+            return exc.code, None, None
+
+
+class Scenarios:
+    """The weighted respondent and admin flows replayed by the load test"""
+
+    def __init__(self, transport, rng, specs, async_paths=False):
+        self.transport = transport
+        self.rng = rng
+        self.specs = specs
+        self.async_paths = async_paths
+        self.prefix = '/api/async' if async_paths else '/api'
+        self.drafts = []
+
+    def browse(self):
+        return self.transport.request('GET', '/api/assessments/')
+
+    def detail(self):
+        assessment_id = self.rng.choice(list(self.specs))
+        return self.transport.request(
+            'GET', f'{self.prefix}/assessments/{assessment_id}/',
+            {'respondent_email': synthetic.respondent_email(self.rng)})
+
+    def autosave(self):
+        if self.async_paths:
+            # The async endpoint upserts by assessment and email
+            assessment_id = self.rng.choice(list(self.specs))
+            return self.transport.request('POST', '/api/async/partial-responses/', {
+                'assessment': assessment_id,
+                'respondent_email': synthetic.respondent_email(self.rng, 1000),
+                'answers': synthetic.answers_payload(self.rng, self.specs[assessment_id], 0.5),
+            })
+
+        if self.drafts and self.rng.random() < 0.8:
+            draft_id, assessment_id = self.rng.choice(self.drafts)
+            return self.transport.request(
+                'PATCH', f'/api/partial-responses/{draft_id}/',
+                {'answers': synthetic.answers_payload(self.rng, self.specs[assessment_id], 0.5)})
+
+        assessment_id = self.rng.choice(list(self.specs))
+        result = self.transport.request('POST', '/api/partial-responses/', {
+            'assessment': assessment_id,
+            'respondent_email': synthetic.respondent_email(self.rng),
+            'answers': synthetic.answers_payload(self.rng, self.specs[assessment_id], 0.3),
+        })
+        if result[1] and 'id' in result[1]:
+            self.drafts.append((result[1]['id'], assessment_id))
+        return result
+
+    def submit(self):
+        assessment_id = self.rng.choice(list(self.specs))
+        return self.transport.request('POST', f'{self.prefix}/responses/', {
+            'assessment': assessment_id,
+            'respondent_email': synthetic.respondent_email(self.rng),
+            'answers': synthetic.answers_payload(self.rng, self.specs[assessment_id], 0.95),
+        })
+
+    def stats(self):
+        assessment_id = self.rng.choice(list(self.specs))
+        return self.transport.request(
+            'GET', f'/api/assessments/{assessment_id}/stats/', admin=True)
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay weighted respondent/admin scenarios in-process or against a "
+        "running server and report latency percentiles and throughput"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500,
+                            help="Total number of requests to send")
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help="Number of concurrent clients")
+        parser.add_argument('--weights', default=DEFAULT_WEIGHTS,
+                            help="Scenario weights, e.g. browse=40,submit=10")
+        parser.add_argument('--url',
+                            help="Base URL of a running server (default: in-process test client)")
+        parser.add_argument('--assessments', type=int, default=5,
+                            help="Number of synthetic assessments to create")
+        parser.add_argument('--questions', type=int, default=10,
+                            help="Questions per synthetic assessment")
+        parser.add_argument('--question-mix',
+                            help="Question type weights, e.g. text:1,scale:2")
+        parser.add_argument('--seed', type=int, default=1,
+                            help="Random seed for data and scenario selection")
+        parser.add_argument('--output',
+                            help="Write the JSON results to this file")
+        parser.add_argument('--keep-data', action='store_true',
+                            help="Do not delete the synthetic data afterwards (needs --owner)")
+        parser.add_argument('--owner',
+                            help="Username of an existing user to own the synthetic assessments")
+        parser.add_argument('--async-paths', action='store_true',
+                            help="Use the /api/async/ detail, autosave and submit endpoints")
+        parser.add_argument('--label',
+                            help="Free-form label stored with the results, e.g. wsgi or asgi")
+
+    def handle(self, *args, **options):
+        try:
+            weights = {
+                name: int(weight)
+                for name, weight in (
+                    part.split('=') for part in options['weights'].split(',')
+                )
+            }
+            question_mix = synthetic.parse_question_mix(options['question_mix'])
+        except ValueError as exc:
+            raise CommandError(f"Invalid option: {exc}")
+
+        unknown = set(weights) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        owner = None
+        if options['owner']:
+            owner = User.objects.filter(username=options['owner']).first()
+            if owner is None:
+                raise CommandError(f"No user named {options['owner']}")
+        elif options['keep_data']:
+            # Assessments owned by the temporary admin would go with it
+            raise CommandError("--keep-data needs --owner, as the load test's admin user is always deleted")
+
+        rng = random.Random(options['seed'])
+        # A throwaway staff account with a random password, so no known
+        # credentials are left in the database
+        password = secrets.token_urlsafe(24)
+        admin = User.objects.create_user(
+            username=f"loadtest-{secrets.token_hex(6)}", password=password, is_staff=True)
+        try:
+            assessments = self._create_data(rng, options, question_mix, owner or admin)
+            try:
+                with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                    results = self._run(options, weights, admin, password, assessments)
+            finally:
+                if not options['keep_data']:
+                    Assessment.objects.filter(pk__in=[a.id for a in assessments]).delete()
+        finally:
+            admin.delete()
+
+        self._report(results)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2, default=str)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def _create_data(self, rng, options, question_mix, owner):
+        return [
+            synthetic.create_assessment(
+                rng, owner, options['questions'], question_mix,
+                title=f"Load test assessment {index}")
+            for index in range(options['assessments'])
+        ]
+
+    def _run(self, options, weights, admin, password, assessments):
+        specs = synthetic.question_specs([a.id for a in assessments])
+        names, scenario_weights = zip(*weights.items())
+        remaining = iter(range(options['requests']))
+        lock = threading.Lock()
+        samples = []
+
+        def worker(worker_index):
+            rng = random.Random(f"{options['seed']}-{worker_index}")
+            if options['url']:
+                transport = HTTPTransport(options['url'], admin.username, password)
+            else:
+                transport = InProcessTransport(admin)
+            scenarios = Scenarios(transport, rng, specs, options['async_paths'])
+            try:
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    name = rng.choices(names, scenario_weights)[0]
+                    started = time.perf_counter()
+                    status_code, _, queries = getattr(scenarios, name)()
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        samples.append((name, status_code, elapsed, queries))
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            list(executor.map(worker, range(options['concurrency'])))
+        wall_time = time.perf_counter() - started
+
+        return {
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'label': options['label'],
+                'async_paths': options['async_paths'],
+                'mode': 'http' if options['url'] else 'in-process',
+                'url': options['url'],
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'weights': weights,
+                'seed': options['seed'],
+                'assessments': options['assessments'],
+                'questions': options['questions'],
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'overall': self._summarize(samples, wall_time),
+            'scenarios': {
+                name: self._summarize([s for s in samples if s[0] == name], wall_time)
+                for name in names
+            },
+        }
+
+    def _summarize(self, samples, wall_time):
+        latencies = sorted(elapsed * 1000 for _, _, elapsed, _ in samples)
+        queries = [count for _, _, _, count in samples if count is not None]
+        return {
+            'count': len(samples),
+            'errors': sum(1 for _, status_code, _, _ in samples if status_code >= 400),
+            'rps': round(len(samples) / wall_time, 2) if wall_time else None,
+            'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else None,
+            'p50_ms': round(percentile(latencies, 50), 2) if latencies else None,
+            'p95_ms': round(percentile(latencies, 95), 2) if latencies else None,
+            'p99_ms': round(percentile(latencies, 99), 2) if latencies else None,
+            'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+        }
+
+    def _report(self, results):
+        header = f"{'scenario':<10} {'count':>7} {'errors':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}"
+        self.stdout.write(header)
+        rows = [*results['scenarios'].items(), ('overall', results['overall'])]
+        for name, summary in rows:
+            self.stdout.write(
+                f"{name:<10} {summary['count']:>7} {summary['errors']:>6} "
+                f"{summary['rps'] or 0:>8} {summary['p50_ms'] or 0:>8} "
+                f"{summary['p95_ms'] or 0:>8} {summary['p99_ms'] or 0:>8} "
+                f"{summary['queries_per_request'] if summary['queries_per_request'] is not None else '-':>8}"
+            )
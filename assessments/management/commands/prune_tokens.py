@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding and blacklisted JWTs in batches. Every "
+        "token refresh adds rows to both tables; run this on a schedule "
+        "(cron / Heroku Scheduler) to keep them small."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Number of tokens deleted per transaction")
+        parser.add_argument(
+            '--sleep', type=float, default=0,
+            help="Seconds to pause between batches to let other writers in")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+
+        pruned = blacklisted = 0
+        while True:
+            # Uses the expires_at index added in migration 0011
+            batch = list(
+                expired.order_by('expires_at').values_list('id', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+
+            with transaction.atomic():
+                deleted, _ = BlacklistedToken.objects.filter(token_id__in=batch).delete()
+                OutstandingToken.objects.filter(id__in=batch).delete()
+
+            blacklisted += deleted
+            pruned += len(batch)
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Pruned {pruned} expired tokens ({blacklisted} blacklisted)."))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from assessments.jobs import run_job
+from assessments.models import Assessment, BackgroundJob
+from assessments.purge import purge_assessment
+
+
+class Command(BaseCommand):
+    help = (
+        "Purge assessments that were deleted but whose rows are still "
+        "there, e.g. because the web process restarted mid-purge. Purges "
+        "that are still running in the web process are repeated harmlessly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--assessment', type=int, action='append', dest='assessments',
+            help="Only purge this deleted assessment (repeatable)")
+
+    def handle(self, *args, **options):
+        deleted = Assessment.all_objects.filter(deleted_at__isnull=False)
+        if options['assessments']:
+            deleted = deleted.filter(pk__in=options['assessments'])
+
+        for assessment_id in deleted.order_by('deleted_at').values_list('pk', flat=True):
+            job = run_job(BackgroundJob.ASSESSMENT_PURGE, None, 0,
+                          purge_assessment, assessment_id, background=False)
+            if job.status == BackgroundJob.FAILED:
+                self.stderr.write(f"Assessment {assessment_id}: {job.errors[-1]['error']}")
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Purged assessment {assessment_id}: {job.result['deleted']}"))
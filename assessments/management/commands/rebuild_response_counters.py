@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from assessments.timeseries import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the hourly response counters from stored responses"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--assessment', type=int, action='append', dest='assessment_ids',
+            help="Only rebuild counters for this assessment (repeatable)")
+
+    def handle(self, *args, **options):
+        created = rebuild_counters(options['assessment_ids'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} counter rows."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from assessments.search import assessment_search_backend, index_assessments
+
+
+class Command(BaseCommand):
+    help = "Rebuild the assessment full-text search index"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--assessment', type=int, action='append', dest='assessment_ids',
+            help="Only reindex this assessment (repeatable)")
+        parser.add_argument(
+            '--database', default='default',
+            help="Database alias to rebuild the index on")
+
+    def handle(self, *args, **options):
+        if assessment_search_backend(options['database']) is None:
+            self.stdout.write(self.style.WARNING(
+                "No search index on this database; searches use icontains."))
+            return
+        index_assessments(options['assessment_ids'], using=options['database'])
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
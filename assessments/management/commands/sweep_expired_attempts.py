@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from assessments.models import AssessmentAttempt, PartialResponse
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the drafts left by expired assessment attempts, in batches. "
+        "The attempts themselves are kept for the retention period so the "
+        "respondent can't start the timer again, then deleted too."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-hours', type=int, default=24,
+            help="Only sweep attempts that expired at least this many hours ago")
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Number of attempts whose drafts are deleted per query")
+        parser.add_argument(
+            '--retention-days', type=int,
+            default=getattr(settings, 'ASSESSMENT_ATTEMPT_RETENTION_DAYS', 90),
+            help="Delete attempts (submitted or not) that expired this many days ago")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['older_than_hours'])
+        batch_size = options['batch_size']
+        # Submitting already removes the respondent's draft
+        expired = AssessmentAttempt.objects.filter(expires_at__lt=cutoff, submitted_at__isnull=True)
+
+        swept = 0
+        last_id = 0
+        while True:
+            ids = list(
+                expired.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            # Attempts are keyed on the normalized email, as is Respondent.email
+            deleted, _ = PartialResponse.objects.filter(Exists(
+                AssessmentAttempt.objects.filter(
+                    id__in=ids,
+                    assessment_id=OuterRef('assessment_id'),
+                    respondent_email=OuterRef('respondent__email'),
+                )
+            )).delete()
+            swept += deleted
+
+        # Past retention the respondent may start the assessment afresh
+        removed = 0
+        stale = AssessmentAttempt.objects.filter(
+            expires_at__lt=timezone.now() - timedelta(days=options['retention_days']))
+        while True:
+            ids = list(stale.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            removed += AssessmentAttempt.objects.filter(id__in=ids).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {swept} drafts of expired attempts and {removed} attempts past retention."))
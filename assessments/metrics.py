@@ -0,0 +1,264 @@
+import atexit
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Registry:
+    """
+    Process-local metric values, optionally shared between gunicorn workers.
+
+    When ``METRICS_DIR`` is set each process periodically writes its values
+    to ``metrics_<pid>.json`` in that directory and a scrape merges every
+    file, so counters survive across workers and restarts of a single
+    worker. Without it, only the current process is reported.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._values = {}
+        self._last_flush = 0.0
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+
+    @property
+    def directory(self):
+        path = getattr(settings, 'METRICS_DIR', None)
+        return Path(path) if path else None
+
+    def update(self, metric, labels, func):
+        key = (metric.name, tuple(sorted(labels.items())))
+        with self._lock:
+            # A forked worker must not report the values it inherited
+            if os.getpid() != self._pid:
+                self._reset()
+            self._values[key] = func(self._values.get(key))
+        self.flush()
+
+    def flush(self, force=False):
+        directory = self.directory
+        if directory is None:
+            return
+
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+        now = time.monotonic()
+        with self._lock:
+            if not self._values or (not force and now - self._last_flush < interval):
+                return
+            self._last_flush = now
+            payload = json.dumps({
+                'pid': self._pid,
+                'values': [
+                    [name, [list(label) for label in labels], value]
+                    for (name, labels), value in self._values.items()
+                ],
+            })
+
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-')
+        with os.fdopen(fd, 'w') as tmp:
+            tmp.write(payload)
+        os.replace(tmp_path, directory / f"metrics_{self._pid}.json")
+
+    def collect(self):
+        """Merge the values of every process into one ``{key: value}`` dict"""
+        directory = self.directory
+        if directory is None:
+            with self._lock:
+                return {key: _copy(value) for key, value in self._values.items()}
+
+        self.flush(force=True)
+        merged = {}
+        for path in directory.glob('metrics_*.json'):
+            try:
+                payload = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            alive = _process_alive(payload['pid'])
+            for name, labels, value in payload['values']:
+                metric = self._metrics.get(name)
+                # Gauges describe live state, so dead workers don't count
+                if metric is None or (metric.kind == 'gauge' and not alive):
+                    continue
+                key = (name, tuple(tuple(label) for label in labels))
+                merged[key] = metric.merge(merged.get(key), value)
+        return merged
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        values = self.collect()
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for (name, labels), value in sorted(values.items()):
+                if name == metric.name:
+                    lines.extend(metric.samples(dict(labels), value))
+        return '\n'.join(lines) + '\n'
+
+
+def _copy(value):
+    return json.loads(json.dumps(value))
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(key, str(value).replace('\\', r'\\').replace('"', r'\"'))
+        for key, value in sorted(labels.items())
+    )
+    return '{' + pairs + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry or REGISTRY
+        self.registry.register(self)
+
+    def _labels(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return {key: str(value) for key, value in labels.items()}
+
+    def merge(self, current, value):
+        return value if current is None else current + value
+
+    def samples(self, labels, value):
+        return [f"{self.name}{_format_labels(labels)} {_format_value(value)}"]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        self.registry.update(self, self._labels(labels), lambda current: (current or 0) + amount)
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        self.registry.update(self, self._labels(labels), lambda current: value)
+
+    def inc(self, amount=1, **labels):
+        self.registry.update(self, self._labels(labels), lambda current: (current or 0) + amount)
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+
+        def update(current):
+            current = current or {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            current['buckets'][index] += 1
+            current['sum'] += value
+            current['count'] += 1
+            return current
+
+        self.registry.update(self, self._labels(labels), update)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def merge(self, current, value):
+        if current is None:
+            return _copy(value)
+        current['buckets'] = [a + b for a, b in zip(current['buckets'], value['buckets'])]
+        current['sum'] += value['sum']
+        current['count'] += value['count']
+        return current
+
+    def samples(self, labels, value):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, value['buckets']):
+            cumulative += count
+            bucket_labels = dict(labels, le=_format_value(bound))
+            lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {value['count']}")
+        return lines
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush, force=True)
+
+API_REQUESTS = Counter(
+    'api_requests_total',
+    'Requests handled by instrumented API endpoints.',
+    ['endpoint', 'method', 'status'],
+)
+API_LATENCY = Histogram(
+    'api_request_duration_seconds',
+    'Latency of instrumented API endpoints.',
+    ['endpoint', 'method'],
+)
+
+
+def observe_request(endpoint, method, status, seconds):
+    API_LATENCY.observe(seconds, endpoint=endpoint, method=method)
+    API_REQUESTS.inc(endpoint=endpoint, method=method, status=status)
+
+
+class InstrumentedViewMixin:
+    """Count and time every request to a view under ``metrics_endpoint``"""
+    metrics_endpoint = None
+
+    def dispatch(self, request, *args, **kwargs):
+        started = time.perf_counter()
+        response = super().dispatch(request, *args, **kwargs)
+        observe_request(
+            self.metrics_endpoint, request.method, response.status_code,
+            time.perf_counter() - started)
+        return response
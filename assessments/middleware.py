@@ -0,0 +1,153 @@
+import cProfile
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .routers import ReplicaReadMixin, pin_to_primary
+
+# Collapse literals and IN lists so the same query with different
+# parameters shares a fingerprint
+_FINGERPRINT_PATTERNS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)'), '(?+)'),
+    (re.compile(r'\s+'), ' '),
+]
+
+_buffer_lock = threading.Lock()
+_buffer = deque(maxlen=getattr(settings, 'PROFILING_BUFFER_SIZE', 500))
+
+
+def fingerprint(sql):
+    for pattern, replacement in _FINGERPRINT_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def recent_profiles():
+    """Return a snapshot of the profiled requests, oldest first"""
+    with _buffer_lock:
+        return list(_buffer)
+
+
+class _QueryRecorder:
+    """Database execute wrapper that times every query"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+
+class ProfilingMiddleware:
+    """
+    Record wall time, DB time, query count and repeated queries for each
+    request. Timings are sent in the Server-Timing header and kept in an
+    in-memory ring buffer; a sample of requests can also run under cProfile,
+    with profiles of slow requests dumped to PROFILING_DUMP_DIR.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_CPROFILE_SAMPLE_RATE', 0.0)
+        self.slow_ms = getattr(settings, 'PROFILING_SLOW_REQUEST_MS', 500)
+        self.dump_dir = Path(getattr(settings, 'PROFILING_DUMP_DIR', 'profiles'))
+
+    def __call__(self, request):
+        recorder = _QueryRecorder()
+        profiler = cProfile.Profile() if random.random() < self.sample_rate else None
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            if profiler:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler:
+                    profiler.disable()
+        wall_ms = (time.perf_counter() - started) * 1000
+        db_ms = recorder.duration * 1000
+
+        duplicates = {
+            sql: count for sql, count in recorder.fingerprints.most_common()
+            if count > 1
+        }
+        match = request.resolver_match
+        view = match.view_name if match else None
+
+        response['Server-Timing'] = ', '.join([
+            f'total;dur={wall_ms:.1f}',
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries"',
+            f'app;dur={wall_ms - db_ms:.1f}',
+        ])
+
+        profile_path = None
+        if profiler and wall_ms >= self.slow_ms:
+            profile_path = self._dump(profiler, view)
+
+        with _buffer_lock:
+            _buffer.append({
+                'timestamp': timezone.now().isoformat(),
+                'method': request.method,
+                'path': request.path,
+                'view': view,
+                'status': response.status_code,
+                'wall_ms': round(wall_ms, 2),
+                'db_ms': round(db_ms, 2),
+                'query_count': recorder.count,
+                'duplicate_queries': duplicates,
+                'profile': profile_path,
+            })
+
+        return response
+
+    def _dump(self, profiler, view):
+        self.dump_dir.mkdir(parents=True, exist_ok=True)
+        name = re.sub(r'[^\w.-]', '_', view or 'unresolved')
+        path = self.dump_dir / f"{timezone.now():%Y%m%dT%H%M%S%f}-{name}.prof"
+        profiler.dump_stats(path)
+        return str(path)
+
+
+class ReplicaPinningMiddleware:
+    """
+    After a successful write, pin the user (or client IP) to the primary
+    database for a few seconds so their next reads see the change.
+    """
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if request.method not in self.SAFE_METHODS and response.status_code < 400:
+            match = request.resolver_match
+            view_class = getattr(match.func, 'view_class', None) if match else None
+            # POSTs to read-only analytics views don't write anything
+            if not (view_class and issubclass(view_class, ReplicaReadMixin)):
+                pin_to_primary(request)
+
+        return response
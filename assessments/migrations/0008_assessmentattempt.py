@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0007_delete_userprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssessmentAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('respondent_email', models.EmailField(max_length=254)),
+                ('started_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='assessments.assessment')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('assessment', 'respondent_email'), name='unique_attempt_per_respondent')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:47
+
+from datetime import timezone
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+
+
+def backfill_counters(apps, schema_editor):
+    Response = apps.get_model('assessments', 'Response')
+    ResponseCounter = apps.get_model('assessments', 'ResponseCounter')
+
+    rows = Response.objects.annotate(
+        hour=TruncHour('submitted_at', tzinfo=timezone.utc)
+    ).values('assessment_id', 'hour').annotate(count=Count('id')).order_by()
+
+    ResponseCounter.objects.bulk_create(
+        [
+            ResponseCounter(
+                assessment_id=row['assessment_id'],
+                bucket=row['hour'],
+                count=row['count'],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0008_assessmentattempt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResponseCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='assessments.assessment')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('assessment', 'bucket'), name='unique_counter_per_bucket')],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
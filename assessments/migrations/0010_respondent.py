@@ -0,0 +1,64 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:50
+
+import django.db.models.deletion
+import hashlib
+
+from django.db import migrations, models
+
+
+def link_respondents(apps, schema_editor):
+    Respondent = apps.get_model('assessments', 'Respondent')
+    Response = apps.get_model('assessments', 'Response')
+    PartialResponse = apps.get_model('assessments', 'PartialResponse')
+
+    respondent_ids = {}
+    for model in (Response, PartialResponse):
+        emails = model.objects.values_list('respondent_email', flat=True).distinct().order_by()
+        for email in emails:
+            normalized = email.strip().lower()
+            if normalized not in respondent_ids:
+                respondent, _ = Respondent.objects.get_or_create(
+                    email_hash=hashlib.sha256(normalized.encode()).hexdigest(),
+                    defaults={'email': normalized}
+                )
+                respondent_ids[normalized] = respondent.id
+            model.objects.filter(respondent_email=email).update(
+                respondent_id=respondent_ids[normalized])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0009_responsecounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Respondent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email_hash', models.CharField(max_length=64, unique=True)),
+                ('email', models.EmailField(max_length=254)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='partialresponse',
+            name='respondent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='partial_responses', to='assessments.respondent'),
+        ),
+        migrations.AddField(
+            model_name='response',
+            name='respondent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='responses', to='assessments.respondent'),
+        ),
+        migrations.AddIndex(
+            model_name='partialresponse',
+            index=models.Index(fields=['respondent', '-last_updated'], name='assessments_respond_4bcccc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='response',
+            index=models.Index(fields=['respondent', '-submitted_at'], name='assessments_respond_6ce4f5_idx'),
+        ),
+        migrations.RunPython(link_respondents, migrations.RunPython.noop),
+    ]
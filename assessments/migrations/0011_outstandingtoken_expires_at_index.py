@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Index token_blacklist's outstanding tokens by expiry so prune_tokens can
+    find expired rows without scanning the table. The app doesn't ship this
+    index, so it is created here with raw SQL.
+    """
+
+    dependencies = [
+        ('assessments', '0010_respondent'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS token_blacklist_outstandingtoken_expires_at_idx '
+            'ON token_blacklist_outstandingtoken (expires_at)',
+            'DROP INDEX IF EXISTS token_blacklist_outstandingtoken_expires_at_idx',
+        ),
+    ]
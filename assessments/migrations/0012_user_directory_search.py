@@ -0,0 +1,93 @@
+# Generated by Django 5.1.7 on 2026-10-19 16:14
+
+from django.db import migrations, models
+
+USER_FTS_COLUMNS = 'username, email, first_name, last_name'
+
+SQLITE_FORWARD = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS assessments_user_fts USING fts5("
+    f"{USER_FTS_COLUMNS}, content='auth_user', content_rowid='id', tokenize='trigram')",
+    f"""CREATE TRIGGER IF NOT EXISTS assessments_user_fts_ai AFTER INSERT ON auth_user BEGIN
+        INSERT INTO assessments_user_fts(rowid, {USER_FTS_COLUMNS})
+        VALUES (new.id, new.username, new.email, new.first_name, new.last_name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS assessments_user_fts_ad AFTER DELETE ON auth_user BEGIN
+        INSERT INTO assessments_user_fts(assessments_user_fts, rowid, {USER_FTS_COLUMNS})
+        VALUES ('delete', old.id, old.username, old.email, old.first_name, old.last_name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS assessments_user_fts_au
+    AFTER UPDATE OF {USER_FTS_COLUMNS} ON auth_user BEGIN
+        INSERT INTO assessments_user_fts(assessments_user_fts, rowid, {USER_FTS_COLUMNS})
+        VALUES ('delete', old.id, old.username, old.email, old.first_name, old.last_name);
+        INSERT INTO assessments_user_fts(rowid, {USER_FTS_COLUMNS})
+        VALUES (new.id, new.username, new.email, new.first_name, new.last_name);
+    END""",
+    "INSERT INTO assessments_user_fts(assessments_user_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS assessments_user_fts_au",
+    "DROP TRIGGER IF EXISTS assessments_user_fts_ad",
+    "DROP TRIGGER IF EXISTS assessments_user_fts_ai",
+    "DROP TABLE IF EXISTS assessments_user_fts",
+]
+
+# Django's icontains compiles to UPPER(col::text) LIKE UPPER(...), which
+# these trigram indexes can serve.
+POSTGRES_FORWARD = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f'CREATE INDEX IF NOT EXISTS auth_user_{column}_trgm_idx '
+    f'ON auth_user USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+    for column in USER_FTS_COLUMNS.split(', ')
+]
+
+POSTGRES_REVERSE = [
+    f'DROP INDEX IF EXISTS auth_user_{column}_trgm_idx'
+    for column in USER_FTS_COLUMNS.split(', ')
+]
+
+
+def sqlite_supports_trigram(connection):
+    # The trigram tokenizer arrived in SQLite 3.34
+    return connection.Database.sqlite_version_info >= (3, 34, 0)
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite' and sqlite_supports_trigram(connection):
+        statements = SQLITE_FORWARD
+    elif connection.vendor == 'postgresql':
+        statements = POSTGRES_FORWARD
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0011_outstandingtoken_expires_at_index'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='respondent',
+            name='email',
+            field=models.EmailField(db_index=True, max_length=254),
+        ),
+        # The admin user directory is ordered newest first
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS auth_user_date_joined_id_idx '
+            'ON auth_user (date_joined, id)',
+            'DROP INDEX IF EXISTS auth_user_date_joined_id_idx',
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,73 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS assessments_assessment_fts USING fts5("
+    "title, description, questions, tokenize='porter unicode61 remove_diacritics 2')",
+    """INSERT INTO assessments_assessment_fts(rowid, title, description, questions)
+    SELECT a.id, a.title, a.description, COALESCE((
+        SELECT group_concat(q.question_text, char(10))
+        FROM assessments_question q WHERE q.assessment_id = a.id
+    ), '')
+    FROM assessments_assessment a""",
+]
+
+SQLITE_REVERSE = [
+    "DROP TABLE IF EXISTS assessments_assessment_fts",
+]
+
+POSTGRES_FORWARD = [
+    """CREATE TABLE IF NOT EXISTS assessments_assessment_search (
+        assessment_id bigint PRIMARY KEY,
+        title text NOT NULL,
+        description text NOT NULL,
+        questions text NOT NULL,
+        document tsvector NOT NULL
+    )""",
+    """CREATE INDEX IF NOT EXISTS assessments_assessment_search_document_idx
+    ON assessments_assessment_search USING gin (document)""",
+    """INSERT INTO assessments_assessment_search
+        (assessment_id, title, description, questions, document)
+    SELECT a.id, a.title, a.description, q.text,
+        setweight(to_tsvector('english', a.title), 'A')
+        || setweight(to_tsvector('english', a.description), 'B')
+        || setweight(to_tsvector('english', q.text), 'C')
+    FROM assessments_assessment a
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(string_agg(question_text, E'\\n' ORDER BY "order"), '') AS text
+        FROM assessments_question WHERE assessment_id = a.id
+    ) q
+    ON CONFLICT (assessment_id) DO NOTHING""",
+]
+
+POSTGRES_REVERSE = [
+    "DROP TABLE IF EXISTS assessments_assessment_search",
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text index over assessment titles, descriptions and question text
+    (see assessments/search.py). Kept up to date by assessments/signals.py.
+    """
+
+    dependencies = [
+        ('assessments', '0012_user_directory_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.7 on 2026-10-19 16:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def publish_existing(apps, schema_editor):
+    # Everything created before versioning is already live
+    Assessment = apps.get_model('assessments', 'Assessment')
+    Assessment.objects.filter(published_at__isnull=True).update(published_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0014_backgroundjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='clones', to='assessments.assessment'),
+        ),
+        migrations.AddField(
+            model_name='assessment',
+            name='published_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='assessment',
+            name='root',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='later_versions', to='assessments.assessment'),
+        ),
+        migrations.AddField(
+            model_name='assessment',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddConstraint(
+            model_name='assessment',
+            constraint=models.UniqueConstraint(fields=('root', 'version'), name='unique_version_per_assessment'),
+        ),
+        migrations.RunPython(publish_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-19 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0015_assessment_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='backgroundjob',
+            name='kind',
+            field=models.CharField(choices=[('user_activate', 'Activate users'), ('user_deactivate', 'Deactivate users'), ('user_delete', 'Delete users'), ('user_import', 'Import users'), ('assessment_purge', 'Purge deleted assessment')], max_length=30),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.7 on 2026-10-19 16:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0016_assessment_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='retention_days',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='AnswerRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('answer_text', models.CharField(blank=True, max_length=255)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='assessments.question')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('question', 'day', 'answer_text'), name='unique_answer_rollup_per_day')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResponseRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='assessments.assessment')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('assessment', 'day'), name='unique_response_rollup_per_day')],
+            },
+        ),
+    ]
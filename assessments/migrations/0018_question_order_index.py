@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-19 16:33
+
+from django.db import migrations, models
+
+ORDER_GAP = 1024
+
+
+def space_question_order(apps, schema_editor):
+    # Renumber ORDER_GAP apart, keeping the current order and breaking ties by id
+    Question = apps.get_model('assessments', 'Question')
+    assessment_ids = Question.objects.values_list('assessment_id', flat=True).distinct()
+    for assessment_id in assessment_ids.order_by():
+        questions = list(Question.objects.filter(assessment_id=assessment_id).order_by('order', 'id'))
+        for position, question in enumerate(questions, start=1):
+            question.order = position * ORDER_GAP
+        Question.objects.bulk_update(questions, ['order'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0017_response_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['assessment', 'order'], name='assessments_assessm_815df6_idx'),
+        ),
+        migrations.RunPython(space_question_order, migrations.RunPython.noop),
+    ]
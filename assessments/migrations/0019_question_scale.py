@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-19 16:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0018_question_order_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='scale_max',
+            field=models.IntegerField(default=5),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='scale_min',
+            field=models.IntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='scale_step',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.7 on 2026-10-19 16:46
+
+from django.db import migrations, models
+
+
+def normalize_attempt_emails(apps, schema_editor):
+    # Attempts are now keyed on the normalized email; where several differ
+    # only by case, the earliest start wins
+    AssessmentAttempt = apps.get_model('assessments', 'AssessmentAttempt')
+    kept = {}
+    duplicates = []
+    for attempt in AssessmentAttempt.objects.order_by('started_at', 'id'):
+        key = (attempt.assessment_id, attempt.respondent_email.strip().lower())
+        if key in kept:
+            duplicates.append(attempt.id)
+        else:
+            kept[key] = attempt
+    AssessmentAttempt.objects.filter(id__in=duplicates).delete()
+
+    for (_, email), attempt in kept.items():
+        if attempt.respondent_email != email:
+            attempt.respondent_email = email
+            attempt.save(update_fields=['respondent_email'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0019_question_scale'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentattempt',
+            name='submitted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(normalize_attempt_emails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.7 on 2026-10-19 16:51
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def remove_duplicate_drafts(apps, schema_editor):
+    # Keep each respondent's most recently saved draft per assessment
+    PartialResponse = apps.get_model('assessments', 'PartialResponse')
+    duplicated = list(
+        PartialResponse.objects.filter(respondent__isnull=False)
+        .values('assessment_id', 'respondent_id')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+    )
+    for group in duplicated:
+        drafts = PartialResponse.objects.filter(
+            assessment_id=group['assessment_id'], respondent_id=group['respondent_id'])
+        keep = drafts.order_by('-last_updated', '-id').values_list('id', flat=True).first()
+        drafts.exclude(id=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0020_attempt_submitted_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_drafts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='partialresponse',
+            constraint=models.UniqueConstraint(fields=('assessment', 'respondent'), name='unique_draft_per_respondent'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-19 16:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0021_unique_draft_per_respondent'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='assessment',
+            name='root',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='later_versions', to='assessments.assessment'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0022_assessment_root_do_nothing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='responserollup',
+            name='first_submitted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='responserollup',
+            name='last_submitted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
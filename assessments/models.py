@@ -1,8 +1,27 @@
+import hashlib
+from datetime import timedelta
+
 from django.db import models
 from django.contrib.auth.models import User
 
 
+class LiveAssessmentManager(models.Manager):
+    """Assessments that haven't been deleted"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Assessment(models.Model):
+    """
+    One version of an assessment. Versions of the same assessment share a
+    ``root`` (the first version, whose own ``root`` is empty). A version is
+    a draft until ``published_at`` is set; after that its questions and
+    choices are frozen and changes go into a clone (see assessments/versioning.py).
+
+    Deleting sets ``deleted_at`` and leaves the rows to a background purge
+    (see assessments/purge.py); ``objects`` hides deleted assessments.
+    """
     title = models.CharField(max_length=200)
     description = models.TextField()
     time_limit_minutes = models.PositiveIntegerField(null=True, blank=True)
@@ -11,6 +30,38 @@ class Assessment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
+    version = models.PositiveIntegerField(default=1)
+    # Deleting the first version re-roots the others (signals.detach_deleted_version)
+    root = models.ForeignKey(
+        'self', on_delete=models.DO_NOTHING, null=True, blank=True,
+        related_name='later_versions')
+    parent = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='clones')
+    published_at = models.DateTimeField(null=True, blank=True)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    # Responses older than this are archived (manage.py archive_responses);
+    # empty keeps them forever
+    retention_days = models.PositiveIntegerField(null=True, blank=True)
+
+    objects = LiveAssessmentManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['root', 'version'],
+                name='unique_version_per_assessment'),
+        ]
+
+    @property
+    def family_id(self):
+        """Id shared by every version of this assessment"""
+        return self.root_id or self.pk
+
+    @property
+    def is_published(self):
+        return self.published_at is not None
 
 
 class Question(models.Model):
@@ -30,8 +81,20 @@ class Question(models.Model):
         Assessment, on_delete=models.CASCADE, related_name='questions')
     question_text = models.TextField()
     question_type = models.CharField(max_length=20, choices=QUESTION_TYPES)
+    # Spaced apart so single moves touch one row (see assessments/ordering.py)
     order = models.IntegerField(default=0)
     required = models.BooleanField(default=True)
+    # Answer values allowed for scale questions: scale_min, scale_min +
+    # scale_step, ... up to scale_max, at most MAX_SCALE_STEPS steps apart
+    MAX_SCALE_STEPS = 100
+    scale_min = models.IntegerField(default=1)
+    scale_max = models.IntegerField(default=5)
+    scale_step = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['assessment', 'order']),
+        ]
 
 
 class Choice(models.Model):
@@ -41,11 +104,75 @@ class Choice(models.Model):
     value = models.CharField(max_length=100)
 
 
-class Response(models.Model):
+class Respondent(models.Model):
+    """
+    One row per distinct respondent, keyed by a hash of the normalized
+    email so responses and drafts can be looked up case-insensitively.
+    """
+    email_hash = models.CharField(max_length=64, unique=True)
+    email = models.EmailField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @staticmethod
+    def normalize_email(email):
+        return email.strip().lower()
+
+    @classmethod
+    def hash_email(cls, email):
+        return hashlib.sha256(cls.normalize_email(email).encode()).hexdigest()
+
+    @classmethod
+    def for_email(cls, email):
+        respondent, _ = cls.objects.get_or_create(
+            email_hash=cls.hash_email(email),
+            defaults={'email': cls.normalize_email(email)}
+        )
+        return respondent
+
+    @classmethod
+    async def afor_email(cls, email):
+        respondent, _ = await cls.objects.aget_or_create(
+            email_hash=cls.hash_email(email),
+            defaults={'email': cls.normalize_email(email)}
+        )
+        return respondent
+
+
+class RespondentLinkMixin:
+    """
+    Keep ``respondent`` in step with ``respondent_email`` on save. The
+    Respondent is only looked up for new rows or when the email changed,
+    so resaving a draft costs no extra queries. ``bulk_create`` and
+    ``update`` skip ``save``; callers using them must set ``respondent``
+    themselves (see assessments/synthetic.py).
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_email = instance.__dict__.get('respondent_email')
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.respondent_id is None or self.respondent_email != getattr(self, '_saved_email', None):
+            self.respondent = Respondent.for_email(self.respondent_email)
+        super().save(*args, **kwargs)
+        self._saved_email = self.respondent_email
+
+
+class Response(RespondentLinkMixin, models.Model):
     assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE)
     respondent_email = models.EmailField()
+    respondent = models.ForeignKey(
+        Respondent, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='responses')
     submitted_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['respondent', '-submitted_at']),
+        ]
+
 
 class Answer(models.Model):
     response = models.ForeignKey(
@@ -54,8 +181,199 @@ class Answer(models.Model):
     answer_text = models.TextField()
 
 
-class PartialResponse(models.Model):
+class PartialResponse(RespondentLinkMixin, models.Model):
+    """A respondent's unsubmitted answers; at most one per assessment"""
     assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE)
     respondent_email = models.EmailField()
+    respondent = models.ForeignKey(
+        Respondent, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='partial_responses')
     answers = models.JSONField()  # Stores incomplete answers
-    last_updated = models.DateTimeField(auto_now=True)
\ No newline at end of file
+    last_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['respondent', '-last_updated']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['assessment', 'respondent'],
+                name='unique_draft_per_respondent'),
+        ]
+
+    @classmethod
+    def upsert(cls, assessment, respondent_email, answers):
+        """Create or update the respondent's draft; returns (draft, created)"""
+        return cls.objects.update_or_create(
+            assessment=assessment,
+            respondent=Respondent.for_email(respondent_email),
+            defaults={'respondent_email': respondent_email, 'answers': answers},
+        )
+
+    @classmethod
+    async def aupsert(cls, assessment, respondent_email, answers):
+        return await cls.objects.aupdate_or_create(
+            assessment=assessment,
+            respondent=await Respondent.afor_email(respondent_email),
+            defaults={'respondent_email': respondent_email, 'answers': answers},
+        )
+
+
+class AssessmentAttempt(models.Model):
+    """
+    Records when a respondent opened a timed assessment so the time limit
+    can be enforced on submission. Started by opening the assessment with
+    an email, by the first autosave or by the submission itself. Keyed on
+    the normalized email, and kept once used (``submitted_at``) or expired
+    so a respondent gets one timer per assessment, until
+    ``manage.py sweep_expired_attempts`` removes it after
+    ASSESSMENT_ATTEMPT_RETENTION_DAYS.
+    """
+    assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE)
+    respondent_email = models.EmailField()
+    started_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+    submitted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['assessment', 'respondent_email'],
+                name='unique_attempt_per_respondent'),
+        ]
+
+    @classmethod
+    def _start_kwargs(cls, assessment, respondent_email, now):
+        return {
+            'assessment': assessment,
+            'respondent_email': Respondent.normalize_email(respondent_email),
+            'defaults': {
+                'started_at': now,
+                'expires_at': now + timedelta(minutes=assessment.time_limit_minutes),
+            },
+        }
+
+    @classmethod
+    def start(cls, assessment, respondent_email, now):
+        """Get or create the attempt, keeping the original start time"""
+        attempt, _ = cls.objects.get_or_create(
+            **cls._start_kwargs(assessment, respondent_email, now))
+        return attempt
+
+    @classmethod
+    async def astart(cls, assessment, respondent_email, now):
+        attempt, _ = await cls.objects.aget_or_create(
+            **cls._start_kwargs(assessment, respondent_email, now))
+        return attempt
+
+
+class ResponseCounter(models.Model):
+    """
+    Number of responses submitted to an assessment per UTC hour. Coarser
+    buckets (day, week) are derived from these rows at query time.
+    """
+    assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE)
+    bucket = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['assessment', 'bucket'],
+                name='unique_counter_per_bucket'),
+        ]
+
+
+class ResponseRollup(models.Model):
+    """
+    Responses to an assessment per UTC day that have been archived, so
+    stats still count them once the raw rows are gone.
+    """
+    assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE)
+    day = models.DateField()
+    responses = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    # Earliest and latest submission archived into this day
+    first_submitted_at = models.DateTimeField(null=True, blank=True)
+    last_submitted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['assessment', 'day'],
+                name='unique_response_rollup_per_day'),
+        ]
+
+
+class AnswerRollup(models.Model):
+    """
+    Archived answers per question and UTC day. The row with an empty
+    ``answer_text`` counts every answer; the others count each chosen value
+    (each ticked box for checkbox questions). Free text isn't kept.
+    """
+    ALL_ANSWERS = ''
+
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    day = models.DateField()
+    answer_text = models.CharField(max_length=255, blank=True)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['question', 'day', 'answer_text'],
+                name='unique_answer_rollup_per_day'),
+        ]
+
+
+class BackgroundJob(models.Model):
+    """
+    A long-running admin operation executed off the request thread (see
+    assessments/jobs.py). Clients poll it for progress.
+    """
+    USER_ACTIVATE = 'user_activate'
+    USER_DEACTIVATE = 'user_deactivate'
+    USER_DELETE = 'user_delete'
+    USER_IMPORT = 'user_import'
+    ASSESSMENT_PURGE = 'assessment_purge'
+
+    KINDS = [
+        (USER_ACTIVATE, 'Activate users'),
+        (USER_DEACTIVATE, 'Deactivate users'),
+        (USER_DELETE, 'Delete users'),
+        (USER_IMPORT, 'Import users'),
+        (ASSESSMENT_PURGE, 'Purge deleted assessment'),
+    ]
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    STATUSES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KINDS)
+    status = models.CharField(max_length=20, choices=STATUSES, default=PENDING)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    # Only the first errors are kept so a bad import can't bloat the row
+    MAX_ERRORS = 100
+
+    @property
+    def progress(self):
+        if not self.total:
+            return 100.0 if self.status == self.SUCCEEDED else 0.0
+        return round(self.processed / self.total * 100, 1)
@@ -0,0 +1,97 @@
+# Question order values are spaced ORDER_GAP apart so a question can be
+# moved between two others by giving it a value in the gap, touching only
+# that row. When a gap runs out the assessment's questions are renumbered.
+from django.db import transaction
+from django.db.models import Max
+from rest_framework.exceptions import ValidationError
+
+from .models import Assessment, Question
+from .question_metadata import invalidate
+from .versioning import ensure_draft
+
+ORDER_GAP = 1024
+
+
+def next_order(assessment):
+    """Order value that puts a new question after the existing ones"""
+    last = assessment.questions.aggregate(last=Max('order'))['last']
+    return ORDER_GAP if last is None else last + ORDER_GAP
+
+
+def _lock(assessment):
+    """Serialise reorders of one assessment and refuse published versions"""
+    assessment = Assessment.objects.select_for_update().get(pk=assessment.pk)
+    ensure_draft(assessment)
+    return assessment
+
+
+def _renumber(questions):
+    """Space the questions ORDER_GAP apart, saving only the rows that change"""
+    changed = []
+    for position, question in enumerate(questions, start=1):
+        if question.order != position * ORDER_GAP:
+            question.order = position * ORDER_GAP
+            changed.append(question)
+    Question.objects.bulk_update(changed, ['order'], batch_size=500)
+    return changed
+
+
+@transaction.atomic
+def reorder_questions(assessment, question_ids):
+    """
+    Put the assessment's questions in the order given. ``question_ids``
+    must list every question of the assessment exactly once. Returns the
+    questions in their new order.
+    """
+    _lock(assessment)
+    questions = Question.objects.filter(assessment=assessment).in_bulk()
+    if len(question_ids) != len(set(question_ids)) or set(question_ids) != set(questions):
+        raise ValidationError({
+            'question_ids': "Must list every question of the assessment exactly once."
+        })
+
+    ordered = [questions[question_id] for question_id in question_ids]
+    _renumber(ordered)
+    # bulk_update skips the signals that clear the metadata cache
+    invalidate(assessment.pk)
+    return ordered
+
+
+@transaction.atomic
+def move_question(assessment, question_id, after_id=None):
+    """
+    Move one question to just after ``after_id``, or to the top when that
+    is None. Usually only the moved row is updated. Returns all questions
+    in their new order.
+    """
+    _lock(assessment)
+    questions = list(Question.objects.filter(assessment=assessment).order_by('order', 'id'))
+    by_id = {question.id: question for question in questions}
+    if question_id not in by_id:
+        raise ValidationError({'question_id': "Not a question of this assessment."})
+    if after_id is not None and (after_id not in by_id or after_id == question_id):
+        raise ValidationError({'after': "Not another question of this assessment."})
+
+    moved = by_id[question_id]
+    others = [question for question in questions if question.id != question_id]
+    index = 0 if after_id is None else others.index(by_id[after_id]) + 1
+    ordered = others[:index] + [moved] + others[index:]
+
+    before = others[index - 1].order if index > 0 else None
+    after = others[index].order if index < len(others) else None
+    if before is None and after is None:
+        moved.order = ORDER_GAP
+    elif before is None:
+        moved.order = after - ORDER_GAP
+    elif after is None:
+        moved.order = before + ORDER_GAP
+    elif after - before > 1:
+        moved.order = (before + after) // 2
+    else:
+        # No room left between the neighbours (or duplicate orders)
+        _renumber(ordered)
+        invalidate(assessment.pk)
+        return ordered
+
+    moved.save(update_fields=['order'])
+    return ordered
@@ -0,0 +1,117 @@
+# Deleting an assessment through the ORM makes Django collect every
+# dependent Response, Answer and PartialResponse in Python before issuing
+# a single DELETE. The admin endpoints instead mark the assessment deleted
+# and leave the rows to purge_assessment, which runs as a BackgroundJob and
+# removes them with raw DELETEs, children before parents, a batch at a time.
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .jobs import run_job
+from .question_metadata import invalidate
+from .models import (
+    Answer, AnswerRollup, Assessment, AssessmentAttempt, BackgroundJob, Choice,
+    PartialResponse, Question, Response as AssessmentResponse, ResponseCounter,
+    ResponseRollup,
+)
+from .search import index_assessments
+from .serializers import BackgroundJobSerializer
+from .versioning import detach_versions
+
+
+def _plan(assessment_id):
+    """
+    ``(parent rows, [(model, column), ...])`` pairs: for each batch of
+    parent ids the tables are cleared in the order given.
+    """
+    return [
+        (AssessmentResponse.objects.filter(assessment_id=assessment_id),
+         [(Answer, 'response'), (AssessmentResponse, 'id')]),
+        # Answers are normally gone with their responses; this catches strays
+        (Question.objects.filter(assessment_id=assessment_id),
+         [(Answer, 'question'), (AnswerRollup, 'question'), (Choice, 'question'),
+          (Question, 'id')]),
+        (PartialResponse.objects.filter(assessment_id=assessment_id),
+         [(PartialResponse, 'id')]),
+        (AssessmentAttempt.objects.filter(assessment_id=assessment_id),
+         [(AssessmentAttempt, 'id')]),
+        (ResponseCounter.objects.filter(assessment_id=assessment_id),
+         [(ResponseCounter, 'id')]),
+        (ResponseRollup.objects.filter(assessment_id=assessment_id),
+         [(ResponseRollup, 'id')]),
+    ]
+
+
+def raw_delete(cursor, model, field_name, ids):
+    """Raw DELETE: no cascade collector, no signals"""
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    column = quote(model._meta.get_field(field_name).column)
+    placeholders = ', '.join(['%s'] * len(ids))
+    cursor.execute(f'DELETE FROM {table} WHERE {column} IN ({placeholders})', ids)
+    return cursor.rowcount
+
+
+def _batches(queryset, size):
+    # Each batch is deleted before the next is read, so always take the first
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:size])
+        if not ids:
+            return
+        yield ids
+
+
+def purge_assessment(progress, assessment_id):
+    """
+    Remove a deleted assessment and everything that hangs off it. Each
+    batch is its own transaction so locks are held briefly; an interrupted
+    purge can be picked up again by ``manage.py purge_deleted_assessments``.
+    """
+    if not Assessment.all_objects.filter(pk=assessment_id, deleted_at__isnull=False).exists():
+        raise ValueError(f"Assessment {assessment_id} is not marked deleted.")
+
+    size = getattr(settings, 'ASSESSMENT_PURGE_BATCH_SIZE', 1000)
+    pause = getattr(settings, 'ASSESSMENT_PURGE_PAUSE', 0)
+    plan = _plan(assessment_id)
+    progress.set_total(sum(parents.count() for parents, _ in plan))
+
+    deleted = {}
+    for parents, steps in plan:
+        for ids in _batches(parents, size):
+            with transaction.atomic(), connection.cursor() as cursor:
+                for model, field_name in steps:
+                    count = raw_delete(cursor, model, field_name, ids)
+                    label = model._meta.label
+                    deleted[label] = deleted.get(label, 0) + count
+            progress.advance(len(ids))
+            if pause:
+                time.sleep(pause)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        detach_versions(assessment_id)
+        deleted[Assessment._meta.label] = raw_delete(cursor, Assessment, 'id', [assessment_id])
+    index_assessments([assessment_id])
+    invalidate(assessment_id)
+
+    return {'deleted': deleted}
+
+
+def delete_assessment(assessment, user):
+    """Hide an assessment right away and queue the purge of its rows"""
+    Assessment.all_objects.filter(pk=assessment.pk).update(deleted_at=timezone.now())
+    return run_job(BackgroundJob.ASSESSMENT_PURGE, user, 0, purge_assessment, assessment.pk)
+
+
+class SoftDeleteAssessmentMixin:
+    """
+    ``destroy`` for the admin assessment views: responds 202 with the purge
+    job instead of deleting inline.
+    """
+
+    def destroy(self, request, *args, **kwargs):
+        job = delete_assessment(self.get_object(), request.user)
+        return Response(BackgroundJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
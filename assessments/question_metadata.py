@@ -0,0 +1,53 @@
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import transaction
+
+from .authentication.revocation import TTLCache
+from .models import Choice, Question
+
+# ``choices`` is a tuple of (value, label) pairs in creation order,
+# ``labels`` maps each value to its label and ``scale`` is
+# (scale_min, scale_max, scale_step)
+QuestionInfo = namedtuple(
+    'QuestionInfo', ['id', 'text', 'type', 'order', 'choices', 'labels', 'scale'])
+
+metadata_cache = TTLCache(
+    getattr(settings, 'QUESTION_METADATA_CACHE_TTL', 300),
+    getattr(settings, 'QUESTION_METADATA_CACHE_SIZE', 1000),
+)
+
+
+def _load(assessment_id):
+    choices = {}
+    for question_id, value, label in Choice.objects.filter(
+        question__assessment_id=assessment_id
+    ).order_by('id').values_list('question_id', 'value', 'choice_text'):
+        choices.setdefault(question_id, []).append((value, label))
+
+    questions = {}
+    for question_id, text, question_type, order, *scale in Question.objects.filter(
+        assessment_id=assessment_id
+    ).order_by('order', 'id').values_list(
+        'id', 'question_text', 'question_type', 'order', 'scale_min', 'scale_max', 'scale_step'
+    ):
+        pairs = tuple(choices.get(question_id, ()))
+        questions[question_id] = QuestionInfo(
+            question_id, text, question_type, order, pairs, dict(pairs), tuple(scale))
+    return questions
+
+
+def assessment_questions(assessment_id):
+    """
+    ``{question_id: QuestionInfo}`` for an assessment, in question order.
+    Loaded with two queries and cached per process; treat it as read-only.
+    Changes made through the ORM clear it (see assessments/signals.py);
+    other processes pick them up within QUESTION_METADATA_CACHE_TTL.
+    """
+    return metadata_cache.get_or_set(assessment_id, lambda: _load(assessment_id))
+
+
+def invalidate(assessment_id):
+    metadata_cache.discard(assessment_id)
+    # A reader that loaded before the commit may have cached the old rows
+    transaction.on_commit(lambda: metadata_cache.discard(assessment_id))
@@ -0,0 +1,72 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def replica_alias():
+    """Return the configured replica alias, or None when there is no replica"""
+    alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def _pin_key(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f"replica-pin:user:{user.pk}"
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    address = forwarded.split(',')[0].strip() or request.META.get('REMOTE_ADDR', '')
+    return f"replica-pin:ip:{address}"
+
+
+def pin_to_primary(request):
+    """Send this client's reads to the primary for REPLICA_STICKY_SECONDS"""
+    cache.set(_pin_key(request), True, getattr(settings, 'REPLICA_STICKY_SECONDS', 10))
+
+
+def is_pinned(request):
+    return bool(cache.get(_pin_key(request)))
+
+
+class ReplicaRouter:
+    """
+    Route reads to the replica only inside views that opt in with
+    ReplicaReadMixin; everything else, and all writes, use the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Instances loaded from the replica must still be saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Serve a read-only view from the replica, unless the requesting user or
+    client wrote something recently (read-your-writes).
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if replica_alias() and not is_pinned(request):
+            self._replica_token = _use_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _use_replica.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,112 @@
+# Summary statistics for scale questions. Answers are counted per value in
+# SQL first, so the work here is on a (value, count) table no larger than
+# the scale. NumPy does the weighted arithmetic when it is installed; the
+# pure Python path gives the same results without it.
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Net-Promoter-style groups by position on the scale: on 0-10 these are the
+# usual 9-10 promoters, 7-8 passives and 0-6 detractors
+PROMOTER_FROM = 0.9
+PASSIVE_FROM = 0.7
+
+
+def value_counts(pairs):
+    """``(answer_text, count)`` pairs to ``{value: count}``, skipping non-numbers"""
+    counts = {}
+    for text, count in pairs:
+        try:
+            value = int(text)
+        except (TypeError, ValueError):
+            continue
+        counts[value] = counts.get(value, 0) + count
+    return counts
+
+
+def _python_stats(values, weights):
+    total = sum(weights)
+    mean = sum(value * weight for value, weight in zip(values, weights)) / total
+    variance = sum(weight * (value - mean) ** 2 for value, weight in zip(values, weights)) / total
+
+    percentiles = {}
+    running = 0
+    pending = list(PERCENTILES)
+    for value, weight in zip(values, weights):
+        running += weight
+        while pending and running >= pending[0] / 100 * total:
+            percentiles[pending.pop(0)] = value
+    return mean, math.sqrt(variance), percentiles
+
+
+def _numpy_stats(values, weights):
+    values = np.asarray(values, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    mean = np.average(values, weights=weights)
+    variance = np.average((values - mean) ** 2, weights=weights)
+
+    cumulative = np.cumsum(weights)
+    thresholds = np.array(PERCENTILES) / 100 * cumulative[-1]
+    positions = np.searchsorted(cumulative, thresholds, side='left')
+    percentiles = {
+        percentile: int(values[position])
+        for percentile, position in zip(PERCENTILES, positions)
+    }
+    return float(mean), math.sqrt(variance), percentiles
+
+
+def scale_statistics(counts, scale_min, scale_max, scale_step=1):
+    """
+    Summarise ``{value: count}`` for a scale question: mean, median,
+    standard deviation, nearest-rank percentiles, a histogram over the
+    scale points and a Net-Promoter-style breakdown. Answers outside the
+    scale are left out and counted in ``out_of_range``.
+    """
+    in_range = sorted(
+        (value, count) for value, count in counts.items()
+        if scale_min <= value <= scale_max and count > 0
+    )
+    answered = sum(count for _, count in in_range)
+    summary = {
+        'count': answered,
+        'out_of_range': sum(counts.values()) - answered,
+        'histogram': {
+            str(point): counts.get(point, 0)
+            for point in range(scale_min, scale_max + 1, scale_step)
+        },
+    }
+    if not answered:
+        summary.update(mean=None, median=None, std_dev=None, percentiles={}, nps=None)
+        return summary
+
+    values, weights = zip(*in_range)
+    compute = _numpy_stats if np is not None else _python_stats
+    mean, std_dev, percentiles = compute(values, weights)
+
+    promoters = passives = 0
+    for value, count in in_range:
+        position = (value - scale_min) / (scale_max - scale_min)
+        if position >= PROMOTER_FROM:
+            promoters += count
+        elif position >= PASSIVE_FROM:
+            passives += count
+    detractors = answered - promoters - passives
+
+    summary.update(
+        mean=round(mean, 2),
+        median=percentiles[50],
+        std_dev=round(std_dev, 2),
+        percentiles={f'p{percentile}': value for percentile, value in percentiles.items()},
+        nps={
+            'promoters': promoters,
+            'passives': passives,
+            'detractors': detractors,
+            'score': round((promoters - detractors) / answered * 100, 2),
+        },
+    )
+    return summary
@@ -0,0 +1,267 @@
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+# Terms shorter than this can't use a trigram index and are matched as
+# prefixes instead of substrings
+MIN_TRIGRAM_LENGTH = 3
+
+USER_SEARCH_FIELDS = ('username', 'email', 'first_name', 'last_name')
+
+_tables = {}
+
+
+def has_table(alias, table):
+    """Whether ``table`` exists on the database ``alias`` (cached per process)"""
+    key = (alias, table)
+    if key not in _tables:
+        with connections[alias].cursor() as cursor:
+            _tables[key] = table in connections[alias].introspection.table_names(cursor)
+    return _tables[key]
+
+
+def fts_phrase(term):
+    """Quote a term as an FTS5 phrase so its punctuation isn't parsed as syntax"""
+    return '"{}"'.format(term.replace('"', '""'))
+
+
+def search_users(queryset, terms):
+    """
+    Narrow a User queryset to rows matching every term in any of
+    USER_SEARCH_FIELDS.
+
+    On SQLite this uses the trigram FTS5 table from migration 0012; on
+    PostgreSQL the icontains lookups are served by the pg_trgm indexes
+    created there. Other databases fall back to plain icontains.
+    """
+    alias = queryset.db
+    use_fts = (
+        connections[alias].vendor == 'sqlite'
+        and has_table(alias, 'assessments_user_fts')
+    )
+
+    for term in terms:
+        if len(term) < MIN_TRIGRAM_LENGTH:
+            lookup = Q()
+            for field in USER_SEARCH_FIELDS:
+                lookup |= Q(**{f'{field}__istartswith': term})
+            queryset = queryset.filter(lookup)
+        elif use_fts:
+            queryset = queryset.filter(id__in=RawSQL(
+                'SELECT rowid FROM assessments_user_fts WHERE assessments_user_fts MATCH %s',
+                [fts_phrase(term)],
+            ))
+        else:
+            lookup = Q()
+            for field in USER_SEARCH_FIELDS:
+                lookup |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(lookup)
+    return queryset
+
+
+# Assessment search: one document per assessment holding its title,
+# description and question text, indexed by migration 0013 as an FTS5 table
+# on SQLite and a tsvector/GIN table on PostgreSQL.
+
+SQLITE_ASSESSMENT_TABLE = 'assessments_assessment_fts'
+POSTGRES_ASSESSMENT_TABLE = 'assessments_assessment_search'
+
+# Relative weights of title, description and question text in the ranking
+SQLITE_WEIGHTS = (10.0, 4.0, 1.0)
+
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+SNIPPET_TOKENS = 16
+
+SQLITE_REINDEX = [
+    "DELETE FROM assessments_assessment_fts WHERE rowid IN ({ids})",
+    """INSERT INTO assessments_assessment_fts(rowid, title, description, questions)
+    SELECT a.id, a.title, a.description, COALESCE((
+        SELECT group_concat(q.question_text, char(10))
+        FROM assessments_question q WHERE q.assessment_id = a.id
+    ), '')
+    FROM assessments_assessment a WHERE a.id IN ({ids})""",
+]
+
+POSTGRES_REINDEX = [
+    "DELETE FROM assessments_assessment_search WHERE assessment_id IN ({ids})",
+    """INSERT INTO assessments_assessment_search
+        (assessment_id, title, description, questions, document)
+    SELECT a.id, a.title, a.description, q.text,
+        setweight(to_tsvector('english', a.title), 'A')
+        || setweight(to_tsvector('english', a.description), 'B')
+        || setweight(to_tsvector('english', q.text), 'C')
+    FROM assessments_assessment a
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(string_agg(question_text, E'\\n' ORDER BY "order"), '') AS text
+        FROM assessments_question WHERE assessment_id = a.id
+    ) q
+    WHERE a.id IN ({ids})""",
+]
+
+
+def assessment_search_backend(alias):
+    """'sqlite', 'postgresql' or None when there is no index on ``alias``"""
+    vendor = connections[alias].vendor
+    if vendor == 'sqlite' and has_table(alias, SQLITE_ASSESSMENT_TABLE):
+        return vendor
+    if vendor == 'postgresql' and has_table(alias, POSTGRES_ASSESSMENT_TABLE):
+        return vendor
+    return None
+
+
+def index_assessments(assessment_ids=None, using='default'):
+    """
+    Refresh the search documents of the given assessments (all when None).
+    Ids of deleted assessments just have their documents removed.
+    """
+    backend = assessment_search_backend(using)
+    if backend is None:
+        return
+    if assessment_ids is None:
+        ids, params = 'SELECT id FROM assessments_assessment', []
+        with connections[using].cursor() as cursor:
+            table = SQLITE_ASSESSMENT_TABLE if backend == 'sqlite' else POSTGRES_ASSESSMENT_TABLE
+            cursor.execute(f'DELETE FROM {table}')
+    else:
+        params = list(assessment_ids)
+        if not params:
+            return
+        ids = ', '.join(['%s'] * len(params))
+
+    statements = SQLITE_REINDEX if backend == 'sqlite' else POSTGRES_REINDEX
+    with connections[using].cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement.format(ids=ids), params)
+
+
+def fts_query(text):
+    """
+    Turn free text into an FTS5 query: every word must match and the last
+    one may be a prefix, so results update while the user is typing.
+    """
+    words = text.split()
+    if not words:
+        return None
+    return ' '.join(fts_phrase(word) for word in words) + '*'
+
+
+def _highlight(text):
+    """HTML-escape an indexed snippet and turn the match markers into <mark>"""
+    if not text:
+        return text
+    return escape(text).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>')
+
+
+def filter_assessments(queryset, text):
+    """
+    Narrow an Assessment queryset to rows whose title, description or
+    questions match ``text``. Falls back to icontains without an index.
+    """
+    backend = assessment_search_backend(queryset.db)
+    if backend == 'sqlite':
+        query = fts_query(text)
+        if query is None:
+            return queryset
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {SQLITE_ASSESSMENT_TABLE} WHERE {SQLITE_ASSESSMENT_TABLE} MATCH %s',
+            [query],
+        ))
+    if backend == 'postgresql':
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT assessment_id FROM {POSTGRES_ASSESSMENT_TABLE} "
+            f"WHERE document @@ websearch_to_tsquery('english', %s)",
+            [text],
+        ))
+
+    for word in text.split():
+        queryset = queryset.filter(
+            Q(title__icontains=word)
+            | Q(description__icontains=word)
+            | Q(questions__question_text__icontains=word)
+        )
+    return queryset.distinct()
+
+
+def search_assessments(queryset, text, limit=20):
+    """
+    Ranked search within an Assessment queryset. Returns up to ``limit``
+    ``{'id', 'rank', 'highlights'}`` dicts, best match first, where the
+    highlights are HTML-escaped snippets with matches wrapped in <mark>.
+    Without an index, matches are returned unranked and unhighlighted.
+    """
+    backend = assessment_search_backend(queryset.db)
+    if backend is None:
+        ids = filter_assessments(queryset, text).order_by('-created_at').values_list('id', flat=True)
+        return [{'id': pk, 'rank': None, 'highlights': None} for pk in ids[:limit]]
+
+    # Restrict matches to the caller's queryset (availability etc.)
+    scope_sql, scope_params = queryset.order_by().values('id').query.sql_with_params()
+
+    if backend == 'sqlite':
+        query = fts_query(text)
+        if query is None:
+            return []
+        # Rank and limit first; highlight() and snippet() would otherwise run
+        # for every match before the LIMIT applies. The unary + keeps SQLite
+        # from pushing the rowid lists into FTS5, which would re-run the
+        # MATCH once per id.
+        sql = f"""
+            SELECT rowid, -bm25({SQLITE_ASSESSMENT_TABLE}, %s, %s, %s) AS rank,
+                highlight({SQLITE_ASSESSMENT_TABLE}, 0, %s, %s),
+                snippet({SQLITE_ASSESSMENT_TABLE}, 1, %s, %s, '…', %s),
+                snippet({SQLITE_ASSESSMENT_TABLE}, 2, %s, %s, '…', %s)
+            FROM {SQLITE_ASSESSMENT_TABLE}
+            WHERE {SQLITE_ASSESSMENT_TABLE} MATCH %s AND +rowid IN (
+                SELECT rowid FROM {SQLITE_ASSESSMENT_TABLE}
+                WHERE {SQLITE_ASSESSMENT_TABLE} MATCH %s AND +rowid IN ({scope_sql})
+                ORDER BY bm25({SQLITE_ASSESSMENT_TABLE}, %s, %s, %s) LIMIT %s
+            )
+            ORDER BY rank DESC
+        """
+        weights = list(SQLITE_WEIGHTS)
+        marks = [HIGHLIGHT_START, HIGHLIGHT_END]
+        params = [
+            *weights, *marks, *marks, SNIPPET_TOKENS, *marks, SNIPPET_TOKENS,
+            query, query, *scope_params, *weights, limit,
+        ]
+    else:
+        # Rank and limit first so ts_headline only runs on the returned rows
+        options = (
+            f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, '
+            f'MaxWords={SNIPPET_TOKENS}, MinWords=4, FragmentDelimiter=…'
+        )
+        sql = f"""
+            SELECT hit.assessment_id, hit.rank,
+                ts_headline('english', hit.title, hit.query, %s),
+                ts_headline('english', hit.description, hit.query, %s),
+                ts_headline('english', hit.questions, hit.query, %s)
+            FROM (
+                SELECT s.assessment_id, s.title, s.description, s.questions, q.query,
+                    ts_rank_cd(s.document, q.query) AS rank
+                FROM {POSTGRES_ASSESSMENT_TABLE} s,
+                    websearch_to_tsquery('english', %s) AS q(query)
+                WHERE s.document @@ q.query AND s.assessment_id IN ({scope_sql})
+                ORDER BY rank DESC LIMIT %s
+            ) hit
+            ORDER BY hit.rank DESC
+        """
+        params = [options, options, options, text, *scope_params, limit]
+
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'id': pk,
+            'rank': rank,
+            'highlights': {
+                'title': _highlight(title),
+                'description': _highlight(description),
+                'questions': _highlight(questions),
+            },
+        }
+        for pk, rank, title, description, questions in rows
+    ]
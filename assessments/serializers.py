@@ -1,6 +1,10 @@
 from rest_framework import serializers
-from .models import Assessment, Question, Choice, Response, Answer, PartialResponse
+from .models import (
+    Assessment, AssessmentAttempt, Question, Choice, Response, Answer, PartialResponse, BackgroundJob,
+)
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 
 class ChoiceSerializer(serializers.ModelSerializer):
     class Meta:
@@ -12,7 +16,29 @@ class QuestionSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Question
-        fields = ['id', 'question_text', 'question_type', 'order', 'required', 'choices']
+        fields = ['id', 'question_text', 'question_type', 'order', 'required',
+                  'scale_min', 'scale_max', 'scale_step', 'choices']
+
+    def validate(self, attrs):
+        def current(name):
+            if name in attrs:
+                return attrs[name]
+            if self.instance is not None:
+                return getattr(self.instance, name)
+            return Question._meta.get_field(name).default
+
+        scale_min, scale_max, step = current('scale_min'), current('scale_max'), current('scale_step')
+        if scale_max <= scale_min:
+            raise serializers.ValidationError({'scale_max': "Must be greater than scale_min."})
+        if step < 1 or step > scale_max - scale_min:
+            raise serializers.ValidationError(
+                {'scale_step': "Must be between 1 and scale_max - scale_min."})
+        # Stats and cross-tabs list every scale point
+        if (scale_max - scale_min) // step > Question.MAX_SCALE_STEPS:
+            raise serializers.ValidationError({'scale_step': (
+                f"At most {Question.MAX_SCALE_STEPS} steps between scale_min and scale_max."
+            )})
+        return attrs
 
 class AssessmentSerializer(serializers.ModelSerializer):
     questions = QuestionSerializer(many=True, read_only=True)
@@ -20,7 +46,9 @@ class AssessmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Assessment
         fields = ['id', 'title', 'description', 'created_at', 'time_limit_minutes', 
-                 'available_from', 'available_to', 'questions']
+                 'available_from', 'available_to', 'retention_days', 'version', 'published_at',
+                 'questions']
+        read_only_fields = ['version', 'published_at']
 
 class AssessmentAdminSerializer(serializers.ModelSerializer):
     questions = QuestionSerializer(many=True, read_only=True)
@@ -29,8 +57,18 @@ class AssessmentAdminSerializer(serializers.ModelSerializer):
         model = Assessment
         fields = ['id', 'title', 'description', 'created_at', 'updated_at', 
                  'created_by', 'time_limit_minutes', 'available_from', 
-                 'available_to', 'questions']
-        read_only_fields = ['created_at', 'updated_at']
+                 'available_to', 'retention_days', 'version', 'root', 'parent', 'published_at',
+                 'questions']
+        read_only_fields = ['created_at', 'updated_at', 'version', 'root', 'parent', 'published_at']
+
+class AssessmentVersionSerializer(serializers.ModelSerializer):
+    response_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Assessment
+        fields = ['id', 'version', 'parent', 'title', 'created_at', 'published_at',
+                 'available_from', 'available_to', 'response_count']
+        read_only_fields = fields
 
 class AnswerSerializer(serializers.ModelSerializer):
     class Meta:
@@ -43,6 +81,12 @@ class ResponseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Response
         fields = ['assessment', 'respondent_email', 'answers']
+
+    def validate_assessment(self, assessment):
+        # Draft question sets can still change under the answers
+        if not assessment.is_published:
+            raise serializers.ValidationError("This assessment has not been published.")
+        return assessment
     
     def create(self, validated_data):
         answers_data = validated_data.pop('answers')
@@ -59,6 +103,34 @@ class PartialResponseSerializer(serializers.ModelSerializer):
         fields = ['id', 'assessment', 'respondent_email', 'answers', 'last_updated']
         read_only_fields = ['last_updated']
 
+    def create(self, validated_data):
+        assessment = validated_data['assessment']
+        if assessment.time_limit_minutes:
+            # The first autosave starts the timer if opening the assessment didn't
+            AssessmentAttempt.start(assessment, validated_data['respondent_email'], timezone.now())
+        # Respondents have one draft per assessment; saving again updates it
+        draft, _ = PartialResponse.upsert(
+            validated_data['assessment'], validated_data['respondent_email'],
+            validated_data['answers'])
+        return draft
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({
+                'respondent_email': "This respondent already has a draft for this assessment."
+            })
+
+
+class RespondentHistorySerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    kind = serializers.CharField()
+    assessment = serializers.IntegerField(source='assessment_id')
+    assessment_title = serializers.CharField()
+    timestamp = serializers.DateTimeField()
+
 
 class UserAdminSerializer(serializers.ModelSerializer):
     is_admin = serializers.BooleanField(source='is_staff', read_only=False)
@@ -77,4 +149,22 @@ class UserAdminSerializer(serializers.ModelSerializer):
             instance.is_superuser = is_admin  # Also update superuser status
         
         return super().update(instance, validated_data)
-    
+
+
+class UserDirectorySerializer(UserAdminSerializer):
+    """UserAdminSerializer plus the annotated number of submitted responses"""
+    response_count = serializers.IntegerField(read_only=True)
+
+    class Meta(UserAdminSerializer.Meta):
+        fields = UserAdminSerializer.Meta.fields + ('response_count',)
+
+
+class BackgroundJobSerializer(serializers.ModelSerializer):
+    progress = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = BackgroundJob
+        fields = ['id', 'kind', 'status', 'total', 'processed', 'failed', 'progress',
+                  'errors', 'result', 'created_by', 'created_at', 'started_at',
+                  'finished_at']
+        read_only_fields = fields
@@ -1,6 +1,17 @@
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from datetime import timedelta
+from rest_framework.exceptions import ValidationError
+
+from .models import AssessmentAttempt, PartialResponse, Respondent
+from .timeseries import record_submission
+
+TIME_LIMIT_EXPIRED = 'The time limit for this assessment has expired.'
+ATTEMPT_USED = 'This timed assessment has already been submitted.'
+
 
 def send_assessment_notification(assessment, recipient):
     subject = f'New Assessment Available: {assessment.title}'
@@ -14,4 +25,48 @@ def send_assessment_notification(assessment, recipient):
         settings.DEFAULT_FROM_EMAIL,
         [recipient],
         fail_silently=False,
-    )
\ No newline at end of file
+    )
+
+
+def claim_attempt(assessment, email):
+    """
+    Mark the respondent's attempt at a timed assessment as submitted, or
+    raise ValidationError when it was already used or the time limit plus
+    the grace period has passed. A respondent who never opened the
+    assessment or autosaved starts their attempt with this submission. The
+    claim is a single conditional UPDATE, so concurrent submissions can't
+    both succeed.
+    """
+    now = timezone.now()
+    grace = timedelta(seconds=getattr(settings, 'ASSESSMENT_TIME_LIMIT_GRACE_SECONDS', 30))
+    AssessmentAttempt.start(assessment, email, now)
+    attempts = AssessmentAttempt.objects.filter(
+        assessment=assessment, respondent_email=Respondent.normalize_email(email))
+    if attempts.filter(submitted_at__isnull=True, expires_at__gte=now - grace).update(submitted_at=now):
+        return
+
+    if attempts.filter(submitted_at__isnull=False).exists():
+        raise ValidationError({'detail': ATTEMPT_USED})
+    raise ValidationError({'detail': TIME_LIMIT_EXPIRED})
+
+
+@transaction.atomic
+def save_submission(serializer):
+    """
+    Save a validated ResponseSerializer and clean up the respondent's draft.
+    Submissions to timed assessments use up the respondent's attempt.
+    """
+    assessment = serializer.validated_data['assessment']
+    if assessment.time_limit_minutes:
+        claim_attempt(assessment, serializer.validated_data['respondent_email'])
+
+    response = serializer.save()
+    record_submission(response)
+
+    # Clean up any partial responses for this assessment and email
+    PartialResponse.objects.filter(
+        assessment=response.assessment,
+        respondent=response.respondent
+    ).delete()
+
+    return response
@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Assessment, Choice, Question
+from .question_metadata import invalidate
+from .search import index_assessments
+from .versioning import detach_versions
+
+
+@receiver(post_save, sender=Assessment)
+@receiver(post_delete, sender=Assessment)
+def reindex_assessment(sender, instance, using, **kwargs):
+    """Keep the assessment's search document in step with its fields"""
+    index_assessments([instance.pk], using=using)
+
+
+@receiver(pre_delete, sender=Assessment)
+def detach_deleted_version(sender, instance, using, **kwargs):
+    """
+    Keep later versions when a first version is deleted through the ORM or
+    the Django admin; ``root`` does not cascade.
+    """
+    detach_versions(instance.pk, using=using)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def reindex_question_assessment(sender, instance, using, **kwargs):
+    """Question text is part of its assessment's search document"""
+    index_assessments([instance.assessment_id], using=using)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def clear_question_metadata(sender, instance, **kwargs):
+    invalidate(instance.assessment_id)
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def clear_choice_metadata(sender, instance, using, **kwargs):
+    # When a question is deleted its choices go first; the question's own
+    # signal covers that case if it is already gone here
+    assessment_id = Question.objects.using(using).filter(
+        pk=instance.question_id
+    ).values_list('assessment_id', flat=True).first()
+    if assessment_id is not None:
+        invalidate(assessment_id)
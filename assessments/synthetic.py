@@ -0,0 +1,268 @@
+# Synthetic assessment data for load tests and local scale testing. All
+# generators take a random.Random instance so runs are reproducible.
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    Answer, Assessment, Choice, PartialResponse, Question, Respondent, Response,
+)
+from .ordering import ORDER_GAP
+from .search import index_assessments
+from .timeseries import hour_bucket
+
+DEFAULT_QUESTION_MIX = {
+    Question.TEXT: 1,
+    Question.MULTIPLE_CHOICE: 3,
+    Question.CHECKBOX: 2,
+    Question.SCALE: 2,
+}
+
+# Respondents lean towards the upper-middle of a scale
+SCALE_WEIGHTS = [5, 10, 20, 35, 30]
+
+WORDS = (
+    "growth revenue customer team market product service quality cost "
+    "strategy process risk delivery support sales partner training value"
+).split()
+
+
+def parse_question_mix(spec):
+    """Parse ``"text:1,scale:2"`` into a question type to weight mapping"""
+    if not spec:
+        return dict(DEFAULT_QUESTION_MIX)
+
+    valid = {code for code, _ in Question.QUESTION_TYPES}
+    mix = {}
+    for part in spec.split(','):
+        question_type, _, weight = part.partition(':')
+        question_type = question_type.strip()
+        if question_type not in valid:
+            raise ValueError(f"Unknown question type: {question_type}")
+        mix[question_type] = int(weight or 1)
+    return mix
+
+
+def sentence(rng, words=8):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def create_assessment(rng, created_by, question_count=10, question_mix=None,
+                      choices_per_question=4, **fields):
+    """Create an assessment with a random mix of questions and choices"""
+    question_mix = question_mix or DEFAULT_QUESTION_MIX
+    types, weights = zip(*question_mix.items())
+
+    assessment = Assessment.objects.create(
+        title=fields.pop('title', sentence(rng, 4)),
+        description=fields.pop('description', sentence(rng, 20)),
+        created_by=created_by,
+        published_at=fields.pop('published_at', timezone.now()),
+        **fields
+    )
+
+    questions = Question.objects.bulk_create([
+        Question(
+            assessment=assessment,
+            question_text=sentence(rng) + '?',
+            question_type=rng.choices(types, weights)[0],
+            order=(order + 1) * ORDER_GAP,
+        )
+        for order in range(question_count)
+    ])
+    # bulk_create skips the signals that maintain the search index
+    index_assessments([assessment.id])
+
+    Choice.objects.bulk_create([
+        Choice(question=question, choice_text=f"Option {index}", value=str(index))
+        for question in questions
+        if question.question_type in (Question.MULTIPLE_CHOICE, Question.CHECKBOX)
+        for index in range(1, choices_per_question + 1)
+    ])
+
+    return assessment
+
+
+def question_specs(assessment_ids):
+    """
+    Load ``(question_id, question_type, values)`` tuples per assessment,
+    which is all the answer generators need. ``values`` are the choice
+    values, or the scale points of a scale question.
+    """
+    specs = {assessment_id: [] for assessment_id in assessment_ids}
+    choices = {}
+    for question_id, value in Choice.objects.filter(
+        question__assessment_id__in=assessment_ids
+    ).values_list('question_id', 'value').order_by('question_id', 'id'):
+        choices.setdefault(question_id, []).append(value)
+
+    for question_id, assessment_id, question_type, *scale in Question.objects.filter(
+        assessment_id__in=assessment_ids
+    ).values_list(
+        'id', 'assessment_id', 'question_type', 'scale_min', 'scale_max', 'scale_step'
+    ).order_by('order', 'id'):
+        if question_type == Question.SCALE:
+            scale_min, scale_max, scale_step = scale
+            values = [str(point) for point in range(scale_min, scale_max + 1, scale_step)]
+        else:
+            values = choices.get(question_id, [])
+        specs[assessment_id].append((question_id, question_type, values))
+
+    return specs
+
+
+def scale_weights(points):
+    """SCALE_WEIGHTS stretched over ``points`` scale points by position"""
+    return [SCALE_WEIGHTS[index * len(SCALE_WEIGHTS) // points] for index in range(points)]
+
+
+def answer_text(rng, question_type, choice_values):
+    """Generate a plausible answer for a question"""
+    if question_type == Question.SCALE:
+        points = choice_values or [str(point) for point in range(1, 6)]
+        return rng.choices(points, scale_weights(len(points)))[0]
+    # Earlier options are picked more often
+    weights = [1 / rank for rank in range(1, len(choice_values) + 1)]
+    if question_type == Question.MULTIPLE_CHOICE and choice_values:
+        return rng.choices(choice_values, weights)[0]
+    if question_type == Question.CHECKBOX and choice_values:
+        remaining = list(range(len(choice_values)))
+        picked = []
+        for _ in range(rng.randint(1, min(3, len(choice_values)))):
+            position = rng.choices(range(len(remaining)), [weights[i] for i in remaining])[0]
+            picked.append(remaining.pop(position))
+        return ','.join(choice_values[i] for i in sorted(picked))
+    return sentence(rng, rng.randint(3, 15))
+
+
+def answers_payload(rng, specs, completion=1.0):
+    """Build the ``answers`` list for a response, skipping some questions"""
+    return [
+        {'question': question_id, 'answer_text': answer_text(rng, question_type, values)}
+        for question_id, question_type, values in specs
+        if rng.random() < completion
+    ]
+
+
+def respondent_email(rng, population=100000):
+    return f"respondent{rng.randrange(population)}@example.com"
+
+
+@contextmanager
+def explicit_timestamps():
+    """
+    Let bulk_create keep the submitted_at/last_updated values we generate
+    instead of overwriting them with the current time.
+    """
+    fields = [
+        Response._meta.get_field('submitted_at'),
+        PartialResponse._meta.get_field('last_updated'),
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def create_respondents(population, chunk_size=5000):
+    """
+    Make sure ``respondent<N>@example.com`` respondents exist for the whole
+    population and return their IDs, indexed by N.
+    """
+    emails = [f"respondent{index}@example.com" for index in range(population)]
+    hashes = [Respondent.hash_email(email) for email in emails]
+    Respondent.objects.bulk_create(
+        [
+            Respondent(email_hash=email_hash, email=email)
+            for email_hash, email in zip(hashes, emails)
+        ],
+        batch_size=chunk_size,
+        ignore_conflicts=True,
+    )
+
+    ids = {}
+    for start in range(0, population, chunk_size):
+        ids.update(
+            Respondent.objects.filter(email_hash__in=hashes[start:start + chunk_size])
+            .values_list('email_hash', 'id')
+        )
+    return [ids[email_hash] for email_hash in hashes]
+
+
+def populate_responses(rng, assessment_id, specs, count, respondent_ids, start, end,
+                       completion=0.95, chunk_size=5000, progress=None):
+    """
+    Bulk insert ``count`` submitted responses with answers, spread uniformly
+    between ``start`` and ``end``. Returns the number of answers written
+    and the per-hour submission counts for the counter table.
+    """
+    span = (end - start).total_seconds()
+    answer_total = 0
+    hourly = {}
+
+    for offset in range(0, count, chunk_size):
+        size = min(chunk_size, count - offset)
+        responses = []
+        for _ in range(size):
+            index = rng.randrange(len(respondent_ids))
+            submitted_at = start + timedelta(seconds=rng.random() * span)
+            responses.append(Response(
+                assessment_id=assessment_id,
+                respondent_email=f"respondent{index}@example.com",
+                respondent_id=respondent_ids[index],
+                submitted_at=submitted_at,
+            ))
+            bucket = hour_bucket(submitted_at)
+            hourly[bucket] = hourly.get(bucket, 0) + 1
+
+        with transaction.atomic(), explicit_timestamps():
+            Response.objects.bulk_create(responses, batch_size=chunk_size)
+            answers = [
+                Answer(
+                    response_id=response.id,
+                    question_id=question_id,
+                    answer_text=answer_text(rng, question_type, values),
+                )
+                for response in responses
+                for question_id, question_type, values in specs
+                if rng.random() < completion
+            ]
+            Answer.objects.bulk_create(answers, batch_size=chunk_size)
+
+        answer_total += len(answers)
+        if progress:
+            progress(offset + size, answer_total)
+
+    return answer_total, hourly
+
+
+def populate_partial_responses(rng, assessment_id, specs, count, respondent_ids,
+                               start, end, chunk_size=5000):
+    """
+    Bulk insert ``count`` drafts with roughly half of the questions
+    answered, each from a different respondent as drafts are unique per
+    respondent and assessment.
+    """
+    span = (end - start).total_seconds()
+    indexes = rng.sample(range(len(respondent_ids)), min(count, len(respondent_ids)))
+    for offset in range(0, len(indexes), chunk_size):
+        drafts = []
+        for index in indexes[offset:offset + chunk_size]:
+            drafts.append(PartialResponse(
+                assessment_id=assessment_id,
+                respondent_email=f"respondent{index}@example.com",
+                respondent_id=respondent_ids[index],
+                answers={
+                    str(item['question']): item['answer_text']
+                    for item in answers_payload(rng, specs, 0.5)
+                },
+                last_updated=start + timedelta(seconds=rng.random() * span),
+            ))
+        with transaction.atomic(), explicit_timestamps():
+            PartialResponse.objects.bulk_create(drafts, batch_size=chunk_size)
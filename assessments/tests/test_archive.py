@@ -0,0 +1,94 @@
+import gzip
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from assessments.analytics import question_metrics
+from assessments.models import Answer, AnswerRollup, Question, Response, ResponseRollup
+
+from .utils import make_assessment, make_question, make_user
+
+
+class ArchiveResponsesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.assessment = make_assessment(self.user)
+        choice = make_question(self.assessment, choices=[('a', 'A'), ('b', 'B')])
+        checkbox = make_question(self.assessment, Question.CHECKBOX, choices=[('x', 'X'), ('y', 'Y')])
+        scale = make_question(self.assessment, Question.SCALE)
+        text = make_question(self.assessment, Question.TEXT)
+
+        now = timezone.now()
+        rows = [
+            (40, {choice: 'a', checkbox: 'x,y', scale: '4', text: 'Fine'}),
+            (40, {choice: 'b', checkbox: 'y', scale: '2'}),
+            (35, {choice: 'a', checkbox: 'x', scale: '5', text: 'Good'}),
+            (1, {choice: 'b', checkbox: 'x,y', scale: '3', text: 'New'}),
+        ]
+        for days, answers in rows:
+            response = Response.objects.create(
+                assessment=self.assessment, respondent_email=f'r{days}{len(answers)}@example.com')
+            Response.objects.filter(pk=response.pk).update(submitted_at=now - timedelta(days=days))
+            for question, answer_text in answers.items():
+                Answer.objects.create(response=response, question=question, answer_text=answer_text)
+
+    def stats(self):
+        cache.clear()
+        stats = self.client.get(f'/api/assessments/{self.assessment.id}/stats/').data
+        compare = self.client.post('/api/assessments/stats/compare/', {
+            'assessment_ids': [self.assessment.id],
+        }, format='json').data
+        # include_questions runs on a thread pool, which can't see this test's
+        # transaction, so check its per-question metrics directly
+        return stats, compare, question_metrics(self.assessment)
+
+    def archive(self, *args):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(lambda: [os.remove(os.path.join(directory, name)) for name in os.listdir(directory)])
+        call_command('archive_responses', '--output-dir', directory, *args, stdout=StringIO())
+        return [os.path.join(directory, name) for name in os.listdir(directory)]
+
+    def test_stats_are_the_same_after_archiving(self):
+        before = self.stats()
+
+        [path] = self.archive('--older-than-days', '30', '--batch-size', '1')
+
+        self.assertEqual(Response.objects.count(), 1)
+        self.assertEqual(sum(ResponseRollup.objects.values_list('responses', flat=True)), 3)
+        self.assertEqual(sum(ResponseRollup.objects.values_list('completed', flat=True)), 2)
+        self.assertTrue(AnswerRollup.objects.filter(answer_text='y', count=2).exists())
+        self.assertEqual(self.stats(), before)
+
+        with gzip.open(path, 'rt', encoding='utf-8') as stream:
+            lines = [json.loads(line) for line in stream]
+        self.assertEqual(len(lines), 3)
+        self.assertIn({'question_id': lines[0]['answers'][-1]['question_id'], 'answer_text': 'Fine'},
+                      lines[0]['answers'])
+
+    def test_uses_the_assessment_retention_policy(self):
+        self.assessment.retention_days = 38
+        self.assessment.save()
+        self.archive()
+        self.assertEqual(Response.objects.count(), 2)
+
+    def test_keeps_everything_without_a_policy(self):
+        self.assertEqual(self.archive(), [])
+        self.assertEqual(Response.objects.count(), 4)
+
+    def test_dry_run(self):
+        output = StringIO()
+        call_command('archive_responses', '--older-than-days', '30', '--dry-run',
+                     '--output-dir', tempfile.mkdtemp(), stdout=output)
+        self.assertIn('3 responses would be archived', output.getvalue())
+        self.assertEqual(Response.objects.count(), 4)
@@ -0,0 +1,79 @@
+from django.db import IntegrityError
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from assessments.models import PartialResponse
+
+from .utils import make_assessment, make_question, make_user
+
+
+class AsyncRespondentPathTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.assessment = make_assessment(make_user())
+        self.question = make_question(self.assessment, choices=[('a', 'A')])
+
+    def autosave(self, email, answers):
+        return self.client.post('/api/async/partial-responses/', {
+            'assessment': self.assessment.id, 'respondent_email': email, 'answers': answers,
+        }, format='json')
+
+    def test_detail_hides_unpublished_assessments(self):
+        draft = make_assessment(self.assessment.created_by, published_at=None)
+        self.assertEqual(self.client.get(f'/api/async/assessments/{draft.id}/').status_code, 404)
+        response = self.client.get(f'/api/async/assessments/{self.assessment.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['questions'][0]['id'], self.question.id)
+
+    def test_autosave_updates_the_same_draft(self):
+        first = self.autosave('pat@example.com', {'1': 'a'})
+        second = self.autosave('PAT@example.com', {'1': 'b'})
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.json()['id'], second.json()['id'])
+        self.assertEqual(PartialResponse.objects.get().answers, {'1': 'b'})
+
+    def test_submit(self):
+        response = self.client.post('/api/async/responses/', {
+            'assessment': self.assessment.id,
+            'respondent_email': 'pat@example.com',
+            'answers': [{'question': self.question.id, 'answer_text': 'a'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_rejects_invalid_json(self):
+        response = self.client.post(
+            '/api/async/responses/', 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class DraftUniquenessTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.assessment = make_assessment(make_user())
+
+    def test_one_draft_per_respondent(self):
+        PartialResponse.objects.create(
+            assessment=self.assessment, respondent_email='pat@example.com', answers={})
+        with self.assertRaises(IntegrityError):
+            PartialResponse.objects.create(
+                assessment=self.assessment, respondent_email='Pat@example.com', answers={})
+
+    def test_posting_again_updates_the_draft(self):
+        for answers in ({'1': 'a'}, {'1': 'b'}):
+            response = self.client.post('/api/partial-responses/', {
+                'assessment': self.assessment.id, 'respondent_email': 'pat@example.com',
+                'answers': answers,
+            }, format='json')
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(PartialResponse.objects.get().answers, {'1': 'b'})
+
+    def test_moving_a_draft_onto_another_respondents_is_rejected(self):
+        PartialResponse.objects.create(
+            assessment=self.assessment, respondent_email='pat@example.com', answers={})
+        draft = PartialResponse.objects.create(
+            assessment=self.assessment, respondent_email='sam@example.com', answers={})
+        response = self.client.patch(
+            f'/api/partial-responses/{draft.id}/', {'respondent_email': 'pat@example.com'},
+            format='json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,170 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import hashers
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from assessments import bulk_users
+from assessments.jobs import run_job
+from assessments.models import Assessment, BackgroundJob, Response
+
+from .utils import make_assessment, make_user
+
+
+@override_settings(BULK_USERS_CHUNK_SIZE=2)
+class BulkActionTests(TestCase):
+    def setUp(self):
+        self.admin = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.users = [make_user(f'user{index}', is_staff=False) for index in range(3)]
+        self.ids = [user.id for user in self.users]
+
+    def test_small_batches_run_inline(self):
+        response = self.client.post('/api/admin/users/bulk-action/', {
+            'action': 'deactivate', 'user_ids': self.ids + [self.admin.id],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], BackgroundJob.SUCCEEDED)
+        self.assertEqual(response.data['result'], {'updated': 3})
+        self.assertEqual(response.data['processed'], 3)
+        self.assertFalse(User.objects.filter(id__in=self.ids, is_active=True).exists())
+        self.assertTrue(User.objects.get(pk=self.admin.pk).is_active)
+
+    def test_delete(self):
+        response = self.client.post('/api/admin/users/bulk-action/', {
+            'action': 'delete', 'user_ids': self.ids[:2],
+        }, format='json')
+        self.assertEqual(response.data['result'], {'deleted': 2})
+        self.assertEqual(list(User.objects.exclude(pk=self.admin.pk).values_list('id', flat=True)),
+                         self.ids[2:])
+
+    def test_delete_skips_users_who_own_assessments(self):
+        owner, former_owner = User.objects.filter(id__in=self.ids[:2])
+        assessment = make_assessment(owner)
+        Response.objects.create(assessment=assessment, respondent_email='pat@example.com')
+        # Deleted but not purged yet
+        Assessment.all_objects.filter(pk=make_assessment(former_owner).pk).update(deleted_at=timezone.now())
+
+        response = self.client.post('/api/admin/users/bulk-action/', {
+            'action': 'delete', 'user_ids': self.ids,
+        }, format='json')
+
+        self.assertEqual(response.data['result'], {'deleted': 1})
+        self.assertEqual(response.data['failed'], 2)
+        self.assertEqual(sorted(error['user_id'] for error in response.data['errors']), self.ids[:2])
+        self.assertEqual(list(User.objects.exclude(pk=self.admin.pk).values_list('id', flat=True)),
+                         self.ids[:2])
+        self.assertTrue(Response.objects.filter(assessment=assessment).exists())
+
+    @override_settings(BULK_USERS_SYNC_LIMIT=2)
+    def test_large_batches_are_queued(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post('/api/admin/users/bulk-action/', {
+                'action': 'activate', 'user_ids': self.ids,
+            }, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], BackgroundJob.PENDING)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_validation(self):
+        for data in ({'action': 'promote', 'user_ids': self.ids},
+                     {'action': 'delete', 'user_ids': ['x']},
+                     {'action': 'delete', 'user_ids': '15'},
+                     {'action': 'delete', 'user_ids': {'1': 5}},
+                     {'action': 'delete', 'user_ids': []},
+                     {'action': 'delete'},
+                     {'action': 'delete', 'user_ids': [self.admin.id]}):
+            response = self.client.post('/api/admin/users/bulk-action/', data, format='json')
+            self.assertEqual(response.status_code, 400, data)
+        self.assertEqual(User.objects.filter(id__in=self.ids).count(), len(self.ids))
+
+
+class ParseImportTests(SimpleTestCase):
+    def test_reads_known_columns(self):
+        rows = bulk_users.parse_import(b'\xef\xbb\xbfEmail,First_Name,extra\n a@example.com ,Ann,x\n')
+        self.assertEqual(rows, [{'email': 'a@example.com', 'first_name': 'Ann', 'last_name': '', 'password': ''}])
+
+    def test_rejects_unusable_files(self):
+        for data in (b'name\nAnn\n', b'\xff\xfe'):
+            with self.assertRaises(ValueError):
+                bulk_users.parse_import(data)
+
+    @override_settings(USER_IMPORT_MAX_ROWS=1)
+    def test_caps_the_row_count(self):
+        with self.assertRaises(ValueError):
+            bulk_users.parse_import('email\na@example.com\nb@example.com\n')
+
+
+@override_settings(BULK_USERS_CHUNK_SIZE=2)
+class ImportUsersTests(TestCase):
+    def test_creates_users_and_reports_bad_rows(self):
+        admin = make_user()
+        make_user('Taken@Example.com', is_staff=False)
+        rows = bulk_users.parse_import(
+            'email,password\n'
+            'new@example.com,A-long-passphrase-9\n'
+            'not-an-email,\n'
+            'taken@example.com,\n'
+            'NEW@example.com,\n'
+            'other@example.com,\n'
+        )
+
+        job = run_job(BackgroundJob.USER_IMPORT, admin, len(rows),
+                      bulk_users.import_users, rows, background=False)
+
+        self.assertEqual(job.status, BackgroundJob.SUCCEEDED)
+        self.assertEqual(job.result, {'created': 2})
+        self.assertEqual(job.processed, 5)
+        self.assertEqual(sorted((error['line'], error['error']) for error in job.errors), [
+            (3, 'Enter a valid email address.'),
+            (4, 'Already registered.'),
+            (5, 'Duplicate email in file.'),
+        ])
+        self.assertTrue(User.objects.get(username='new@example.com').check_password('A-long-passphrase-9'))
+        self.assertFalse(User.objects.get(username='other@example.com').has_usable_password())
+
+    @override_settings(USER_IMPORT_HASHING_WORKERS=3, BULK_USERS_CHUNK_SIZE=2)
+    def test_passwords_are_hashed_in_parallel_for_the_right_users(self):
+        rows = [{'email': f'user{i}@example.com', 'first_name': '', 'last_name': '',
+                 'password': f'A-long-passphrase-{i}'} for i in range(5)]
+        threads = set()
+
+        def password_for(row):
+            threads.add(threading.current_thread().name)
+            return hashers.make_password(row['password'])
+
+        with mock.patch('assessments.bulk_users._password_for', side_effect=password_for):
+            job = run_job(BackgroundJob.USER_IMPORT, make_user(), len(rows),
+                          bulk_users.import_users, rows, background=False)
+
+        self.assertEqual(job.result, {'created': 5})
+        self.assertTrue(all(name.startswith('user-import-hash') for name in threads))
+        for i in range(5):
+            user = User.objects.get(username=f'user{i}@example.com')
+            self.assertTrue(user.check_password(f'A-long-passphrase-{i}'))
+
+    def test_view_queues_the_import(self):
+        client = APIClient()
+        client.force_authenticate(make_user())
+        upload = SimpleUploadedFile('users.csv', b'email\na@example.com\n', content_type='text/csv')
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = client.post('/api/admin/users/import/', {'file': upload})
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['total'], 1)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_view_rejects_bad_csv(self):
+        client = APIClient()
+        client.force_authenticate(make_user())
+        upload = SimpleUploadedFile('users.csv', b'name\nAnn\n', content_type='text/csv')
+        response = client.post('/api/admin/users/import/', {'file': upload})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,86 @@
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from assessments.analytics import map_assessments
+from assessments.models import Answer, PartialResponse, Response
+
+from .utils import make_assessment, make_question, make_user
+
+URL = '/api/assessments/stats/compare/'
+
+
+class AssessmentComparisonTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.first = make_assessment(self.user, title='First')
+        self.second = make_assessment(self.user, title='Second')
+        self.question = make_question(self.first, choices=[('a', 'A')])
+
+    def respond(self, assessment, submitted_at, answered=True):
+        response = Response.objects.create(assessment=assessment, respondent_email='pat@example.com')
+        Response.objects.filter(pk=response.pk).update(submitted_at=submitted_at)
+        if answered:
+            Answer.objects.create(response=response, question=self.question, answer_text='a')
+
+    def test_compares_each_cohort(self):
+        self.respond(self.first, datetime(2026, 1, 10, tzinfo=dt_timezone.utc))
+        self.respond(self.first, datetime(2026, 2, 10, tzinfo=dt_timezone.utc), answered=False)
+        PartialResponse.objects.create(
+            assessment=self.first, respondent_email='sam@example.com', answers={})
+
+        response = self.client.post(URL, {
+            'assessment_ids': [self.second.id, self.first.id, self.first.id],
+            'ranges': [
+                {'label': 'january', 'start': '2026-01-01', 'end': '2026-01-31'},
+                {'label': 'all'},
+            ],
+            'tz': 'UTC',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        january, everything = response.data['cohorts']
+        self.assertEqual(january['metrics'][self.first.id]['total_responses'], 1)
+        self.assertEqual(everything['metrics'][self.first.id]['total_responses'], 2)
+        self.assertEqual(everything['metrics'][self.first.id]['completed_responses'], 1)
+        self.assertEqual(everything['metrics'][self.first.id]['partial_responses'], 1)
+        self.assertEqual(everything['metrics'][self.second.id]['total_responses'], 0)
+
+    def test_rejects_malformed_ids(self):
+        for assessment_ids in [5, {'id': 1}, 'abc', ['abc'], [[1]]]:
+            with self.subTest(assessment_ids=assessment_ids):
+                response = self.client.post(URL, {'assessment_ids': assessment_ids}, format='json')
+                self.assertEqual(response.status_code, 400)
+
+    def test_rejects_malformed_ranges(self):
+        for ranges in [5, ['january'], [{'start': 'soon'}]]:
+            with self.subTest(ranges=ranges):
+                response = self.client.post(
+                    URL, {'assessment_ids': [self.first.id], 'ranges': ranges}, format='json')
+                self.assertEqual(response.status_code, 400)
+
+    def test_missing_assessments(self):
+        response = self.client.post(URL, {'assessment_ids': [self.first.id, 999]}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['ids'], [999])
+
+    @override_settings(ANALYTICS_MAX_COMPARE=1)
+    def test_limits_the_number_of_assessments(self):
+        response = self.client.post(
+            URL, {'assessment_ids': [self.first.id, self.second.id]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class MapAssessmentsTests(TestCase):
+    def test_workers_close_every_connection(self):
+        assessment = make_assessment(make_user())
+        with mock.patch('assessments.analytics.connections.close_all') as close_all:
+            results = map_assessments(lambda a: a.title, [assessment])
+        self.assertEqual(results, {assessment.id: assessment.title})
+        close_all.assert_called_once_with()
@@ -0,0 +1,85 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from assessments.models import Answer, Question, Response
+
+from .utils import make_assessment, make_question, make_user
+
+
+class CrosstabTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.assessment = make_assessment(user)
+        self.size = make_question(self.assessment, choices=[('s', 'Small'), ('l', 'Large')])
+        self.channels = make_question(
+            self.assessment, Question.CHECKBOX, choices=[('web', 'Web'), ('shop', 'Shop')])
+        self.rating = make_question(self.assessment, Question.SCALE, scale_max=3)
+        self.notes = make_question(self.assessment, Question.TEXT)
+        self.url = f'/api/assessments/{self.assessment.id}/stats/crosstab/'
+
+        self.respond('2026-01-10', {self.size: 's', self.channels: 'web', self.rating: '3'})
+        self.respond('2026-01-20', {self.size: 's', self.channels: 'web,shop', self.rating: '2'})
+        self.respond('2026-02-05', {self.size: 'l', self.channels: 'shop', self.rating: '3'})
+        self.respond('2026-02-06', {self.size: 'l', self.rating: '9'})
+
+    def respond(self, day, answers):
+        response = Response.objects.create(assessment=self.assessment, respondent_email='r@example.com')
+        Response.objects.filter(pk=response.pk).update(
+            submitted_at=datetime.fromisoformat(day).replace(hour=12, tzinfo=dt_timezone.utc))
+        for question, text in answers.items():
+            Answer.objects.create(response=response, question=question, answer_text=text)
+
+    def get(self, row, column, **params):
+        return self.client.get(self.url, {'row': row.id, 'column': column.id, **params})
+
+    def cells(self, data):
+        columns = [column['value'] for column in data['columns']]
+        return {
+            row['value']: dict(zip(columns, row['counts'])) for row in data['rows']
+        }
+
+    def test_choice_by_checkbox(self):
+        response = self.get(self.size, self.channels)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(self.cells(response.data), {
+            's': {'web': 2, 'shop': 1},
+            'l': {'web': 0, 'shop': 1},
+        })
+        self.assertEqual([c['total'] for c in response.data['columns']], [2, 2])
+        small = response.data['rows'][0]
+        self.assertEqual((small['label'], small['total'], small['percentages']), ('Small', 2, [100.0, 50.0]))
+
+    def test_scale_rows_list_every_point_then_others(self):
+        response = self.get(self.rating, self.size)
+        self.assertEqual([row['value'] for row in response.data['rows']], ['1', '2', '3', '9'])
+        self.assertEqual(self.cells(response.data)['3'], {'s': 1, 'l': 1})
+        self.assertEqual(self.cells(response.data)['9'], {'s': 0, 'l': 1})
+
+    def test_date_range(self):
+        response = self.get(self.size, self.rating, start='2026-01-15', end='2026-02-05', tz='UTC')
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(self.cells(response.data)['s']['2'], 1)
+        self.assertEqual(self.cells(response.data)['l']['3'], 1)
+
+    def test_new_answers_are_picked_up_despite_the_cache(self):
+        self.assertEqual(self.get(self.size, self.channels).data['total'], 3)
+        self.respond('2026-03-01', {self.size: 'l', self.channels: 'web'})
+        self.assertEqual(self.get(self.size, self.channels).data['total'], 4)
+
+    def test_validation(self):
+        self.assertEqual(self.get(self.size, self.notes).status_code, 400)
+        self.assertEqual(self.get(self.size, self.size).status_code, 400)
+        other = make_question(make_assessment(make_user('other')))
+        self.assertEqual(self.get(self.size, other).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'row': 'x', 'column': 1}).status_code, 400)
+        self.assertEqual(self.get(self.size, self.channels, start='soon').status_code, 400)
+        self.assertEqual(self.get(self.size, self.channels, tz='Mars/Base').status_code, 400)
+        missing = '/api/assessments/999999/stats/crosstab/'
+        self.assertEqual(self.client.get(missing, {'row': 1, 'column': 2}).status_code, 404)
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase
+
+from assessments.models import Assessment
+
+from .utils import make_user
+
+
+class LoadTestCommandTests(TransactionTestCase):
+    def run_command(self, *args):
+        handle, path = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        call_command(
+            'loadtest', '--requests', '20', '--assessments', '2', '--questions', '3',
+            '--output', path, *args, stdout=StringIO())
+        with open(path) as output:
+            return json.load(output)
+
+    def test_reports_and_cleans_up(self):
+        results = self.run_command()
+        self.assertEqual(results['overall']['count'], 20)
+        self.assertEqual(results['overall']['errors'], 0)
+        self.assertEqual(results['meta']['mode'], 'in-process')
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Assessment.all_objects.exists())
+
+    def test_keep_data_leaves_assessments_with_the_owner(self):
+        owner = make_user('owner')
+        self.run_command('--keep-data', '--owner', 'owner')
+        self.assertEqual(list(User.objects.all()), [owner])
+        self.assertEqual(Assessment.objects.filter(created_by=owner).count(), 2)
+
+    def test_keep_data_needs_an_owner(self):
+        with self.assertRaises(CommandError):
+            call_command('loadtest', '--keep-data', stdout=StringIO())
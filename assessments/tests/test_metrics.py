@@ -0,0 +1,75 @@
+import os
+import tempfile
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from assessments.metrics import Counter, Gauge, Histogram, Registry
+
+from .utils import make_assessment, make_question, make_user
+
+
+class RegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_renders_counters_and_histograms(self):
+        requests = Counter('test_requests_total', 'Requests.', ['status'], registry=self.registry)
+        latency = Histogram('test_latency_seconds', 'Latency.', buckets=(0.1, 1), registry=self.registry)
+        requests.inc(status=200)
+        requests.inc(2, status=200)
+        latency.observe(0.05)
+        latency.observe(0.5)
+
+        text = self.registry.render()
+        self.assertIn('test_requests_total{status="200"} 3.0', text)
+        self.assertIn('test_latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('test_latency_seconds_bucket{le="+Inf"} 2', text)
+        self.assertIn('test_latency_seconds_count 2', text)
+
+    def test_rejects_unexpected_labels(self):
+        requests = Counter('test_labelled_total', 'Requests.', ['status'], registry=self.registry)
+        with self.assertRaises(ValueError):
+            requests.inc(method='GET')
+
+    def test_merges_process_files_in_metrics_dir(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            requests = Counter('test_shared_total', 'Requests.', registry=self.registry)
+            workers = Gauge('test_workers', 'Workers.', registry=self.registry)
+            requests.inc(5)
+            workers.set(1)
+            self.registry.flush(force=True)
+            # A file left by another (dead) worker: its counter still counts
+            with open(os.path.join(directory, 'metrics_999999999.json'), 'w') as other:
+                other.write('{"pid": 999999999, "values": ['
+                            '["test_shared_total", [], 2], ["test_workers", [], 1]]}')
+
+            values = self.registry.collect()
+        self.assertEqual(values[('test_shared_total', ())], 7)
+        self.assertEqual(values[('test_workers', ())], 1)
+
+
+class MetricsEndpointTests(TestCase):
+    @override_settings(METRICS_AUTH_TOKEN='secret')
+    def test_requires_the_token(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+        response = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_AUTH_TOKEN='', METRICS_ALLOWED_IPS=['10.0.0.1'])
+    def test_falls_back_to_allowed_ips(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+        response = self.client.get('/api/metrics/', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_AUTH_TOKEN='secret')
+    def test_counts_submissions(self):
+        assessment = make_assessment(make_user())
+        question = make_question(assessment, choices=[('a', 'A')])
+        self.client.post('/api/responses/', {
+            'assessment': assessment.id,
+            'respondent_email': 'pat@example.com',
+            'answers': [{'question': question.id, 'answer_text': 'a'}],
+        }, content_type='application/json')
+
+        text = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer secret').content.decode()
+        self.assertIn('api_requests_total{endpoint="response_create",method="POST",status="201"}', text)
@@ -0,0 +1,93 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from assessments.models import Question
+from assessments.ordering import ORDER_GAP
+
+from .utils import make_assessment, make_question, make_user
+
+
+class QuestionReorderTests(TestCase):
+    def setUp(self):
+        user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.assessment = make_assessment(user, published_at=None)
+        self.url = f'/api/admin/assessments/{self.assessment.id}/questions/reorder/'
+        self.questions = [
+            make_question(self.assessment, order=(index + 1) * ORDER_GAP) for index in range(4)
+        ]
+        self.ids = [question.id for question in self.questions]
+
+    def order(self):
+        return list(Question.objects.filter(assessment=self.assessment)
+                    .order_by('order', 'id').values_list('id', flat=True))
+
+    def move(self, question_id, after):
+        return self.client.post(self.url, {'question_id': question_id, 'after': after}, format='json')
+
+    def test_new_questions_go_last(self):
+        response = self.client.post(
+            f'/api/admin/assessments/{self.assessment.id}/questions/',
+            {'question_text': 'New', 'question_type': Question.TEXT})
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['order'], 5 * ORDER_GAP)
+
+    def test_move_only_updates_the_moved_row(self):
+        a, b, c, d = self.ids
+        response = self.move(d, a)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data], [a, d, b, c])
+        self.assertEqual(self.order(), [a, d, b, c])
+        self.assertEqual(
+            list(Question.objects.filter(pk__in=[a, b, c]).order_by('id').values_list('order', flat=True)),
+            [ORDER_GAP, 2 * ORDER_GAP, 3 * ORDER_GAP])
+
+    def test_explicit_null_moves_to_the_top(self):
+        a, b, c, d = self.ids
+        self.assertEqual(self.move(c, None).status_code, 200)
+        self.assertEqual(self.order(), [c, a, b, d])
+
+    def test_missing_after_is_rejected(self):
+        response = self.client.post(self.url, {'question_id': self.ids[2]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.order(), self.ids)
+
+    def test_renumbers_when_the_gap_runs_out(self):
+        a, b, c, d = self.ids
+        Question.objects.filter(pk=b).update(order=ORDER_GAP + 1)
+        self.assertEqual(self.move(d, a).status_code, 200)
+        self.assertEqual(self.order(), [a, d, b, c])
+        self.assertEqual(
+            list(Question.objects.filter(assessment=self.assessment)
+                 .order_by('order').values_list('order', flat=True)),
+            [ORDER_GAP, 2 * ORDER_GAP, 3 * ORDER_GAP, 4 * ORDER_GAP])
+
+    def test_repeated_moves_into_the_same_gap(self):
+        a, b, c, d = self.ids
+        for _ in range(12):
+            self.assertEqual(self.move(d, a).status_code, 200)
+            self.assertEqual(self.move(c, a).status_code, 200)
+            c, d = d, c
+        self.assertEqual(self.order()[0], a)
+        self.assertEqual(set(self.order()), set(self.ids))
+
+    def test_full_reorder(self):
+        new_order = list(reversed(self.ids))
+        response = self.client.post(self.url, {'question_ids': new_order}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.order(), new_order)
+
+    def test_full_reorder_must_list_every_question(self):
+        response = self.client.post(self.url, {'question_ids': self.ids[:3]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_foreign_questions(self):
+        other = make_question(make_assessment(make_user('other'), published_at=None))
+        self.assertEqual(self.move(other.id, None).status_code, 400)
+        self.assertEqual(self.move(self.ids[0], other.id).status_code, 400)
+
+    def test_published_versions_cannot_be_reordered(self):
+        self.assessment.published_at = self.assessment.created_at
+        self.assessment.save()
+        self.assertEqual(self.move(self.ids[3], None).status_code, 409)
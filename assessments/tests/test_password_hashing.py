@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.contrib.auth import hashers
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+
+class PasswordHashingTests(TestCase):
+    def test_new_passwords_use_scrypt(self):
+        response = APIClient().post('/api/auth/register/', {
+            'email': 'new@example.com', 'password': 'A-long-passphrase-9',
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertTrue(User.objects.get(username='new@example.com').password.startswith('scrypt$'))
+
+    def test_login_upgrades_an_older_hash(self):
+        user = User.objects.create(
+            username='old', password=hashers.make_password('old-passphrase', hasher='pbkdf2_sha256'))
+
+        response = APIClient().post(
+            '/api/auth/token/', {'username': 'old', 'password': 'old-passphrase'})
+
+        self.assertEqual(response.status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$'))
+        self.assertTrue(user.check_password('old-passphrase'))
+
+    def test_failed_login_keeps_the_hash(self):
+        password = hashers.make_password('old-passphrase', hasher='pbkdf2_sha256')
+        User.objects.create(username='old', password=password)
+
+        response = APIClient().post('/api/auth/token/', {'username': 'old', 'password': 'wrong'})
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(User.objects.get(username='old').password, password)
+
+
+@override_settings(PASSWORD_HASHING_CONCURRENCY=1, PASSWORD_HASHING_WAIT_SECONDS=0)
+class HashingSlotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username='pat', password='a-passphrase')
+
+    def login(self):
+        return APIClient().post('/api/auth/token/', {'username': 'pat', 'password': 'a-passphrase'})
+
+    def test_busy_slots_refuse_logins(self):
+        # Another worker holds the only slot
+        cache.add('password-hash-slot:0', 'other-worker', 10)
+        with mock.patch('assessments.authentication.hashing.HASH_REJECTED') as rejected:
+            response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        rejected.inc.assert_called_once_with(operation='login')
+
+        cache.delete('password-hash-slot:0')
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_slots_are_released(self):
+        self.assertEqual(self.login().status_code, 200)
+        self.assertIsNone(cache.get('password-hash-slot:0'))
+        response = APIClient().post('/api/auth/register/', {
+            'email': 'new@example.com', 'password': 'A-long-passphrase-9',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(cache.get('password-hash-slot:0'))
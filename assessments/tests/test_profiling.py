@@ -0,0 +1,44 @@
+from django.test import SimpleTestCase, TestCase, modify_settings
+from rest_framework.test import APIClient
+
+from assessments import middleware
+from assessments.middleware import fingerprint
+
+from .utils import make_assessment, make_user
+
+
+class FingerprintTests(SimpleTestCase):
+    def test_collapses_literals_and_in_lists(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'it''s'"),
+            fingerprint("SELECT * FROM t WHERE id IN (4, 5) AND name = 'x'"),
+        )
+
+
+@modify_settings(MIDDLEWARE={'append': 'assessments.middleware.ProfilingMiddleware'})
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        middleware._buffer.clear()
+        self.user = make_user()
+        make_assessment(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_records_timings(self):
+        response = self.client.get('/api/assessments/')
+        self.assertIn('db;dur=', response['Server-Timing'])
+        [profile] = middleware.recent_profiles()
+        self.assertEqual(profile['view'], 'assessment-list')
+        self.assertGreater(profile['query_count'], 0)
+
+    def test_snapshot_limits_the_requests_listed(self):
+        for _ in range(3):
+            self.client.get('/api/assessments/')
+        response = self.client.get('/api/admin/profiling/', {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['requests']), 2)
+        self.assertEqual(response.data['views']['assessment-list']['requests'], 3)
+
+    def test_snapshot_rejects_a_non_numeric_limit(self):
+        response = self.client.get('/api/admin/profiling/', {'limit': 'abc'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,31 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from .utils import make_user
+
+
+class PruneTokensTests(TestCase):
+    def test_deletes_expired_tokens_in_batches(self):
+        user = make_user()
+        now = timezone.now()
+        for index in range(5):
+            token = OutstandingToken.objects.create(
+                user=user, jti=f'expired-{index}', token='x',
+                created_at=now - timedelta(days=2), expires_at=now - timedelta(days=1))
+            if index % 2 == 0:
+                BlacklistedToken.objects.create(token=token)
+        live = OutstandingToken.objects.create(
+            user=user, jti='live', token='x', created_at=now, expires_at=now + timedelta(days=1))
+        BlacklistedToken.objects.create(token=live)
+
+        output = StringIO()
+        call_command('prune_tokens', '--batch-size', '2', stdout=output)
+
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['live'])
+        self.assertEqual(BlacklistedToken.objects.get().token_id, live.id)
+        self.assertIn('Pruned 5 expired tokens (3 blacklisted)', output.getvalue())
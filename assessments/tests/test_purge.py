@@ -0,0 +1,81 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from assessments.jobs import run_job
+from assessments.models import (
+    Answer, Assessment, AssessmentAttempt, BackgroundJob, Choice, PartialResponse, Question,
+    Response,
+)
+from assessments.purge import purge_assessment
+
+from .utils import make_assessment, make_question, make_user
+
+
+@override_settings(ASSESSMENT_PURGE_BATCH_SIZE=2)
+class PurgeTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.assessment = make_assessment(self.user, time_limit_minutes=30)
+        question = make_question(self.assessment, choices=[('a', 'A'), ('b', 'B')])
+        for index in range(5):
+            response = Response.objects.create(
+                assessment=self.assessment, respondent_email=f'r{index}@example.com')
+            Answer.objects.create(response=response, question=question, answer_text='a')
+        PartialResponse.objects.create(
+            assessment=self.assessment, respondent_email='d@example.com', answers={})
+        AssessmentAttempt.start(self.assessment, 'd@example.com', timezone.now())
+        self.other = make_assessment(self.user, title='Other')
+        Response.objects.create(assessment=self.other, respondent_email='r0@example.com')
+
+    def purge(self):
+        return run_job(BackgroundJob.ASSESSMENT_PURGE, self.user, 0,
+                       purge_assessment, self.assessment.pk, background=False)
+
+    def assert_purged(self):
+        self.assertFalse(Assessment.all_objects.filter(pk=self.assessment.pk).exists())
+        for model in (Response, Question, PartialResponse, AssessmentAttempt):
+            self.assertFalse(model.objects.filter(assessment_id=self.assessment.pk).exists(), model)
+        self.assertFalse(Answer.objects.exists())
+        self.assertFalse(Choice.objects.exists())
+        self.assertEqual(Response.objects.filter(assessment=self.other).count(), 1)
+
+    def test_delete_hides_at_once_and_queues_the_purge(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = client.delete(f'/api/admin/assessments/{self.assessment.id}/')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['kind'], BackgroundJob.ASSESSMENT_PURGE)
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(Assessment.objects.filter(pk=self.assessment.pk).exists())
+        self.assertTrue(Assessment.all_objects.filter(pk=self.assessment.pk).exists())
+        self.assertEqual(client.get(f'/api/assessments/{self.assessment.id}/').status_code, 404)
+
+    def test_purge_removes_rows_in_batches(self):
+        Assessment.all_objects.filter(pk=self.assessment.pk).update(deleted_at=timezone.now())
+
+        job = self.purge()
+
+        self.assertEqual(job.status, BackgroundJob.SUCCEEDED)
+        self.assertEqual(job.processed, job.total)
+        self.assertEqual(job.result['deleted']['assessments.Answer'], 5)
+        self.assertEqual(job.result['deleted']['assessments.Response'], 5)
+        self.assert_purged()
+
+    def test_refuses_assessments_not_marked_deleted(self):
+        with self.assertLogs('assessments.jobs', 'ERROR'):
+            job = self.purge()
+        self.assertEqual(job.status, BackgroundJob.FAILED)
+        self.assertTrue(Assessment.objects.filter(pk=self.assessment.pk).exists())
+
+    def test_command_finishes_interrupted_purges(self):
+        Assessment.all_objects.filter(pk=self.assessment.pk).update(deleted_at=timezone.now())
+        output = StringIO()
+        call_command('purge_deleted_assessments', stdout=output)
+        self.assertIn(f'Purged assessment {self.assessment.pk}', output.getvalue())
+        self.assert_purged()
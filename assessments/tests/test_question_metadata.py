@@ -0,0 +1,63 @@
+from django.test import TestCase
+
+from assessments.models import Choice, Question
+from assessments.ordering import reorder_questions
+from assessments.question_metadata import assessment_questions, metadata_cache
+
+from .utils import make_assessment, make_question, make_user
+
+
+class QuestionMetadataTests(TestCase):
+    def setUp(self):
+        metadata_cache.clear()
+        self.assessment = make_assessment(make_user(), published_at=None)
+        self.question = make_question(self.assessment, choices=[('a', 'A'), ('b', 'B')], order=1)
+        self.scale = make_question(self.assessment, Question.SCALE, order=2, scale_max=7)
+
+    def test_loads_in_two_queries_then_hits_the_cache(self):
+        with self.assertNumQueries(2):
+            questions = assessment_questions(self.assessment.id)
+        with self.assertNumQueries(0):
+            self.assertIs(assessment_questions(self.assessment.id), questions)
+
+        info = questions[self.question.id]
+        self.assertEqual(info.choices, (('a', 'A'), ('b', 'B')))
+        self.assertEqual(info.labels['b'], 'B')
+        self.assertEqual(questions[self.scale.id].scale, (1, 7, 1))
+        self.assertEqual(list(questions), [self.question.id, self.scale.id])
+
+    def test_question_changes_clear_the_cache(self):
+        assessment_questions(self.assessment.id)
+        self.question.question_text = 'Renamed'
+        self.question.save()
+        self.assertEqual(assessment_questions(self.assessment.id)[self.question.id].text, 'Renamed')
+
+        self.scale.delete()
+        self.assertNotIn(self.scale.id, assessment_questions(self.assessment.id))
+
+    def test_choice_changes_clear_the_cache(self):
+        assessment_questions(self.assessment.id)
+        Choice.objects.create(question=self.question, value='c', choice_text='C')
+        self.assertIn('c', assessment_questions(self.assessment.id)[self.question.id].labels)
+
+        Choice.objects.filter(value='a').get().delete()
+        self.assertNotIn('a', assessment_questions(self.assessment.id)[self.question.id].labels)
+
+    def test_deleting_a_question_with_choices(self):
+        assessment_questions(self.assessment.id)
+        self.question.delete()
+        self.assertEqual(list(assessment_questions(self.assessment.id)), [self.scale.id])
+
+    def test_bulk_reorder_clears_the_cache(self):
+        assessment_questions(self.assessment.id)
+        reorder_questions(self.assessment, [self.scale.id, self.question.id])
+        self.assertEqual(list(assessment_questions(self.assessment.id)), [self.scale.id, self.question.id])
+
+    def test_clears_again_on_commit(self):
+        assessment_questions(self.assessment.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.question_text = 'Renamed'
+            self.question.save()
+            # A concurrent reader repopulates the cache before the commit
+            metadata_cache.set(self.assessment.id, {})
+        self.assertIn(self.question.id, assessment_questions(self.assessment.id))
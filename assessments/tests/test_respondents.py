@@ -0,0 +1,65 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from assessments.models import PartialResponse, Respondent, Response
+
+from .utils import make_assessment, make_user
+
+
+class RespondentLinkTests(TestCase):
+    def setUp(self):
+        self.assessment = make_assessment(make_user())
+
+    def test_emails_differing_in_case_share_a_respondent(self):
+        response = Response.objects.create(assessment=self.assessment, respondent_email='Pat@Example.com')
+        draft = PartialResponse.objects.create(
+            assessment=self.assessment, respondent_email=' pat@example.COM', answers={})
+        self.assertEqual(response.respondent_id, draft.respondent_id)
+        self.assertEqual(Respondent.objects.get().email, 'pat@example.com')
+
+    def test_resaving_with_the_same_email_skips_the_lookup(self):
+        draft = PartialResponse.objects.create(
+            assessment=self.assessment, respondent_email='pat@example.com', answers={})
+        draft = PartialResponse.objects.get(pk=draft.pk)
+        draft.answers = {'1': 'a'}
+        with CaptureQueriesContext(connection) as queries:
+            draft.save()
+        self.assertEqual(len(queries), 1)
+
+    def test_changing_the_email_relinks(self):
+        draft = PartialResponse.objects.create(
+            assessment=self.assessment, respondent_email='pat@example.com', answers={})
+        draft = PartialResponse.objects.get(pk=draft.pk)
+        draft.respondent_email = 'sam@example.com'
+        draft.save()
+        self.assertEqual(draft.respondent.email, 'sam@example.com')
+
+
+class RespondentHistoryTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_lists_submissions_and_drafts_across_assessments(self):
+        first = make_assessment(self.user, title='First')
+        second = make_assessment(self.user, title='Second')
+        Response.objects.create(assessment=first, respondent_email='pat@example.com')
+        PartialResponse.objects.create(assessment=second, respondent_email='PAT@example.com', answers={})
+        Response.objects.create(assessment=second, respondent_email='sam@example.com')
+
+        response = self.client.get('/api/respondents/history/', {'email': 'Pat@Example.com'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted((row['kind'], row['assessment_title']) for row in response.data['results']),
+            [('partial_response', 'Second'), ('response', 'First')])
+
+    def test_requires_an_email(self):
+        self.assertEqual(self.client.get('/api/respondents/history/').status_code, 400)
+
+    def test_unknown_email_has_no_history(self):
+        response = self.client.get('/api/respondents/history/', {'email': 'nobody@example.com'})
+        self.assertEqual(response.data['results'], [])
@@ -0,0 +1,117 @@
+from django.core.cache import cache
+from django.db import connections
+from django.test import RequestFactory, TestCase, TransactionTestCase, modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from assessments import routers
+from assessments.models import Assessment, Response
+from assessments.routers import ReplicaRouter, is_pinned, pin_to_primary, replica_alias
+
+from .utils import make_assessment, make_user
+
+
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_no_replica_configured(self):
+        self.assertIsNone(replica_alias())
+        token = routers._use_replica.set(True)
+        try:
+            self.assertIsNone(ReplicaRouter().db_for_read(Assessment))
+        finally:
+            routers._use_replica.reset(token)
+
+    @override_settings(DATABASE_REPLICA_ALIAS='default')
+    def test_reads_go_to_the_replica_only_when_opted_in(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Assessment))
+        token = routers._use_replica.set(True)
+        try:
+            self.assertEqual(router.db_for_read(Assessment), 'default')
+            self.assertEqual(router.db_for_write(Assessment), 'default')
+        finally:
+            routers._use_replica.reset(token)
+
+    def test_pinning_is_per_user(self):
+        factory = RequestFactory()
+        request = factory.get('/')
+        request.user = make_user('pat')
+        other = factory.get('/')
+        other.user = make_user('sam')
+        pin_to_primary(request)
+        self.assertTrue(is_pinned(request))
+        self.assertFalse(is_pinned(other))
+
+
+@modify_settings(MIDDLEWARE={'append': 'assessments.middleware.ReplicaPinningMiddleware'})
+class ReplicaPinningMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_writes_pin_the_user(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        assessment = make_assessment(self.user)
+        response = self.client.post('/api/partial-responses/', {
+            'assessment': assessment.id, 'respondent_email': 'pat@example.com', 'answers': {},
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(is_pinned(request))
+
+    def test_analytics_posts_do_not_pin(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        assessment = make_assessment(self.user)
+        response = self.client.post(
+            '/api/assessments/stats/compare/', {'assessment_ids': [assessment.id]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(is_pinned(request))
+
+
+# A mirror of the test database standing in for the read replica. It has to
+# exist when the runner collects the tests, and gets its own alias so other
+# test modules keep running without a replica.
+REPLICA = 'test_replica'
+connections.settings.setdefault(REPLICA, {
+    **connections['default'].settings_dict,
+    'TEST': {**connections['default'].settings_dict['TEST'], 'MIRROR': 'default'},
+})
+
+
+@override_settings(DATABASE_REPLICA_ALIAS=REPLICA)
+class ReplicaReadTests(TransactionTestCase):
+    # The replica connection only sees committed rows, so no TestCase here
+    databases = {'default', REPLICA}
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Response.objects.create(assessment=make_assessment(self.user), respondent_email='pat@example.com')
+
+    def list_responses(self):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections[REPLICA]) as replica:
+            response = self.client.get('/api/responses/list/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        return primary, replica
+
+    def test_reads_use_the_replica(self):
+        primary, replica = self.list_responses()
+        self.assertTrue(any('assessments_response' in q['sql'] for q in replica.captured_queries))
+        self.assertFalse(any('assessments_response' in q['sql'] for q in primary.captured_queries))
+
+    def test_pinned_clients_read_from_the_primary(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        pin_to_primary(request)
+        primary, replica = self.list_responses()
+        self.assertEqual(replica.captured_queries, [])
+        self.assertTrue(any('assessments_response' in q['sql'] for q in primary.captured_queries))
@@ -0,0 +1,93 @@
+import random
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from assessments import scale_stats, synthetic
+from assessments.analytics import question_metrics
+from assessments.models import Answer, Question, Response
+from assessments.scale_stats import scale_statistics, value_counts
+
+from .utils import make_assessment, make_question, make_user
+
+COUNTS = {0: 3, 3: 1, 6: 4, 7: 5, 8: 2, 9: 6, 10: 9, 42: 2}
+
+
+class ScaleStatisticsTests(SimpleTestCase):
+    def test_summary_without_numpy(self):
+        with mock.patch.object(scale_stats, 'np', None):
+            summary = scale_statistics(COUNTS, 0, 10)
+
+        self.assertEqual(summary['count'], 30)
+        self.assertEqual(summary['out_of_range'], 2)
+        self.assertEqual(summary['histogram']['10'], 9)
+        self.assertEqual(summary['histogram']['1'], 0)
+        self.assertEqual(summary['mean'], 7.4)
+        self.assertEqual(summary['median'], 8)
+        self.assertEqual(summary['percentiles'], {'p10': 0, 'p25': 6, 'p50': 8, 'p75': 10, 'p90': 10})
+        self.assertEqual(summary['nps'], {
+            'promoters': 15, 'passives': 7, 'detractors': 8, 'score': 23.33,
+        })
+
+    @unittest.skipIf(scale_stats.np is None, "numpy is not installed")
+    def test_numpy_gives_the_same_summary(self):
+        with mock.patch.object(scale_stats, 'np', None):
+            expected = scale_statistics(COUNTS, 0, 10)
+        self.assertEqual(scale_statistics(COUNTS, 0, 10), expected)
+
+    def test_no_answers(self):
+        summary = scale_statistics({11: 2}, 1, 5)
+        self.assertEqual((summary['count'], summary['out_of_range'], summary['mean']), (0, 2, None))
+        self.assertEqual(summary['histogram'], {'1': 0, '2': 0, '3': 0, '4': 0, '5': 0})
+
+    def test_histogram_follows_the_step(self):
+        self.assertEqual(list(scale_statistics({}, 0, 10, 5)['histogram']), ['0', '5', '10'])
+
+    def test_value_counts_skips_non_numbers(self):
+        self.assertEqual(value_counts([('3', 2), ('x', 1), (' 3', 1), ('', 4)]), {3: 3})
+
+
+class ScaleQuestionTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.assessment = make_assessment(self.user, published_at=None)
+
+    def create(self, **fields):
+        return self.client.post(
+            f'/api/admin/assessments/{self.assessment.id}/questions/',
+            {'question_text': 'Rate', 'question_type': Question.SCALE, **fields})
+
+    def test_scale_points_are_capped(self):
+        self.assertEqual(self.create(scale_min=0, scale_max=100).status_code, 201)
+        self.assertEqual(self.create(scale_min=0, scale_max=1000, scale_step=10).status_code, 201)
+        response = self.create(scale_min=0, scale_max=101)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('scale_step', response.data)
+        self.assertEqual(self.create(scale_min=-10**9, scale_max=10**9).status_code, 400)
+
+    def test_question_metrics_include_statistics(self):
+        question = make_question(self.assessment, Question.SCALE, scale_min=0, scale_max=10)
+        for text in ['10', '9', '6', '11', 'n/a']:
+            response = Response.objects.create(assessment=self.assessment, respondent_email='r@example.com')
+            Answer.objects.create(response=response, question=question, answer_text=text)
+
+        metrics = question_metrics(self.assessment)[question.id]
+
+        self.assertEqual(metrics['scale'], {'min': 0, 'max': 10, 'step': 1})
+        self.assertEqual(metrics['average_value'], 8.33)
+        self.assertEqual(metrics['answer_distribution']['9']['count'], 1)
+        self.assertEqual(metrics['statistics']['nps']['score'], 33.33)
+        self.assertEqual(metrics['statistics']['out_of_range'], 1)
+
+    def test_synthetic_answers_stay_within_the_scale(self):
+        question = make_question(self.assessment, Question.SCALE, scale_min=0, scale_max=20, scale_step=5)
+        [(_, _, points)] = synthetic.question_specs([self.assessment.id])[self.assessment.id]
+        self.assertEqual(points, ['0', '5', '10', '15', '20'])
+
+        rng = random.Random(3)
+        answers = {synthetic.answer_text(rng, question.question_type, points) for _ in range(500)}
+        self.assertEqual(answers, set(points))
@@ -0,0 +1,96 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from assessments.models import Assessment
+
+from .utils import make_assessment, make_question, make_user
+
+
+class AssessmentSearchTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(make_user('respondent', is_staff=False))
+
+    def search(self, q, **params):
+        response = self.client.get('/api/assessments/search/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_title_matches_rank_above_question_text(self):
+        in_questions = make_assessment(self.user, title='Operations review')
+        make_question(in_questions, question_text='How mature is your marketing plan?')
+        in_title = make_assessment(self.user, title='Marketing health check')
+
+        results = self.search('marketing')['results']
+        self.assertEqual([result['id'] for result in results], [in_title.id, in_questions.id])
+        self.assertIn('<mark>Marketing</mark>', results[0]['highlights']['title'])
+
+    def test_last_word_matches_as_a_prefix(self):
+        assessment = make_assessment(self.user, title='Supply chain resilience')
+        self.assertEqual([r['id'] for r in self.search('supply resil')['results']], [assessment.id])
+
+    def test_highlights_are_escaped(self):
+        make_assessment(self.user, title='Cash <b>flow</b> & budgeting')
+        [result] = self.search('budgeting')['results']
+        self.assertEqual(
+            result['highlights']['title'], 'Cash &lt;b&gt;flow&lt;/b&gt; &amp; <mark>budgeting</mark>')
+
+    def test_unpublished_assessments_are_hidden_from_respondents(self):
+        make_assessment(self.user, title='Draft strategy', published_at=None)
+        self.assertEqual(self.search('strategy')['count'], 0)
+
+    def test_index_follows_question_changes(self):
+        assessment = make_assessment(self.user, title='Review')
+        question = make_question(assessment, question_text='Inventory turnover')
+        self.assertEqual(self.search('inventory')['count'], 1)
+        question.delete()
+        self.assertEqual(self.search('inventory')['count'], 0)
+
+    def test_limit(self):
+        for index in range(3):
+            make_assessment(self.user, title=f'Pricing {index}')
+        self.assertEqual(self.search('pricing', limit=2)['count'], 2)
+
+    def test_validation(self):
+        self.assertEqual(self.client.get('/api/assessments/search/').status_code, 400)
+        response = self.client.get('/api/assessments/search/', {'q': 'x', 'limit': 'many'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_falls_back_to_icontains_without_an_index(self):
+        assessment = make_assessment(self.user, title='Review')
+        make_question(assessment, question_text='Hiring pipeline')
+        with mock.patch('assessments.search.assessment_search_backend', return_value=None):
+            [result] = self.search('hiring')['results']
+        self.assertEqual(result['id'], assessment.id)
+        self.assertIsNone(result['rank'])
+
+    def test_list_search_matches_question_text(self):
+        assessment = make_assessment(self.user, title='Review')
+        make_question(assessment, question_text='Customer retention')
+        make_assessment(self.user, title='Other')
+        response = self.client.get('/api/assessments/', {'search': 'retention'})
+        self.assertEqual([result['id'] for result in response.data], [assessment.id])
+
+
+class RebuildSearchIndexTests(TestCase):
+    def test_rebuilds_rows_written_without_signals(self):
+        user = make_user()
+        Assessment.objects.bulk_create([
+            Assessment(title='Bulk loaded logistics', description='', created_by=user),
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM assessments_assessment_fts')
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+        call_command('rebuild_search_index', stdout=StringIO())
+
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/api/assessments/search/', {'q': 'logistics'})
+        self.assertEqual(response.data['count'], 1)
@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from assessments.authentication.revocation import blacklist_cache, user_state_cache
+
+from .utils import make_assessment, make_user
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_state_cache.clear()
+        blacklist_cache.clear()
+        self.user = make_user()
+        self.assessment = make_assessment(self.user)
+        self.client = APIClient()
+        tokens = self.client.post('/api/auth/token/', {
+            'username': 'admin', 'password': 'unused-password'}, format='json').data
+        self.access, self.refresh = tokens['access'], tokens['refresh']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        self.url = f'/api/assessments/{self.assessment.id}/stats/timeseries/'
+
+    def test_tokens_carry_role_claims(self):
+        token = AccessToken(self.access)
+        self.assertTrue(token['is_staff'])
+        self.assertEqual(token['username'], 'admin')
+
+    def test_user_row_is_read_once_per_cache_period(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertFalse(any('auth_user' in query['sql'] for query in queries))
+
+    def test_deactivated_users_are_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_demoted_staff_must_log_in_again(self):
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_rotated_refresh_tokens_cannot_be_reused(self):
+        client = APIClient()
+        first = client.post('/api/auth/token/refresh/', {'refresh': self.refresh}, format='json')
+        self.assertEqual(first.status_code, 200)
+        again = client.post('/api/auth/token/refresh/', {'refresh': self.refresh}, format='json')
+        self.assertEqual(again.status_code, 401)
@@ -0,0 +1,51 @@
+import random
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from assessments import synthetic
+from assessments.models import Answer, Assessment, PartialResponse, Question, Response
+
+
+class SyntheticDataTests(TestCase):
+    def generate(self, *args):
+        call_command(
+            'generate_synthetic_data', '--assessments', '2', '--questions', '5',
+            '--responses', '30', '--partials', '5', '--respondents', '50',
+            '--seed', '7', '--end', '2026-01-01', *args, stdout=StringIO())
+
+    def snapshot(self):
+        return (
+            list(Response.objects.order_by('id').values_list('respondent_email', 'submitted_at')),
+            list(Answer.objects.order_by('id').values_list('answer_text', flat=True)),
+            list(PartialResponse.objects.order_by('id').values_list('last_updated', flat=True)),
+            list(Assessment.objects.order_by('id').values_list('title', 'published_at')),
+        )
+
+    def test_same_seed_and_end_reproduce_the_data(self):
+        self.generate()
+        first = self.snapshot()
+        Assessment.all_objects.all().delete()
+        self.generate()
+        self.assertEqual(self.snapshot(), first)
+
+    def test_data_ends_at_the_anchor(self):
+        self.generate('--days', '10')
+        latest = Response.objects.latest('submitted_at').submitted_at
+        self.assertEqual(latest.date().isoformat(), '2025-12-31')
+        self.assertEqual(Response.objects.count(), 60)
+
+
+class AnswerTextTests(TestCase):
+    def test_checkbox_picks_favour_earlier_options(self):
+        rng = random.Random(1)
+        values = ['1', '2', '3', '4', '5']
+        counts = dict.fromkeys(values, 0)
+        for _ in range(2000):
+            picked = synthetic.answer_text(rng, Question.CHECKBOX, values).split(',')
+            self.assertEqual(picked, sorted(set(picked), key=values.index))
+            for value in picked:
+                counts[value] += 1
+        self.assertGreater(counts['1'], counts['3'])
+        self.assertGreater(counts['3'], counts['5'])
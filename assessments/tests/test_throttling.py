@@ -0,0 +1,168 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from assessments.coalescing import SingleFlight
+from assessments.throttling import parse_rate
+
+from .utils import make_assessment, make_user
+
+RATES = {
+    'REST_FRAMEWORK': {
+        'DEFAULT_THROTTLE_RATES': {'stats_user': '2/min', 'register_ip': '1/hour'},
+    },
+}
+
+
+class ParseRateTests(SimpleTestCase):
+    def test_parses_drf_rates(self):
+        self.assertEqual(parse_rate('30/min'), (30, 60))
+        self.assertEqual(parse_rate('10/hour'), (10, 3600))
+        self.assertEqual(parse_rate(None), (None, None))
+
+
+@override_settings(**RATES)
+class TokenBucketThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.assessment = make_assessment(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_stats_allow_a_burst_then_throttle(self):
+        url = f'/api/assessments/{self.assessment.id}/stats/'
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+    def test_buckets_are_per_user(self):
+        url = f'/api/assessments/{self.assessment.id}/stats/'
+        for _ in range(3):
+            self.client.get(url)
+        other = APIClient()
+        other.force_authenticate(make_user('other'))
+        self.assertEqual(other.get(url).status_code, 200)
+
+    def test_register_is_limited_per_ip(self):
+        client = APIClient()
+        client.post('/api/auth/register/', {})
+        self.assertEqual(client.post('/api/auth/register/', {}).status_code, 429)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_callers_share_one_computation(self):
+        flight = SingleFlight('test')
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {'value': 42}
+
+        results = []
+
+        def call():
+            results.append(flight.do('key', compute))
+
+        with mock.patch('assessments.coalescing.COALESCED_REQUESTS') as coalesced:
+            threads = [threading.Thread(target=call) for _ in range(4)]
+            threads[0].start()
+            started.wait(5)
+            for thread in threads[1:]:
+                thread.start()
+            # Followers count themselves just before waiting on the leader
+            deadline = time.monotonic() + 5
+            while coalesced.inc.call_count < 3 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_errors_are_raised_and_not_kept(self):
+        flight = SingleFlight('test')
+
+        def fail():
+            raise ValueError('boom')
+
+        with self.assertRaises(ValueError):
+            flight.do('key', fail)
+        self.assertEqual(flight.do('key', lambda: 1), 1)
+
+    def test_callers_in_other_processes_share_one_computation(self):
+        # Separate instances have no local state in common, like two workers
+        # sharing the default cache
+        workers = [SingleFlight('test'), SingleFlight('test')]
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {'value': 42}
+
+        results = []
+
+        def call(flight):
+            results.append(flight.do('shared-key', compute))
+
+        with mock.patch('assessments.coalescing.COALESCED_REQUESTS') as coalesced:
+            leader = threading.Thread(target=call, args=(workers[0],))
+            leader.start()
+            started.wait(5)
+            follower = threading.Thread(target=call, args=(workers[1],))
+            follower.start()
+            time.sleep(0.1)
+            release.set()
+            leader.join(5)
+            follower.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'value': 42}, {'value': 42}])
+        coalesced.inc.assert_called_once_with(flight='test')
+
+    def test_other_processes_compute_after_a_failure(self):
+        workers = [SingleFlight('test'), SingleFlight('test')]
+        started = threading.Event()
+        release = threading.Event()
+
+        def fail():
+            started.set()
+            release.wait(5)
+            raise ValueError('boom')
+
+        errors, results = [], []
+
+        def lead():
+            try:
+                workers[0].do('failing-key', fail)
+            except ValueError as exc:
+                errors.append(exc)
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: results.append(workers[1].do('failing-key', lambda: 1)))
+        follower.start()
+        time.sleep(0.1)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(results, [1])
@@ -0,0 +1,143 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from assessments.models import AssessmentAttempt, PartialResponse, Response
+from assessments.services import ATTEMPT_USED, TIME_LIMIT_EXPIRED
+
+from .utils import make_assessment, make_question, make_user
+
+
+class TimeLimitTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.assessment = make_assessment(make_user(), time_limit_minutes=10)
+        self.question = make_question(self.assessment, choices=[('a', 'A')])
+
+    def open(self, email):
+        return self.client.get(
+            f'/api/assessments/{self.assessment.id}/', {'respondent_email': email})
+
+    def submit(self, email, url='/api/responses/'):
+        return self.client.post(url, {
+            'assessment': self.assessment.id,
+            'respondent_email': email,
+            'answers': [{'question': self.question.id, 'answer_text': 'a'}],
+        }, format='json')
+
+    def test_submission_within_limit_uses_the_attempt(self):
+        self.open('pat@example.com')
+        self.assertEqual(self.submit('pat@example.com').status_code, 201)
+        attempt = AssessmentAttempt.objects.get()
+        self.assertIsNotNone(attempt.submitted_at)
+
+    def test_direct_submission_starts_and_uses_an_attempt(self):
+        self.assertEqual(self.submit('pat@example.com').status_code, 201)
+        self.assertIsNotNone(AssessmentAttempt.objects.get().submitted_at)
+        self.assertEqual(self.submit('pat@example.com').status_code, 400)
+        self.assertEqual(Response.objects.count(), 1)
+
+    def test_first_autosave_starts_the_timer(self):
+        for url in ('/api/partial-responses/', '/api/async/partial-responses/'):
+            self.client.post(url, {
+                'assessment': self.assessment.id, 'respondent_email': 'pat@example.com',
+                'answers': {},
+            }, format='json')
+        attempt = AssessmentAttempt.objects.get()
+        self.assertIsNone(attempt.submitted_at)
+
+        AssessmentAttempt.objects.update(expires_at=timezone.now() - timedelta(minutes=5))
+        response = self.submit('pat@example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['detail'], TIME_LIMIT_EXPIRED)
+
+    def test_second_submission_is_rejected(self):
+        self.open('pat@example.com')
+        self.submit('pat@example.com')
+        response = self.submit('pat@example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['detail'], ATTEMPT_USED)
+
+    def test_reopening_after_submitting_does_not_restart_the_timer(self):
+        started = self.open('pat@example.com').data['attempt']['started_at']
+        self.submit('pat@example.com')
+        reopened = self.open('pat@example.com').data['attempt']
+        self.assertEqual(reopened['started_at'], started)
+        self.assertIsNotNone(reopened['submitted_at'])
+        self.assertEqual(self.submit('pat@example.com').status_code, 400)
+
+    def test_late_submission_is_rejected(self):
+        self.open('pat@example.com')
+        AssessmentAttempt.objects.update(expires_at=timezone.now() - timedelta(minutes=5))
+        response = self.submit('pat@example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['detail'], TIME_LIMIT_EXPIRED)
+
+    def test_email_case_does_not_start_a_new_timer(self):
+        self.open('pat@example.com')
+        self.open('PAT@Example.com')
+        self.assertEqual(AssessmentAttempt.objects.count(), 1)
+        AssessmentAttempt.objects.update(expires_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(self.submit('Pat@Example.com').status_code, 400)
+
+    def test_async_submission_enforces_the_limit(self):
+        self.client.get(
+            f'/api/async/assessments/{self.assessment.id}/', {'respondent_email': 'pat@example.com'})
+        AssessmentAttempt.objects.update(expires_at=timezone.now() - timedelta(minutes=5))
+        response = self.submit('pat@example.com', url='/api/async/responses/')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['detail'], TIME_LIMIT_EXPIRED)
+
+        self.assertEqual(self.submit('sam@example.com', url='/api/async/responses/').status_code, 201)
+
+    def test_untimed_assessment_needs_no_attempt(self):
+        self.assessment.time_limit_minutes = None
+        self.assessment.save()
+        self.assertEqual(self.submit('pat@example.com').status_code, 201)
+        self.assertEqual(self.submit('pat@example.com').status_code, 201)
+
+
+class SweepExpiredAttemptsTests(TestCase):
+    def test_deletes_attempts_past_retention(self):
+        assessment = make_assessment(make_user(), time_limit_minutes=10)
+        now = timezone.now()
+        for email, days, submitted in [
+            ('old@example.com', 40, False), ('used@example.com', 40, True),
+            ('recent@example.com', 20, True),
+        ]:
+            expires_at = now - timedelta(days=days)
+            AssessmentAttempt.objects.create(
+                assessment=assessment, respondent_email=email, started_at=expires_at,
+                expires_at=expires_at, submitted_at=expires_at if submitted else None)
+
+        output = StringIO()
+        call_command('sweep_expired_attempts', '--retention-days', '30', '--batch-size', '1',
+                     stdout=output)
+
+        self.assertEqual(list(AssessmentAttempt.objects.values_list('respondent_email', flat=True)),
+                         ['recent@example.com'])
+        self.assertIn('2 attempts past retention', output.getvalue())
+
+    def test_deletes_drafts_and_keeps_attempts(self):
+        assessment = make_assessment(make_user(), time_limit_minutes=10)
+        now = timezone.now()
+        for email, expires_at in [
+            ('old@example.com', now - timedelta(days=2)),
+            ('new@example.com', now + timedelta(minutes=5)),
+        ]:
+            AssessmentAttempt.objects.create(
+                assessment=assessment, respondent_email=email,
+                started_at=expires_at - timedelta(minutes=10), expires_at=expires_at)
+            PartialResponse.objects.create(
+                assessment=assessment, respondent_email=email.upper(), answers={})
+
+        call_command('sweep_expired_attempts', '--batch-size', '1', stdout=StringIO())
+
+        self.assertEqual(AssessmentAttempt.objects.count(), 2)
+        self.assertEqual(
+            list(PartialResponse.objects.values_list('respondent__email', flat=True)),
+            ['new@example.com'])
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from assessments.models import Response, ResponseCounter, ResponseRollup
+from assessments.timeseries import counters_fit, rebuild_counters, record_submission, response_series
+
+from .utils import make_assessment, make_user
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class ResponseCounterTests(TestCase):
+    def setUp(self):
+        self.assessment = make_assessment(make_user())
+
+    def respond(self, submitted_at, record=True):
+        response = Response.objects.create(
+            assessment=self.assessment, respondent_email='pat@example.com')
+        Response.objects.filter(pk=response.pk).update(submitted_at=submitted_at)
+        response.submitted_at = submitted_at
+        if record:
+            record_submission(response)
+        return response
+
+    def test_submissions_increment_the_hour_bucket(self):
+        self.respond(utc(2026, 3, 1, 10, 5))
+        self.respond(utc(2026, 3, 1, 10, 55))
+        self.respond(utc(2026, 3, 1, 11, 0))
+        self.assertEqual(
+            list(ResponseCounter.objects.order_by('bucket').values_list('bucket', 'count')),
+            [(utc(2026, 3, 1, 10), 2), (utc(2026, 3, 1, 11), 1)])
+
+    def test_rebuild_backfills_from_responses(self):
+        for submitted_at in [utc(2026, 3, 1, 10, 5), utc(2026, 3, 1, 10, 30), utc(2026, 3, 2, 9)]:
+            self.respond(submitted_at, record=False)
+        ResponseCounter.objects.create(assessment=self.assessment, bucket=utc(2020, 1, 1), count=7)
+
+        self.assertEqual(rebuild_counters([self.assessment.id]), 2)
+        self.assertEqual(
+            list(ResponseCounter.objects.order_by('bucket').values_list('bucket', 'count')),
+            [(utc(2026, 3, 1, 10), 2), (utc(2026, 3, 2, 9), 1)])
+
+    def test_days_follow_the_requested_time_zone(self):
+        # 23:30 UTC on 1 March is already 2 March in Lagos (UTC+1)
+        self.respond(utc(2026, 3, 1, 23, 30))
+        self.respond(utc(2026, 3, 1, 12))
+        lagos = ZoneInfo('Africa/Lagos')
+        series = response_series(self.assessment.id, 'day', tzinfo=lagos)
+        self.assertEqual([row['count'] for row in series], [1, 1])
+        utc_series = response_series(self.assessment.id, 'day', tzinfo=dt_timezone.utc)
+        self.assertEqual([row['count'] for row in utc_series], [2])
+
+
+class ResponseTimeSeriesViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.assessment = make_assessment(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/assessments/{self.assessment.id}/stats/timeseries/'
+
+    def test_filters_by_date_range(self):
+        for hour in [utc(2026, 3, 1, 10), utc(2026, 3, 5, 10)]:
+            ResponseCounter.objects.create(assessment=self.assessment, bucket=hour, count=3)
+        response = self.client.get(self.url, {'start': '2026-03-02', 'end': '2026-03-05', 'tz': 'UTC'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['count'] for row in response.data['series']], [3])
+
+    def test_rejects_bad_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'bucket': 'year'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'start': 'soon'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'end': '2026-02-30'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'tz': 'Mars/Base'}).status_code, 400)
+
+    def test_half_hour_zones_count_the_responses(self):
+        # 18:45 UTC on 1 March is 00:15 on 2 March in Kolkata (UTC+05:30),
+        # but the 18:00 UTC counter hour starts on 1 March there
+        for submitted_at in [utc(2026, 3, 1, 18, 15), utc(2026, 3, 1, 18, 45)]:
+            response = Response.objects.create(
+                assessment=self.assessment, respondent_email='pat@example.com')
+            Response.objects.filter(pk=response.pk).update(submitted_at=submitted_at)
+            response.submitted_at = submitted_at
+            record_submission(response)
+
+        response = self.client.get(self.url, {'tz': 'Asia/Kolkata'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(str(row['period']), row['count']) for row in response.data['series']],
+            [('2026-03-01', 1), ('2026-03-02', 1)])
+
+        # Bounds inside an hour are exact too
+        response = self.client.get(self.url, {'start': '2026-03-01T18:30:00', 'tz': 'UTC'})
+        self.assertEqual([row['count'] for row in response.data['series']], [1])
+
+    def test_half_hour_zones_are_refused_over_archived_responses(self):
+        ResponseRollup.objects.create(assessment=self.assessment, day='2026-03-01', responses=4)
+        response = self.client.get(self.url, {'tz': 'Asia/Kolkata'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'tz': 'Asia/Tokyo'}).status_code, 200)
+
+
+class CountersFitTests(SimpleTestCase):
+    def test_zone_offsets_and_bounds(self):
+        kolkata, lord_howe = ZoneInfo('Asia/Kolkata'), ZoneInfo('Australia/Lord_Howe')
+        self.assertTrue(counters_fit(ZoneInfo('America/New_York')))
+        self.assertFalse(counters_fit(kolkata))
+        # +10:30 in winter, +11 in summer
+        self.assertFalse(counters_fit(lord_howe, utc(2026, 1, 1), utc(2026, 1, 2) - timedelta(microseconds=1)))
+        self.assertTrue(counters_fit(dt_timezone.utc, utc(2026, 1, 1), utc(2026, 1, 1, 23, 59, 59, 999999)))
+        self.assertFalse(counters_fit(dt_timezone.utc, utc(2026, 1, 1, 0, 30)))
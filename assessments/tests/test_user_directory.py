@@ -0,0 +1,66 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from assessments.models import Response
+
+from .utils import make_assessment, make_user
+
+
+class UserDirectoryTests(TestCase):
+    def setUp(self):
+        self.admin = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def usernames(self, response):
+        return [user['username'] for user in response.data['results']]
+
+    def test_pages_newest_first(self):
+        for index in range(4):
+            make_user(f'user{index}', is_staff=False)
+
+        first = self.client.get('/api/admin/users/', {'page_size': 3})
+        self.assertEqual(self.usernames(first), ['user3', 'user2', 'user1'])
+        second = self.client.get(first.data['next'])
+        self.assertEqual(self.usernames(second), ['user0', 'admin'])
+        self.assertIsNone(second.data['next'])
+
+    def test_search_matches_substrings_of_any_field(self):
+        make_user('pat', is_staff=False, email='pat.jones@example.com')
+        make_user('sam', is_staff=False, first_name='Jonesy')
+        make_user('lee', is_staff=False)
+
+        response = self.client.get('/api/admin/users/', {'search': 'ONES'})
+        self.assertEqual(sorted(self.usernames(response)), ['pat', 'sam'])
+
+    def test_search_index_follows_updates(self):
+        user = make_user('pat', is_staff=False)
+        user.last_name = 'Okafor'
+        user.save()
+        User.objects.filter(username='admin').update(last_name='Kafka')
+
+        response = self.client.get('/api/admin/users/', {'search': 'kaf'})
+        self.assertEqual(sorted(self.usernames(response)), ['admin', 'pat'])
+
+    def test_short_terms_match_prefixes(self):
+        make_user('ab-user', is_staff=False)
+        make_user('user-ab', is_staff=False)
+
+        response = self.client.get('/api/admin/users/', {'search': 'ab'})
+        self.assertEqual(self.usernames(response), ['ab-user'])
+
+    def test_counts_responses_by_normalized_email(self):
+        make_user('pat', is_staff=False, email='Pat@Example.com')
+        assessment = make_assessment(self.admin)
+        Response.objects.create(assessment=assessment, respondent_email='pat@example.com')
+        Response.objects.create(assessment=assessment, respondent_email='PAT@example.com')
+
+        response = self.client.get('/api/admin/users/', {'search': 'pat'})
+        [user] = response.data['results']
+        self.assertEqual(user['response_count'], 2)
+
+    def test_requires_staff(self):
+        client = APIClient()
+        client.force_authenticate(make_user('pat', is_staff=False))
+        self.assertEqual(client.get('/api/admin/users/').status_code, 403)
@@ -0,0 +1,87 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from assessments.models import Assessment, Choice, Question
+
+from .utils import make_assessment, make_question, make_user
+
+
+class VersioningTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.first = make_assessment(self.user, title='Review')
+        make_question(self.first, choices=[('a', 'A'), ('b', 'B')])
+
+    def clone(self, assessment, **data):
+        response = self.client.post(f'/api/admin/assessments/{assessment.id}/clone/', data, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return Assessment.objects.get(pk=response.data['id'])
+
+    def test_clone_copies_questions_as_the_next_version(self):
+        second = self.clone(self.first)
+        third = self.clone(second)
+
+        self.assertEqual((second.root_id, second.version, second.parent_id), (self.first.id, 2, self.first.id))
+        self.assertEqual((third.root_id, third.version), (self.first.id, 3))
+        self.assertIsNone(third.published_at)
+        self.assertEqual(Question.objects.filter(assessment=third).count(), 1)
+        self.assertEqual(Choice.objects.filter(question__assessment=third).count(), 2)
+
+    def test_clone_as_a_new_assessment(self):
+        copy = self.clone(self.first, new_assessment=True)
+        self.assertEqual((copy.root_id, copy.version), (None, 1))
+
+    def test_published_versions_are_frozen(self):
+        question = self.first.questions.get()
+        response = self.client.patch(f'/api/admin/questions/{question.id}/', {'question_text': 'New'})
+        self.assertEqual(response.status_code, 409)
+
+    def test_publishing_closes_earlier_versions(self):
+        second = self.clone(self.first)
+        response = self.client.post(f'/api/admin/assessments/{second.id}/publish/')
+        self.assertEqual(response.status_code, 200)
+
+        self.first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertIsNotNone(second.published_at)
+        self.assertEqual(self.first.available_to, second.published_at)
+
+    def test_publishing_needs_questions(self):
+        draft = make_assessment(self.user, published_at=None)
+        response = self.client.post(f'/api/admin/assessments/{draft.id}/publish/')
+        self.assertEqual(response.status_code, 400)
+
+    def test_versions_list(self):
+        second = self.clone(self.first)
+        response = self.client.get(f'/api/admin/assessments/{second.id}/versions/')
+        self.assertEqual([(v['id'], v['version']) for v in response.data],
+                         [(self.first.id, 1), (second.id, 2)])
+
+    def test_deleting_the_first_version_keeps_later_ones(self):
+        second = self.clone(self.first)
+        third = self.clone(second)
+
+        self.first.delete()
+
+        second.refresh_from_db()
+        third.refresh_from_db()
+        self.assertEqual((second.root_id, second.parent_id), (None, None))
+        self.assertEqual((third.root_id, third.parent_id), (second.id, second.id))
+        self.assertEqual(self.clone(third).version, 4)
+
+    def test_deleting_every_version(self):
+        self.clone(self.clone(self.first))
+        Assessment.objects.all().delete()
+        self.assertFalse(Assessment.all_objects.exists())
+
+    def test_deleting_the_owner_keeps_versions_by_others(self):
+        other = make_user('other')
+        self.client.force_authenticate(other)
+        second = self.clone(self.first)
+
+        self.user.delete()
+
+        second.refresh_from_db()
+        self.assertEqual((second.root_id, second.version), (None, 2))
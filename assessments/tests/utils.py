@@ -0,0 +1,25 @@
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from assessments.models import Assessment, Choice, Question
+
+
+def make_user(username='admin', **kwargs):
+    kwargs.setdefault('is_staff', True)
+    return User.objects.create_user(username=username, password='unused-password', **kwargs)
+
+
+def make_assessment(user, **kwargs):
+    kwargs.setdefault('title', 'Assessment')
+    kwargs.setdefault('description', '')
+    kwargs.setdefault('published_at', timezone.now())
+    return Assessment.objects.create(created_by=user, **kwargs)
+
+
+def make_question(assessment, question_type=Question.MULTIPLE_CHOICE, choices=(), **kwargs):
+    kwargs.setdefault('question_text', f'{question_type} question')
+    question = Question.objects.create(
+        assessment=assessment, question_type=question_type, **kwargs)
+    for value, label in choices:
+        Choice.objects.create(question=question, value=value, choice_text=label)
+    return question
@@ -0,0 +1,92 @@
+import threading
+import time
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+_lock = threading.Lock()
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    Parse a DRF style rate such as ``"30/min"`` into ``(capacity, period)``.
+    The bucket holds ``capacity`` tokens and refills them over ``period``
+    seconds, so short bursts up to the full rate are allowed.
+    """
+    if rate is None:
+        return None, None
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token-bucket throttle keyed by ``view.throttle_scope``. The rate is read
+    from ``DEFAULT_THROTTLE_RATES['<scope>_<kind>']``; scopes without a rate
+    are not throttled.
+
+    Buckets live in the default cache, which is the local memory cache
+    unless CACHES says otherwise, so limits are enforced per process.
+    """
+    kind = None
+
+    def get_identity(self, request, view):
+        raise NotImplementedError('.get_identity() must be overridden')
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if not scope:
+            return True
+
+        capacity, period = parse_rate(
+            api_settings.DEFAULT_THROTTLE_RATES.get(f'{scope}_{self.kind}')
+        )
+        if capacity is None:
+            return True
+
+        ident = self.get_identity(request, view)
+        if ident is None:
+            return True
+
+        key = f'throttle_{scope}_{self.kind}_{ident}'
+        refill = capacity / period
+        now = time.time()
+
+        # Local cache reads and writes aren't atomic, so serialise the update
+        with _lock:
+            tokens, updated = cache.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            cache.set(key, (tokens, now), period)
+
+        self.wait_seconds = None if allowed else (1 - tokens) / refill
+        return allowed
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Per-user bucket; anonymous requests are left to the IP throttle"""
+    kind = 'user'
+
+    def get_identity(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return None
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Per-client-address bucket (honours NUM_PROXIES)"""
+    kind = 'ip'
+
+    def get_identity(self, request, view):
+        return self.get_ident(request)
+
+
+STATS_THROTTLES = [UserTokenBucketThrottle, IPTokenBucketThrottle]
@@ -0,0 +1,160 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncHour, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Response, ResponseCounter, ResponseRollup
+
+# Counters are stored per UTC hour; every other bucket is rolled up from them
+# in the requested time zone. Zones whose offset isn't a whole number of hours
+# (e.g. Asia/Kolkata, +05:30), and bounds inside an hour, split counter hours,
+# so those queries count the responses themselves.
+BUCKETS = {
+    'hour': TruncHour,
+    'day': TruncDate,
+    'week': TruncWeek,
+}
+
+
+def hour_bucket(moment):
+    """Return the start of the UTC hour containing ``moment``"""
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def parse_bound(value, tzinfo, end=False):
+    """
+    Parse a date or datetime query parameter into an aware datetime.
+    Plain dates cover the whole day, so an ``end`` date is inclusive.
+    """
+    # parse_datetime also accepts plain dates (as midnight), so try those first
+    try:
+        day = parse_date(value)
+        if day is not None:
+            moment = datetime.combine(day, time.max if end else time.min)
+        else:
+            moment = parse_datetime(value)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValueError(f"Invalid date: {value}")
+
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, tzinfo)
+    return moment
+
+
+def record_submission(response):
+    """Increment the hourly counter for a newly submitted response"""
+    lookup = {
+        'assessment_id': response.assessment_id,
+        'bucket': hour_bucket(response.submitted_at),
+    }
+    if ResponseCounter.objects.filter(**lookup).update(count=F('count') + 1):
+        return
+
+    try:
+        with transaction.atomic():
+            ResponseCounter.objects.create(count=1, **lookup)
+    except IntegrityError:
+        # Another submission created the bucket first
+        ResponseCounter.objects.filter(**lookup).update(count=F('count') + 1)
+
+
+def _on_the_hour(moment):
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0) == moment
+
+
+def counters_fit(tzinfo, start=None, end=None):
+    """
+    Whether whole UTC-hour counters answer a query exactly: the bounds fall
+    on UTC hours (an inclusive ``end`` just before one) and ``tzinfo`` is a
+    whole number of hours from UTC at the bounds and in January and July of
+    the years they span.
+    """
+    if start is not None and not _on_the_hour(start):
+        return False
+    if end is not None and not _on_the_hour(end + timedelta(microseconds=1)):
+        return False
+
+    now = timezone.now()
+    first, last = (start or end or now), (end or now)
+    moments = [first, last]
+    for year in range(first.year, last.year + 1):
+        moments += [
+            datetime(year, 1, 1, tzinfo=dt_timezone.utc),
+            datetime(year, 7, 1, tzinfo=dt_timezone.utc),
+        ]
+    return all(
+        moment.astimezone(tzinfo).utcoffset() % timedelta(hours=1) == timedelta(0)
+        for moment in moments
+    )
+
+
+def response_series(assessment_id, bucket='day', start=None, end=None, tzinfo=None):
+    """
+    Get the number of responses per bucket for an assessment, as a list of
+    ``{'period': ..., 'count': ...}`` dicts ordered by period.
+
+    Raises ValueError when the hourly counters can't be used (see
+    counters_fit) and archived responses, which only the counters still
+    include, fall in the range.
+    """
+    tzinfo = tzinfo or timezone.get_current_timezone()
+    if counters_fit(tzinfo, start, end):
+        rows = ResponseCounter.objects.filter(assessment_id=assessment_id)
+        field, total = 'bucket', Sum('count')
+    else:
+        archived = ResponseRollup.objects.filter(assessment_id=assessment_id)
+        if start is not None:
+            archived = archived.filter(day__gte=start.astimezone(dt_timezone.utc).date())
+        if end is not None:
+            archived = archived.filter(day__lte=end.astimezone(dt_timezone.utc).date())
+        if archived.exists():
+            raise ValueError(
+                "Archived responses are only counted per UTC hour; use whole-hour "
+                "bounds and a time zone with a whole-hour UTC offset.")
+        rows = Response.objects.filter(assessment_id=assessment_id)
+        field, total = 'submitted_at', Count('id')
+
+    if start is not None:
+        rows = rows.filter(**{f'{field}__gte': start})
+    if end is not None:
+        rows = rows.filter(**{f'{field}__lte': end})
+
+    rows = rows.annotate(
+        period=BUCKETS[bucket](field, tzinfo=tzinfo)
+    ).values('period').annotate(count=total).order_by('period')
+
+    return [{'period': row['period'], 'count': row['count']} for row in rows]
+
+
+def rebuild_counters(assessment_ids=None):
+    """Recompute hourly counters from the stored responses"""
+    responses = Response.objects.all()
+    counters = ResponseCounter.objects.all()
+    if assessment_ids is not None:
+        responses = responses.filter(assessment_id__in=assessment_ids)
+        counters = counters.filter(assessment_id__in=assessment_ids)
+
+    rows = responses.annotate(
+        hour=TruncHour('submitted_at', tzinfo=dt_timezone.utc)
+    ).values('assessment_id', 'hour').annotate(count=Count('id')).order_by()
+
+    with transaction.atomic():
+        counters.delete()
+        created = ResponseCounter.objects.bulk_create(
+            [
+                ResponseCounter(
+                    assessment_id=row['assessment_id'],
+                    bucket=row['hour'],
+                    count=row['count'],
+                )
+                for row in rows
+            ],
+            batch_size=1000,
+        )
+
+    return len(created)
@@ -1,12 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import views, async_views
 from .authentication import urls as auth_urls
 from .api import urls as api_urls  # Import the API URLs
 
 urlpatterns = [
     # Public assessment endpoints
     path('assessments/', views.AssessmentList.as_view(), name='assessment-list'),
+    path('assessments/search/', views.AssessmentSearchView.as_view(),
+         name='assessment-search'),
     path('assessments/<int:pk>/', views.AssessmentDetail.as_view(),
          name='assessment-detail'),
 
@@ -24,10 +26,18 @@ urlpatterns = [
          name='admin-assessment-list'),
     path('admin/assessments/<int:pk>/',
          views.AssessmentAdminDetail.as_view(), name='admin-assessment-detail'),
+    path('admin/assessments/<int:pk>/publish/',
+         views.AssessmentPublishView.as_view(), name='admin-assessment-publish'),
+    path('admin/assessments/<int:pk>/clone/',
+         views.AssessmentCloneView.as_view(), name='admin-assessment-clone'),
+    path('admin/assessments/<int:pk>/versions/',
+         views.AssessmentVersionList.as_view(), name='admin-assessment-versions'),
 
     # Questions and choices management
     path('admin/assessments/<int:assessment_id>/questions/',
          views.QuestionList.as_view(), name='question-list'),
+    path('admin/assessments/<int:assessment_id>/questions/reorder/',
+         views.QuestionReorderView.as_view(), name='question-reorder'),
     path('admin/questions/<int:pk>/',
          views.QuestionDetail.as_view(), name='question-detail'),
     path('admin/questions/<int:question_id>/choices/',
@@ -39,11 +49,21 @@ urlpatterns = [
     path('responses/list/', views.ResponseList.as_view(), name='response-list'),
     path('responses/<int:pk>/', views.ResponseDetail.as_view(),
          name='response-detail'),
+    path('respondents/history/', views.RespondentHistoryView.as_view(),
+         name='respondent-history'),
 
     # Assessment statistics
     path('assessments/<int:assessment_id>/stats/',
          views.AssessmentStatsView.as_view(), name='assessment-stats'),
 
+    # Async variants of the respondent hot paths (for ASGI deployments)
+    path('async/assessments/<int:pk>/', async_views.assessment_detail,
+         name='async-assessment-detail'),
+    path('async/partial-responses/', async_views.partial_response_upsert,
+         name='async-partial-response-upsert'),
+    path('async/responses/', async_views.response_create,
+         name='async-response-create'),
+
     # Include API URLs
     path('', include(api_urls)),  # Include all API URLs
     
@@ -0,0 +1,126 @@
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import Assessment, Choice, Question
+from .search import index_assessments
+
+
+class AssessmentPublished(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = (
+        'This assessment version is published, so its questions and choices '
+        'can no longer change. Clone it to make a new version.'
+    )
+    default_code = 'assessment_published'
+
+
+def ensure_draft(assessment):
+    """Refuse changes to the question set of a published version"""
+    if assessment.is_published:
+        raise AssessmentPublished()
+
+
+def versions_of(assessment, include_deleted=False):
+    family_id = assessment.family_id
+    manager = Assessment.all_objects if include_deleted else Assessment.objects
+    return manager.filter(Q(pk=family_id) | Q(root_id=family_id))
+
+
+def detach_versions(assessment_id, using='default'):
+    """
+    Point other versions away from an assessment about to be removed. When
+    it is the first version, the earliest remaining one takes its place.
+    """
+    versions = Assessment.all_objects.using(using)
+    versions.filter(parent_id=assessment_id).update(parent=None)
+    later = versions.filter(root_id=assessment_id).order_by('version')
+    successor = later.first()
+    if successor is not None:
+        later.exclude(pk=successor.pk).update(root=successor)
+        versions.filter(pk=successor.pk).update(root=None)
+
+
+def _copy(instance, **changes):
+    """Unsaved copy of a model instance with every concrete field but the pk"""
+    values = {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+        if not field.primary_key
+    }
+    values.update(changes)
+    return type(instance)(**values)
+
+
+@transaction.atomic
+def clone_assessment(assessment, created_by, new_assessment=False):
+    """
+    Copy a version with all its questions and choices into a new draft.
+    The copy is the next version of the same assessment, or with
+    ``new_assessment`` the first version of a separate one. Questions and
+    choices are copied with one bulk insert each, so the query count does
+    not grow with the size of the assessment.
+    """
+    if new_assessment:
+        root_id, version = None, 1
+    else:
+        root_id = assessment.family_id
+        # Lock the first version so concurrent clones get distinct numbers.
+        # Deleted versions still hold their numbers until they are purged.
+        list(Assessment.all_objects.select_for_update().filter(pk=root_id).values_list('pk'))
+        version = versions_of(assessment, include_deleted=True).aggregate(
+            latest=Max('version'))['latest'] + 1
+
+    copy = _copy(
+        assessment,
+        root_id=root_id,
+        parent_id=assessment.pk,
+        version=version,
+        published_at=None,
+        deleted_at=None,
+        created_by_id=created_by.pk,
+    )
+    copy.save()
+
+    questions = list(assessment.questions.order_by('order', 'id'))
+    copies = Question.objects.bulk_create([
+        _copy(question, assessment_id=copy.pk) for question in questions
+    ])
+    question_ids = {old.pk: new.pk for old, new in zip(questions, copies)}
+
+    Choice.objects.bulk_create([
+        _copy(choice, question_id=question_ids[choice.question_id])
+        for choice in Choice.objects.filter(question__assessment=assessment).order_by('id')
+    ])
+
+    # bulk_create skips the signals that maintain the search index
+    index_assessments([copy.pk])
+    return copy
+
+
+@transaction.atomic
+def publish_assessment(assessment):
+    """
+    Freeze a draft version. Earlier published versions stop being
+    available when this one becomes available, so respondents only ever
+    see one version; responses already in progress can still be submitted.
+    """
+    assessment = Assessment.objects.select_for_update().get(pk=assessment.pk)
+    if assessment.is_published:
+        return assessment
+    if not assessment.questions.exists():
+        raise ValidationError({'detail': 'Add at least one question before publishing.'})
+
+    now = timezone.now()
+    assessment.published_at = now
+    assessment.save(update_fields=['published_at', 'updated_at'])
+
+    opens_at = max(assessment.available_from or now, now)
+    versions_of(assessment).exclude(pk=assessment.pk).filter(
+        Q(available_to__isnull=True) | Q(available_to__gt=opens_at),
+        published_at__isnull=False,
+    ).update(available_to=opens_at)
+
+    return assessment
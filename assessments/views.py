@@ -1,69 +1,149 @@
-from rest_framework import generics, permissions, status, filters
+from rest_framework import generics, permissions, status, filters, serializers
 from rest_framework.views import APIView
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
-from django.db.models import Count, Avg, Q, F, Sum, Case, When, IntegerField
+from django.db.models import Count, Avg, Q, F, Sum, Case, When, IntegerField, Value, CharField
 from django.db.models.functions import Cast 
+from datetime import timezone as dt_timezone
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
-from django.db import transaction
 from django.contrib.auth.models import User
 
 from .models import Assessment, Question, Choice, Response as AssessmentResponse
-from .models import Answer, PartialResponse
+from .models import Answer, PartialResponse, AssessmentAttempt, Respondent
+from .analytics import question_metrics
+from .archive import archived_responses
+from .ordering import move_question, next_order, reorder_questions
+from .purge import SoftDeleteAssessmentMixin
+from .question_metadata import assessment_questions
+from .versioning import clone_assessment, ensure_draft, publish_assessment, versions_of
+from .authentication.tokens import DASHBOARD_AUTHENTICATION_CLASSES
+from .coalescing import stats_flight
+from .metrics import InstrumentedViewMixin
+from .routers import ReplicaReadMixin
+from .search import filter_assessments, search_assessments
+from .services import save_submission
+from .throttling import STATS_THROTTLES
+from .timeseries import response_series
 from .serializers import (
     AssessmentSerializer, 
     QuestionSerializer, 
     ChoiceSerializer,
     ResponseSerializer, 
     AnswerSerializer, 
-    PartialResponseSerializer
+    PartialResponseSerializer,
+    RespondentHistorySerializer,
+    AssessmentAdminSerializer,
+    AssessmentVersionSerializer,
 )
 
+class AssessmentSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` over titles, descriptions and question text using the
+    full-text index (see assessments/search.py)
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = self.get_search_terms(request).strip()
+        if not text:
+            return queryset
+        return filter_assessments(queryset, text)
+
+
+def available_assessments(request):
+    """Assessments the requesting user may see"""
+    now = timezone.now()
+    queryset = Assessment.objects.all()
+
+    # Filter by publication and availability unless user is staff
+    if not request.user.is_staff:
+        queryset = queryset.filter(
+            Q(available_from__isnull=True) | Q(available_from__lte=now),
+            Q(available_to__isnull=True) | Q(available_to__gte=now),
+            published_at__isnull=False,
+        )
+
+    return queryset
+
+
 class AssessmentList(generics.ListAPIView):
     """
     List all assessments that are currently available.
     Filtering by availability dates is applied.
     """
     serializer_class = AssessmentSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'description']
+    filter_backends = [AssessmentSearchFilter, filters.OrderingFilter]
     ordering_fields = ['created_at', 'title']
     ordering = ['-created_at']
 
     def get_queryset(self):
-        now = timezone.now()
-        queryset = Assessment.objects.all()
-        
-        # Filter by availability unless user is staff
-        if not self.request.user.is_staff:
-            queryset = queryset.filter(
-                Q(available_from__isnull=True) | Q(available_from__lte=now),
-                Q(available_to__isnull=True) | Q(available_to__gte=now)
-            )
-        
-        return queryset
+        return available_assessments(self.request)
+
+
+class AssessmentSearchView(APIView):
+    """
+    Ranked full-text search over available assessments. ``q`` is the query
+    and ``limit`` caps the results (default 20, max 100). Each result has
+    HTML-escaped highlights with matches wrapped in ``<mark>``.
+    """
+
+    def get(self, request):
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), 100)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        hits = search_assessments(available_assessments(request), text, max(limit, 1))
+        assessments = Assessment.objects.in_bulk([hit['id'] for hit in hits])
+
+        results = []
+        for hit in hits:
+            assessment = assessments.get(hit['id'])
+            if assessment is None:
+                continue
+            results.append({
+                'id': assessment.id,
+                'title': assessment.title,
+                'description': assessment.description,
+                'created_at': assessment.created_at,
+                'time_limit_minutes': assessment.time_limit_minutes,
+                'rank': hit['rank'],
+                'highlights': hit['highlights'],
+            })
+
+        return Response({'query': text, 'count': len(results), 'results': results})
 
 
 class AssessmentDetail(generics.RetrieveAPIView):
     """
     Retrieve a specific assessment with all its questions and choices.
+    Passing ``respondent_email`` starts the timer for timed assessments.
     """
     queryset = Assessment.objects.all()
     serializer_class = AssessmentSerializer
 
     def get_queryset(self):
-        now = timezone.now()
-        queryset = Assessment.objects.all()
-        
-        # Filter by availability unless user is staff
-        if not self.request.user.is_staff:
-            queryset = queryset.filter(
-                Q(available_from__isnull=True) | Q(available_from__lte=now),
-                Q(available_to__isnull=True) | Q(available_to__gte=now)
-            )
-        
-        return queryset
+        return available_assessments(self.request)
+
+    def retrieve(self, request, *args, **kwargs):
+        assessment = self.get_object()
+        data = self.get_serializer(assessment).data
+
+        email = request.query_params.get('respondent_email')
+        if email and assessment.time_limit_minutes:
+            email = serializers.EmailField().run_validation(email)
+            attempt = AssessmentAttempt.start(assessment, email, timezone.now())
+            data['attempt'] = {
+                'started_at': attempt.started_at,
+                'expires_at': attempt.expires_at,
+                'submitted_at': attempt.submitted_at,
+            }
+
+        return Response(data)
 
 
 class AssessmentAdminList(generics.ListCreateAPIView):
@@ -78,15 +158,62 @@ class AssessmentAdminList(generics.ListCreateAPIView):
         serializer.save(created_by=self.request.user)
 
 
-class AssessmentAdminDetail(generics.RetrieveUpdateDestroyAPIView):
+class AssessmentAdminDetail(SoftDeleteAssessmentMixin, generics.RetrieveUpdateDestroyAPIView):
     """
-    Retrieve, update, or delete an assessment (admin only)
+    Retrieve, update, or delete an assessment (admin only). Deleting
+    returns 202 with the background job that purges its responses.
     """
     queryset = Assessment.objects.all()
     serializer_class = AssessmentSerializer
     permission_classes = [permissions.IsAdminUser]
 
 
+class AssessmentPublishView(APIView):
+    """
+    Publish a draft version, freezing its questions and choices and
+    closing earlier versions to new respondents (admin only)
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request, pk):
+        assessment = publish_assessment(get_object_or_404(Assessment, pk=pk))
+        return Response(AssessmentAdminSerializer(assessment).data)
+
+
+class AssessmentCloneView(APIView):
+    """
+    Copy an assessment version with its questions and choices into a new
+    draft version. With ``new_assessment`` set the copy starts a separate
+    assessment instead (admin only).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request, pk):
+        source = get_object_or_404(Assessment, pk=pk)
+        new_assessment = serializers.BooleanField(default=False).run_validation(
+            request.data.get('new_assessment', False)
+        )
+        copy = clone_assessment(source, request.user, new_assessment=new_assessment)
+        copy = Assessment.objects.prefetch_related('questions__choices').get(pk=copy.pk)
+        return Response(AssessmentAdminSerializer(copy).data, status=status.HTTP_201_CREATED)
+
+
+class AssessmentVersionList(generics.ListAPIView):
+    """
+    All versions of an assessment, oldest first, with their response
+    counts. Stats are per version: use a version's id (admin only).
+    """
+    serializer_class = AssessmentVersionSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = None
+
+    def get_queryset(self):
+        assessment = get_object_or_404(Assessment, pk=self.kwargs['pk'])
+        return versions_of(assessment).annotate(
+            response_count=Count('response')
+        ).order_by('version')
+
+
 class QuestionList(generics.ListCreateAPIView):
     """
     List and create questions for an assessment (admin only)
@@ -96,22 +223,65 @@ class QuestionList(generics.ListCreateAPIView):
 
     def get_queryset(self):
         assessment_id = self.kwargs.get('assessment_id')
-        return Question.objects.filter(assessment_id=assessment_id).order_by('order')
+        return Question.objects.filter(assessment_id=assessment_id).order_by('order', 'id')
 
     def perform_create(self, serializer):
         assessment_id = self.kwargs.get('assessment_id')
         assessment = get_object_or_404(Assessment, pk=assessment_id)
-        serializer.save(assessment=assessment)
+        ensure_draft(assessment)
+        if 'order' in serializer.initial_data:
+            serializer.save(assessment=assessment)
+        else:
+            serializer.save(assessment=assessment, order=next_order(assessment))
+
+
+class QuestionReorderView(APIView):
+    """
+    Reorder an assessment's questions (admin only). Either send
+    ``question_ids`` listing every question in the new order, or move one
+    question with ``question_id`` and ``after`` (the question it should
+    follow, or null for the top). Returns the new order.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request, assessment_id):
+        assessment = get_object_or_404(Assessment, pk=assessment_id)
+        if 'question_ids' in request.data:
+            question_ids = serializers.ListField(
+                child=serializers.IntegerField()
+            ).run_validation(request.data['question_ids'])
+            questions = reorder_questions(assessment, question_ids)
+        elif 'question_id' in request.data and 'after' in request.data:
+            question_id = serializers.IntegerField().run_validation(request.data['question_id'])
+            # An explicit null moves the question to the top
+            after = serializers.IntegerField(allow_null=True).run_validation(
+                request.data['after'])
+            questions = move_question(assessment, question_id, after)
+        else:
+            return Response(
+                {"error": "Send question_ids, or question_id and after (null for the top)"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response([{'id': question.id, 'order': question.order} for question in questions])
 
 
 class QuestionDetail(generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update, or delete a question (admin only)
     """
-    queryset = Question.objects.all()
+    queryset = Question.objects.select_related('assessment')
     serializer_class = QuestionSerializer
     permission_classes = [permissions.IsAdminUser]
 
+    def perform_update(self, serializer):
+        ensure_draft(serializer.instance.assessment)
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        ensure_draft(instance.assessment)
+        instance.delete()
+
 
 class ChoiceList(generics.ListCreateAPIView):
     """
@@ -126,7 +296,8 @@ class ChoiceList(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         question_id = self.kwargs.get('question_id')
-        question = get_object_or_404(Question, pk=question_id)
+        question = get_object_or_404(Question.objects.select_related('assessment'), pk=question_id)
+        ensure_draft(question.assessment)
         serializer.save(question=question)
 
 
@@ -134,33 +305,37 @@ class ChoiceDetail(generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update, or delete a choice (admin only)
     """
-    queryset = Choice.objects.all()
+    queryset = Choice.objects.select_related('question__assessment')
     serializer_class = ChoiceSerializer
     permission_classes = [permissions.IsAdminUser]
 
+    def perform_update(self, serializer):
+        ensure_draft(serializer.instance.question.assessment)
+        serializer.save()
 
-class ResponseCreate(generics.CreateAPIView):
+    def perform_destroy(self, instance):
+        ensure_draft(instance.question.assessment)
+        instance.delete()
+
+
+class ResponseCreate(InstrumentedViewMixin, generics.CreateAPIView):
     """
     Create a new response submission with its answers
     """
+    metrics_endpoint = 'response_create'
     serializer_class = ResponseSerializer
 
-    @transaction.atomic
     def perform_create(self, serializer):
-        response = serializer.save()
-        
-        # Clean up any partial responses for this assessment and email
-        PartialResponse.objects.filter(
-            assessment=response.assessment,
-            respondent_email=response.respondent_email
-        ).delete()
+        # Also enforces the time limit of timed assessments
+        save_submission(serializer)
 
 
-class ResponseList(generics.ListAPIView):
+class ResponseList(ReplicaReadMixin, generics.ListAPIView):
     """
     List all responses (admin/authenticated users only)
     """
     serializer_class = ResponseSerializer
+    authentication_classes = DASHBOARD_AUTHENTICATION_CLASSES
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -174,7 +349,7 @@ class ResponseList(generics.ListAPIView):
         # Filter by email if provided and user is admin
         email = self.request.query_params.get('email')
         if email and self.request.user.is_staff:
-            queryset = queryset.filter(respondent_email=email)
+            queryset = queryset.filter(respondent__email_hash=Respondent.hash_email(email))
             
         # Order by submission date (newest first)
         return queryset.order_by('-submitted_at')
@@ -189,10 +364,57 @@ class ResponseDetail(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class PartialResponseListCreate(generics.ListCreateAPIView):
+class RespondentHistoryPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class RespondentHistoryView(ReplicaReadMixin, generics.ListAPIView):
+    """
+    List a respondent's submissions and drafts across all assessments,
+    newest first (admin only). The respondent is given by ``email``.
+    """
+    serializer_class = RespondentHistorySerializer
+    authentication_classes = DASHBOARD_AUTHENTICATION_CLASSES
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = RespondentHistoryPagination
+
+    def get_queryset(self):
+        email = self.request.query_params.get('email')
+        if not email:
+            raise ValidationError({'email': 'This query parameter is required.'})
+
+        respondent_id = Respondent.objects.filter(
+            email_hash=Respondent.hash_email(email)
+        ).values_list('id', flat=True).first()
+        if respondent_id is None:
+            return AssessmentResponse.objects.none()
+
+        fields = ('id', 'kind', 'assessment_id', 'assessment_title', 'timestamp')
+        submissions = AssessmentResponse.objects.filter(
+            respondent_id=respondent_id
+        ).annotate(
+            kind=Value('response', output_field=CharField()),
+            assessment_title=F('assessment__title'),
+            timestamp=F('submitted_at'),
+        ).values(*fields)
+        drafts = PartialResponse.objects.filter(
+            respondent_id=respondent_id
+        ).annotate(
+            kind=Value('partial_response', output_field=CharField()),
+            assessment_title=F('assessment__title'),
+            timestamp=F('last_updated'),
+        ).values(*fields)
+
+        return submissions.union(drafts, all=True).order_by('-timestamp', '-id')
+
+
+class PartialResponseListCreate(InstrumentedViewMixin, generics.ListCreateAPIView):
     """
     List and create partial (incomplete) responses
     """
+    metrics_endpoint = 'partial_response_list'
     serializer_class = PartialResponseSerializer
 
     def get_queryset(self):
@@ -205,24 +427,29 @@ class PartialResponseListCreate(generics.ListCreateAPIView):
         if assessment_id:
             queryset = queryset.filter(assessment_id=assessment_id)
         if email:
-            queryset = queryset.filter(respondent_email=email)
+            queryset = queryset.filter(respondent__email_hash=Respondent.hash_email(email))
             
         return queryset.order_by('-last_updated')
 
 
-class PartialResponseDetail(generics.RetrieveUpdateDestroyAPIView):
+class PartialResponseDetail(InstrumentedViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update or delete a partial response
     """
+    metrics_endpoint = 'partial_response_detail'
     queryset = PartialResponse.objects.all()
     serializer_class = PartialResponseSerializer
 
 
-class AssessmentStatsView(APIView):
+class AssessmentStatsView(InstrumentedViewMixin, ReplicaReadMixin, APIView):
     """
     Get statistics for a specific assessment
     """
+    metrics_endpoint = 'assessment_stats'
+    authentication_classes = DASHBOARD_AUTHENTICATION_CLASSES
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'stats'
+    throttle_classes = STATS_THROTTLES
 
     def get(self, request, assessment_id):
         try:
@@ -233,9 +460,18 @@ class AssessmentStatsView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
             
+        # Identical requests arriving together share one computation
+        stats = stats_flight.do(
+            ('assessment_stats', assessment.id, timezone.get_current_timezone_name()),
+            lambda: self._build_stats(assessment)
+        )
+        return Response(stats)
+
+    def _build_stats(self, assessment):
         # Get all responses for this assessment
-        responses = AssessmentResponse.objects.filter(assessment_id=assessment_id)
-        total_responses = responses.count()
+        responses = AssessmentResponse.objects.filter(assessment_id=assessment.id)
+        archived = archived_responses([assessment.id]).get(assessment.id, {})
+        total_responses = responses.count() + archived.get('responses', 0)
         
         # Calculate completion metrics
         stats = {
@@ -244,20 +480,22 @@ class AssessmentStatsView(APIView):
                 'title': assessment.title,
                 'created_at': assessment.created_at,
                 'created_by': assessment.created_by.username if assessment.created_by else None,
+                'version': assessment.version,
+                'published_at': assessment.published_at,
             },
             'response_metrics': {
                 'total_responses': total_responses,
-                'completion_rate': self._calculate_completion_rate(assessment),
-                'responses_by_day': self._get_responses_by_day(responses),
+                'completion_rate': self._calculate_completion_rate(assessment, archived),
+                'responses_by_day': self._get_responses_by_day(assessment),
             },
             'question_metrics': self._get_question_metrics(assessment),
         }
         
-        return Response(stats)
+        return stats
 
-    def _calculate_completion_rate(self, assessment):
+    def _calculate_completion_rate(self, assessment, archived):
         """Calculate what percentage of started assessments were completed"""
-        total_questions = assessment.questions.count()
+        total_questions = len(assessment_questions(assessment.id))
         if total_questions == 0:
             return 0
             
@@ -268,7 +506,7 @@ class AssessmentStatsView(APIView):
             answer_count=Count('answers')
         ).filter(
             answer_count=total_questions
-        ).count()
+        ).count() + archived.get('completed', 0)
         
         # Count partial responses
         partial_count = PartialResponse.objects.filter(assessment=assessment).count()
@@ -281,77 +519,18 @@ class AssessmentStatsView(APIView):
             
         return round((completed_responses / total_started) * 100, 2)
 
-    def _get_responses_by_day(self, responses):
-        """Get the count of responses grouped by day"""
-        by_day = responses.extra(
-            select={'day': "DATE(submitted_at)"}
-        ).values('day').annotate(count=Count('id')).order_by('day')
+    def _get_responses_by_day(self, assessment):
+        """Get the count of responses grouped by day in the current time zone"""
+        try:
+            by_day = response_series(
+                assessment.id, 'day', tzinfo=timezone.get_current_timezone()
+            )
+        except ValueError:
+            # Archived responses can't be split into days of this zone
+            by_day = response_series(assessment.id, 'day', tzinfo=dt_timezone.utc)
         
-        return [{'date': item['day'], 'count': item['count']} for item in by_day]
+        return [{'date': item['period'], 'count': item['count']} for item in by_day]
 
     def _get_question_metrics(self, assessment):
         """Get metrics for each question in the assessment"""
-        result = {}
-        
-        for question in assessment.questions.all():
-            answers = Answer.objects.filter(question=question)
-            answer_count = answers.count()
-            
-            question_data = {
-                'question_text': question.question_text,
-                'question_type': question.question_type,
-                'answer_count': answer_count,
-            }
-            
-            # For multiple choice and checkbox questions, show distribution
-            if question.question_type in ['multiple_choice', 'checkbox']:
-                distribution = {}
-                for choice in question.choices.all():
-                    # For checkboxes, we need to look for the value within comma-separated values
-                    if question.question_type == 'checkbox':
-                        count = answers.filter(
-                            Q(answer_text__exact=choice.value) | 
-                            Q(answer_text__startswith=f"{choice.value},") | 
-                            Q(answer_text__contains=f",{choice.value},") | 
-                            Q(answer_text__endswith=f",{choice.value}")
-                        ).count()
-                    else:
-                        count = answers.filter(answer_text=choice.value).count()
-                    
-                    distribution[choice.choice_text] = {
-                        'count': count,
-                        'percentage': round((count / answer_count * 100), 2) if answer_count > 0 else 0
-                    }
-                
-                question_data['answer_distribution'] = distribution
-                
-            # For scale questions, calculate averages
-            elif question.question_type == 'scale':
-                try:
-                    avg_value = answers.exclude(
-                        answer_text=''
-                    ).annotate(
-                        numeric_value=Cast('answer_text', IntegerField())
-                    ).aggregate(
-                        avg=Avg('numeric_value')
-                    )['avg'] or 0
-                    
-                    question_data['average_value'] = round(avg_value, 2)
-                    
-                    # Distribution of scale values
-                    distribution = {}
-                    for value in range(1, 6):  # Assuming 1-5 scale
-                        count = answers.filter(answer_text=str(value)).count()
-                        distribution[str(value)] = {
-                            'count': count,
-                            'percentage': round((count / answer_count * 100), 2) if answer_count > 0 else 0
-                        }
-                    
-                    question_data['answer_distribution'] = distribution
-                    
-                except:
-                    question_data['average_value'] = 0
-            
-            result[question.id] = question_data
-                
-        return result
\ No newline at end of file
+        return question_metrics(assessment)
@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "business_assessment.settings")
 
+# Persistent connections leak under ASGI: sync ORM calls run on a thread pool,
+# so each thread keeps its own connection open for DB_CONN_MAX_AGE. Reuse
+# connections with DB_POOL instead.
+os.environ["DB_CONN_MAX_AGE"] = "0"
+
 application = get_asgi_application()
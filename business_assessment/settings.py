@@ -1,6 +1,16 @@
+import os
 from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 
+import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+
+
+def env_bool(name, default=False):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,6 +54,17 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-request timing, query counts and N+1 detection (see
+# assessments/middleware.py). Results are readable at /api/admin/profiling/.
+PROFILING_ENABLED = env_bool('PROFILING_ENABLED')
+PROFILING_BUFFER_SIZE = int(os.environ.get('PROFILING_BUFFER_SIZE', 500))
+PROFILING_CPROFILE_SAMPLE_RATE = float(os.environ.get('PROFILING_CPROFILE_SAMPLE_RATE', 0))
+PROFILING_SLOW_REQUEST_MS = int(os.environ.get('PROFILING_SLOW_REQUEST_MS', 500))
+PROFILING_DUMP_DIR = os.environ.get('PROFILING_DUMP_DIR', str(BASE_DIR / 'profiles'))
+
+if PROFILING_ENABLED:
+    MIDDLEWARE.insert(0, 'assessments.middleware.ProfilingMiddleware')
+
 
 
 
@@ -94,13 +115,27 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'USER_ID_FIELD': 'id',
+    'TOKEN_OBTAIN_SERIALIZER': 'assessments.authentication.tokens.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'assessments.authentication.tokens.CachedTokenRefreshSerializer',
 }
 
+# Read-heavy dashboard views authenticate from token claims (see
+# assessments/authentication/tokens.py). Deactivation and demotion, and
+# blacklisted refresh tokens, are cached per process for this many seconds.
+STATELESS_AUTH_CACHE_TTL = int(os.environ.get('STATELESS_AUTH_CACHE_TTL', '30'))
+STATELESS_AUTH_CACHE_SIZE = 10000
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
+    # Token-bucket rates for assessments/throttling.py, keyed <scope>_<kind>
+    'DEFAULT_THROTTLE_RATES': {
+        'stats_user': '60/min',
+        'stats_ip': '120/min',
+        'register_ip': '10/hour',
+    },
 }
 
 ROOT_URLCONF = "business_assessment.urls"
@@ -127,13 +162,63 @@ WSGI_APPLICATION = "business_assessment.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Configured from DATABASE_URL, falling back to the bundled SQLite file.
+# Connections are kept open for DB_CONN_MAX_AGE seconds and checked before
+# reuse, instead of being reopened on every request.
+def tune_database(config):
+    if config["ENGINE"] == "django.db.backends.sqlite3":
+        # WAL lets readers run alongside a writer; IMMEDIATE transactions take
+        # the write lock up front so concurrent writers wait on busy_timeout
+        # instead of failing with "database is locked".
+        config.setdefault("OPTIONS", {}).update({
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                f"PRAGMA busy_timeout={int(os.environ.get('DB_SQLITE_BUSY_TIMEOUT_MS', 5000))};"
+                "PRAGMA temp_store=MEMORY;"
+            ),
+            "transaction_mode": "IMMEDIATE",
+        })
+    elif config["ENGINE"] == "django.db.backends.postgresql" and env_bool('DB_POOL'):
+        # Native pooling needs psycopg 3 with the pool extra (psycopg[pool])
+        # and replaces persistent connections
+        if find_spec("psycopg") is None or find_spec("psycopg_pool") is None:
+            raise ImproperlyConfigured(
+                "DB_POOL requires psycopg 3 with the pool extra; "
+                "install 'psycopg[binary,pool]' or unset DB_POOL."
+            )
+        config["CONN_MAX_AGE"] = 0
+        config.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            "max_size": int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            "timeout": int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        }
+    return config
+
+
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+    "default": tune_database(dj_database_url.config(
+        default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
+        conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        conn_health_checks=True,
+    ))
 }
 
+# Optional read replica for stats and list endpoints (see
+# assessments/routers.py). Two SQLite files work for local testing.
+DATABASE_REPLICA_ALIAS = "replica"
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+DATABASE_ROUTERS = ["assessments.routers.ReplicaRouter"]
+
+if os.environ.get('DATABASE_REPLICA_URL'):
+    DATABASES[DATABASE_REPLICA_ALIAS] = tune_database(dj_database_url.parse(
+        os.environ['DATABASE_REPLICA_URL'],
+        conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        conn_health_checks=True,
+        test_options={"MIRROR": "default"},
+    ))
+    MIDDLEWARE.append('assessments.middleware.ReplicaPinningMiddleware')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -153,6 +238,34 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# New hashes use PASSWORD_HASHER (scrypt by default: memory-hard, and less
+# CPU per login than PBKDF2 at Django's default iterations). Existing hashes
+# keep working and ModelBackend upgrades them on the user's next login.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',  # needs argon2-cffi
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+PREFERRED_PASSWORD_HASHER = {
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+}[os.environ.get('PASSWORD_HASHER', 'scrypt')]
+PASSWORD_HASHERS.remove(PREFERRED_PASSWORD_HASHER)
+PASSWORD_HASHERS.insert(0, PREFERRED_PASSWORD_HASHER)
+
+# Login, registration and password change hash inside one of
+# PASSWORD_HASHING_CONCURRENCY slots kept in the default cache
+# (assessments/authentication/hashing.py), so with REDIS_URL set a burst of
+# sign-ins holds at most that many workers. Requests that can't get a slot
+# within PASSWORD_HASHING_WAIT_SECONDS get a 503.
+AUTHENTICATION_BACKENDS = ['assessments.authentication.backends.HashingSlotModelBackend']
+PASSWORD_HASHING_CONCURRENCY = int(os.environ.get('PASSWORD_HASHING_CONCURRENCY', 2))
+PASSWORD_HASHING_WAIT_SECONDS = 0.5
+PASSWORD_HASHING_LEASE_SECONDS = 10
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -182,6 +295,76 @@ STATIC_URL = "static/"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Seconds of leeway allowed after a timed attempt expires before a
+# submission is rejected (covers network latency on the final submit)
+ASSESSMENT_TIME_LIMIT_GRACE_SECONDS = 30
+
+# manage.py sweep_expired_attempts deletes timed attempts this many days
+# after they expired; until then a respondent can't restart the timer
+ASSESSMENT_ATTEMPT_RETENTION_DAYS = 90
+
+# Batch analytics: maximum assessments per comparison request and the size
+# of the thread pool used for per-assessment question metrics
+ANALYTICS_MAX_COMPARE = 100
+ANALYTICS_MAX_WORKERS = 4
+
+# Bulk user operations (assessments/bulk_users.py). Batches larger than
+# BULK_USERS_SYNC_LIMIT, and all CSV imports, run as background jobs on a
+# pool of BACKGROUND_JOB_WORKERS threads in the web process. Each import
+# hashes passwords on USER_IMPORT_HASHING_WORKERS threads.
+BULK_USERS_SYNC_LIMIT = 500
+BULK_USERS_CHUNK_SIZE = 1000
+USER_IMPORT_MAX_ROWS = 50000
+USER_IMPORT_HASHING_WORKERS = 2
+BACKGROUND_JOB_WORKERS = 2
+
+# Deleted assessments are purged in the background (assessments/purge.py),
+# this many parent rows per transaction, pausing between batches.
+ASSESSMENT_PURGE_BATCH_SIZE = 1000
+ASSESSMENT_PURGE_PAUSE = 0
+
+# Response archival (manage.py archive_responses). Assessments without their
+# own retention_days fall back to RESPONSE_RETENTION_DAYS; unset keeps
+# responses forever.
+RESPONSE_RETENTION_DAYS = (
+    int(os.environ['RESPONSE_RETENTION_DAYS']) if os.environ.get('RESPONSE_RETENTION_DAYS') else None
+)
+RESPONSE_ARCHIVE_DIR = os.environ.get('RESPONSE_ARCHIVE_DIR', str(BASE_DIR / 'archives'))
+RESPONSE_ARCHIVE_BATCH_SIZE = 1000
+
+# Question and choice metadata used by stats and archives is cached per
+# process (assessments/question_metadata.py). Edits clear it in the process
+# that made them; other processes see them after this many seconds.
+QUESTION_METADATA_CACHE_TTL = 300
+QUESTION_METADATA_CACHE_SIZE = 1000
+
+# Cross-tabs of two questions are kept in the default cache, keyed on the
+# questions' answer count, for at most this many seconds.
+CROSSTAB_CACHE_TTL = 300
+
+# The default cache is local to each process. Point REDIS_URL at a Redis
+# server to share throttle buckets, replica pins and in-flight stats
+# computations (assessments/coalescing.py) between gunicorn workers.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ['REDIS_URL'],
+        }
+    }
+
+# Stats requests wait this long for the same computation running in another
+# process before computing it themselves.
+COALESCING_WAIT_SECONDS = 30
+
+# Metrics scraped from /api/metrics/. Under gunicorn, point METRICS_DIR at a
+# directory shared by the workers (cleared on deploy) so their values are
+# aggregated; without it each scrape only sees the worker that served it.
+METRICS_DIR = os.environ.get('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 1.0))
+METRICS_AUTH_TOKEN = os.environ.get('METRICS_AUTH_TOKEN', '')
+METRICS_ALLOWED_IPS = os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1').split(',')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 